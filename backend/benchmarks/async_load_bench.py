@@ -0,0 +1,151 @@
+"""
+Load test: request latency while a large data file is being re-parsed.
+
+Concurrent clients hit a cheap endpoint (/api/dashboard/stats) while another
+client lists tenders from a large tender.json whose mtime is bumped every
+--touch-ms, forcing a re-parse on the next read. The same workload runs
+twice against the real app (in-process, over ASGI):
+
+- blocking: data loading runs inline on the event loop (the old behaviour)
+- async:    services/async_loader.py moves stats and parses to its threads
+
+Run from backend/:
+    python benchmarks/async_load_bench.py
+    python benchmarks/async_load_bench.py --rows 400000 --seconds 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+from services import async_loader, data_loader  # noqa: E402
+from services.expand_data import all_counties  # noqa: E402
+
+
+REQUESTS_PER_SECOND = 400  # offered load on the cheap endpoint, all clients together
+
+
+def write_tenders(path: str, n: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        f.write("[")
+        for i in range(n):
+            bench = rng.randint(1_000_000, 50_000_000)
+            f.write(("," if i else "") + json.dumps({
+                "id": f"SYN-{i}",
+                "title": "Synthetic tender",
+                "county": rng.choice(all_counties),
+                "category": "Roads",
+                "value": int(bench * rng.uniform(0.6, 2.2)),
+                "benchmark_value": bench,
+                "contractor_id": f"CONT-{rng.randrange(5000)}",
+                "status": "Ongoing",
+            }))
+        f.write("]")
+
+
+async def _inline(fn, *args, **kwargs):
+    return fn(*args, **kwargs)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_workload(app, tender_path: str, seconds: float, clients: int, touch_ms: int) -> list[float]:
+    interval = clients / REQUESTS_PER_SECOND
+    stop = threading.Event()
+
+    def toucher():
+        # New mtime => signature change => the next tenders read re-parses
+        while not stop.wait(touch_ms / 1000):
+            now = time.time_ns()
+            os.utime(tender_path, ns=(now, now))
+
+    latencies: list[float] = []
+    deadline = time.perf_counter() + seconds
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/api/tenders?limit=1")  # warm caches
+
+        async def light():
+            # Open loop: latency counts from when the request was due, so time
+            # spent waiting for a blocked loop is not silently dropped.
+            due = time.perf_counter()
+            while due < deadline:
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                r = await client.get("/api/dashboard/stats")
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - due)
+                due += interval
+
+        async def heavy():
+            while time.perf_counter() < deadline:
+                (await client.get("/api/tenders?limit=10")).raise_for_status()
+                await asyncio.sleep(0.05)
+
+        thread = threading.Thread(target=toucher, daemon=True)
+        thread.start()
+        try:
+            await asyncio.gather(heavy(), *(light() for _ in range(clients)))
+        finally:
+            stop.set()
+            thread.join()
+    return latencies
+
+
+def report(mode: str, latencies: list[float]) -> None:
+    ms = [x * 1000 for x in latencies]
+    print(
+        f"{mode:>9}: {len(ms):6d} requests  p50 {statistics.median(ms):7.2f} ms  "
+        f"p99 {percentile(ms, 99):7.2f} ms  max {max(ms):7.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--seconds", type=float, default=6.0)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--touch-ms", type=int, default=500)
+    args = parser.parse_args()
+
+    source_dir = data_loader.DATA_PATH
+    data_dir = tempfile.mkdtemp(prefix="tp-bench-")
+    try:
+        shutil.copy(os.path.join(source_dir, "mock_data.json"), data_dir)
+        tender_path = os.path.join(data_dir, "tender.json")
+        write_tenders(tender_path, args.rows)
+        data_loader.DATA_PATH = data_dir
+        print(f"{args.rows:,} tenders ({os.path.getsize(tender_path) / 1e6:.1f} MB), "
+              f"{args.clients} clients, re-parse every {args.touch_ms} ms, {args.seconds}s per mode")
+
+        from main import app
+
+        threaded = async_loader.run_blocking
+        for mode, runner in (("blocking", _inline), ("async", threaded)):
+            async_loader.run_blocking = runner
+            data_loader.dataset_cache.invalidate()
+            latencies = asyncio.run(run_workload(app, tender_path, args.seconds, args.clients, args.touch_ms))
+            report(mode, latencies)
+        async_loader.run_blocking = threaded
+    finally:
+        data_loader.DATA_PATH = source_dir
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Throughput of the pure-Python vs NumPy columnar tender engine.
+
+Run from backend/:
+    python benchmarks/columnar_bench.py            # 1,000,000 synthetic tenders
+    python benchmarks/columnar_bench.py --rows 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import columnar  # noqa: E402
+from services.expand_data import all_counties  # noqa: E402
+from services.reputation import is_price_anomaly, score_all_contractors, score_all_counties  # noqa: E402
+
+CATEGORIES = ["Roads", "Buildings", "Medical", "Water", "ICT", "Energy"]
+STATUSES = ["Awarded", "Ongoing", "Completed", "Stalled"]
+
+
+def synthetic_tenders(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    tenders = []
+    for i in range(n):
+        bench = rng.randint(1_000_000, 50_000_000)
+        tenders.append({
+            "id": f"SYN-{i}",
+            "county": rng.choice(all_counties),
+            "category": rng.choice(CATEGORIES),
+            "value": int(bench * rng.uniform(0.6, 2.2)),
+            "benchmark_value": bench,
+            "contractor_id": f"CONT-{rng.randrange(5000)}",
+            "status": rng.choice(STATUSES),
+        })
+    return tenders
+
+
+def synthetic_posts(tenders: list[dict], n: int, seed: int = 11) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {"referenceId": rng.choice(tenders)["id"], "status": "delay_reported"}
+        for _ in range(n)
+    ]
+
+
+def group_totals_python(tenders, field):
+    stats = {}
+    for t in tenders:
+        s = stats.setdefault(t.get(field), [0, 0])
+        s[0] += 1
+        s[1] += t.get("value", 0)
+    return stats
+
+
+def timed(label: str, rows: int, fn, repeat: int = 3):
+    best = min(_once(fn) for _ in range(repeat))
+    print(f"  {label:<34} {best * 1000:9.1f} ms   {rows / best / 1e6:8.2f} M rows/s")
+    return best
+
+
+def _once(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--posts", type=int, default=20_000)
+    args = parser.parse_args()
+
+    if not columnar.available():
+        sys.exit("NumPy is not installed; the columnar engine is unavailable.")
+
+    print(f"Generating {args.rows:,} synthetic tenders ...")
+    tenders = synthetic_tenders(args.rows)
+    posts = synthetic_posts(tenders, args.posts)
+    n = len(tenders)
+
+    start = time.perf_counter()
+    cols = columnar.TenderColumns(tenders)
+    print(f"Column build (once per snapshot): {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    print("County totals")
+    py = timed("python dict loop", n, lambda: group_totals_python(tenders, "county"))
+    np_ = timed("numpy bincount", n, lambda: cols.group_totals("county"))
+    print(f"  speedup x{py / np_:.1f}\n")
+
+    print("Price-ratio anomalies")
+    py = timed("python is_price_anomaly", n, lambda: sum(is_price_anomaly(t) for t in tenders))
+    np_ = timed("numpy ratio > multiplier", n, lambda: int(cols.anomaly_mask().sum()))
+    print(f"  speedup x{py / np_:.1f}\n")
+
+    print("Category breakdown")
+    py = timed("python dict loop", n, lambda: group_totals_python(tenders, "category"))
+    np_ = timed("numpy bincount", n, lambda: cols.group_totals("category"))
+    print(f"  speedup x{py / np_:.1f}\n")
+
+    print("Contractor trust scores")
+    py = timed("score_all_contractors (python)", n, lambda: score_all_contractors(tenders, posts), repeat=1)
+    np_ = timed("score_all_contractors (columnar)", n, lambda: score_all_contractors(tenders, posts, columns=cols), repeat=1)
+    print(f"  speedup x{py / np_:.1f}\n")
+
+    print("County reputation (47 counties, tenders only)")
+    py = timed("score_all_counties (python)", n, lambda: score_all_counties(tenders, [], posts, all_counties), repeat=1)
+    np_ = timed("score_all_counties (columnar)", n, lambda: score_all_counties(tenders, [], posts, all_counties, tender_columns=cols), repeat=1)
+    print(f"  speedup x{py / np_:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Response encoding throughput: FastAPI's default path vs FastJSONResponse.
+
+Encodes a synthetic list of citizen posts wrapped in the standard
+paginated envelope three ways and reports bytes/sec:
+
+- default:  jsonable_encoder + JSONResponse (what a returned dict costs)
+- fast:     FastJSONResponse (orjson when installed, no jsonable_encoder)
+- spliced:  FastJSONResponse with the items pre-encoded once per snapshot
+            (utils.response.encoded_rows) and spliced into the envelope
+
+Run from backend/:
+    python benchmarks/json_response_bench.py
+    python benchmarks/json_response_bench.py --rows 200000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from services.expand_data import all_counties  # noqa: E402
+from services.snapshot import Snapshot, freeze  # noqa: E402
+from utils import response  # noqa: E402
+from utils.response import Encoded, FastJSONResponse, encoded_rows, paginated_response  # noqa: E402
+
+CATEGORIES = ["Roads", "Health", "Water", "Education", "Security"]
+
+
+def synthetic_posts(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    posts = []
+    for i in range(n):
+        county = rng.choice(all_counties)
+        posts.append({
+            "id": f"post_{i}",
+            "title": f"Stalled works near ward {rng.randrange(1450)}",
+            "content": "Contractor has not been on site for weeks; materials left by the road. " * 2,
+            "status": rng.choice(["pending", "verified"]),
+            "wardId": f"{county} Ward {rng.randrange(30)}",
+            "county": county,
+            "category": rng.choice(CATEGORIES),
+            "likes": rng.randrange(500),
+            "comments": rng.randrange(80),
+            "referenceId": f"TND-{rng.randrange(100000)}",
+            "author": {"name": "Citizen", "avatar": None, "verified": rng.random() < 0.3},
+            "timestamp": f"2026-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T10:00:00Z",
+            "images": [],
+        })
+    return posts
+
+
+def _envelope(items, total):
+    return paginated_response(items=items, total=total, page=1, limit=total, items_key="posts")
+
+
+def _default(rows):
+    return JSONResponse(jsonable_encoder(_envelope(list(rows), len(rows)))).body
+
+
+def _fast(rows):
+    return FastJSONResponse(_envelope(rows, len(rows))).body
+
+
+def _spliced(snapshot):
+    rows = snapshot.rows
+    return FastJSONResponse(_envelope(Encoded.join(encoded_rows(snapshot)), len(rows))).body
+
+
+def measure(label, fn, arg, repeat):
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(fn(arg))
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<8} {best * 1000:9.1f} ms  {size / best / 1e6:9.1f} MB/s  ({size:,} bytes)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    snapshot = Snapshot("posts.json", 1, freeze(synthetic_posts(args.rows)))
+    encoder = "orjson" if response.orjson is not None else "stdlib json"
+    print(f"{args.rows:,} posts in a paginated envelope ({encoder}), best of {args.repeat}:")
+    default = measure("default", _default, snapshot.rows, args.repeat)
+    fast = measure("fast", _fast, snapshot.rows, args.repeat)
+    start = time.perf_counter()
+    encoded_rows(snapshot)
+    print(f"  (rows pre-encoded once in {(time.perf_counter() - start) * 1000:.1f} ms)")
+    spliced = measure("spliced", _spliced, snapshot, args.repeat)
+    print(f"Speed-up vs default: fast {default / fast:.1f}x, spliced {default / spliced:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
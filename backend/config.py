@@ -0,0 +1,92 @@
+"""
+Runtime settings for the TransparentProcure backend.
+
+Every value can be overridden with an environment variable of the same
+name prefixed with TP_ (e.g. TP_PRICE_ANOMALY_MULTIPLIER=2.0).
+"""
+
+import os
+
+
+def _env(name: str, default, cast=str):
+    raw = os.environ.get(f"TP_{name}")
+    return default if raw is None else cast(raw)
+
+
+def _flag(raw: str) -> bool:
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+# --- Storage ---
+# Backend for the /api endpoints: "json" (data/*.json snapshots) or
+# "sqlite" (transparent_procure.db, built by migrate_to_db.py).
+DATA_BACKEND = _env("DATA_BACKEND", "json").strip().lower()
+
+# SQLite pool (services/db.py): query threads and per-connection pragmas.
+SQLITE_POOL_SIZE = _env("SQLITE_POOL_SIZE", 8, int)
+SQLITE_CACHE_SIZE_KB = _env("SQLITE_CACHE_SIZE_KB", 65536, int)
+SQLITE_MMAP_SIZE = _env("SQLITE_MMAP_SIZE", 256 * 1024 * 1024, int)
+SQLITE_SYNCHRONOUS = _env("SQLITE_SYNCHRONOUS", "NORMAL").strip().upper()
+
+# JSON backend: how long a cached data file is trusted before its mtime/size
+# is checked again (0 = check on every read), and the threads that run those
+# checks and parses for async handlers (services/async_loader.py).
+DATA_REVALIDATE_SECONDS = _env("DATA_REVALIDATE_SECONDS", 1.0, float)
+DATA_LOADER_THREADS = _env("DATA_LOADER_THREADS", 4, int)
+# Data file writes: compact JSON (no indentation) and how long the
+# write-behind queue waits to coalesce a burst of update_json mutations.
+JSON_COMPACT = _env("JSON_COMPACT", True, _flag)
+WRITE_BEHIND_SECONDS = _env("WRITE_BEHIND_SECONDS", 0.2, float)
+
+# Whistle-blower intake log (services/whistleblower.py): segment size before
+# rotation, sealed segments that trigger a background merge, and whether
+# save_report waits for fsync (batched across concurrent writers).
+WHISTLEBLOWER_SEGMENT_BYTES = _env("WHISTLEBLOWER_SEGMENT_BYTES", 4 * 1024 * 1024, int)
+WHISTLEBLOWER_COMPACT_SEGMENTS = _env("WHISTLEBLOWER_COMPACT_SEGMENTS", 8, int)
+WHISTLEBLOWER_FSYNC = _env("WHISTLEBLOWER_FSYNC", True, _flag)
+
+# --- Risk rules (shared by the data layer and services/reputation.py) ---
+# A tender is a price anomaly when value / benchmark_value exceeds this.
+PRICE_ANOMALY_MULTIPLIER = _env("PRICE_ANOMALY_MULTIPLIER", 1.5, float)
+# A pending invoice older than this many days is a chronic liability.
+CHRONIC_PENDING_DAYS = _env("CHRONIC_PENDING_DAYS", 180, int)
+# --- Reputation engine (services/reputation_engine.py) ---
+# Recheck the incremental reputation engine against a full rebuild after
+# every dataset sync (slow; for debugging).
+REPUTATION_VERIFY = _env("REPUTATION_VERIFY", False, _flag)
+# Number of contractor score breakdowns kept in the explain LRU.
+EXPLAIN_CACHE_SIZE = _env("EXPLAIN_CACHE_SIZE", 1024, int)
+
+# --- Search (services/fuzzy.py) ---
+# Minimum trigram similarity (0-1) for a fuzzy contractor match.
+FUZZY_THRESHOLD = _env("FUZZY_THRESHOLD", 0.5, float)
+# Shorter queries only get substring matches: one or two characters have
+# too few trigrams to rank by similarity.
+FUZZY_MIN_QUERY = _env("FUZZY_MIN_QUERY", 3, int)
+
+# --- Response cache (services/response_cache.py) ---
+# Serialized responses kept for dashboard/lookup endpoints, the
+# Cache-Control max-age they are sent with (0 = revalidate every time via
+# If-None-Match), and how long one /api/health body is reused (0 = never).
+RESPONSE_CACHE_SIZE = _env("RESPONSE_CACHE_SIZE", 256, int)
+RESPONSE_CACHE_MAX_AGE = _env("RESPONSE_CACHE_MAX_AGE", 0, int)
+HEALTH_CACHE_SECONDS = _env("HEALTH_CACHE_SECONDS", 2.0, float)
+
+# --- Bulk export (services/export.py) ---
+# Rows fetched, encoded and flushed per chunk of a streaming export.
+EXPORT_BATCH_ROWS = _env("EXPORT_BATCH_ROWS", 2000, int)
+
+# --- Report generation (services/report_jobs.py) ---
+# Worker threads rendering /reports/generate jobs in the background.
+REPORT_WORKERS = _env("REPORT_WORKERS", 2, int)
+
+# --- Fraud pattern detection (services/patterns.py) ---
+# Worker processes, and the tender count from which detection uses them.
+PATTERN_WORKERS = _env("PATTERN_WORKERS", min(8, os.cpu_count() or 1), int)
+PATTERN_PARALLEL_MIN_TENDERS = _env("PATTERN_PARALLEL_MIN_TENDERS", 50_000, int)
+# Fewest tenders in a county/category before its awards and prices are judged.
+PATTERN_MIN_PARTITION = _env("PATTERN_MIN_PARTITION", 5, int)
+# Share of a county/category's awarded value held by one contractor.
+AWARD_CONCENTRATION_SHARE = _env("AWARD_CONCENTRATION_SHARE", 0.5, float)
+# Robust z-score (median/MAD) of a tender's price ratio within its county/category.
+PRICE_OUTLIER_SCORE = _env("PRICE_OUTLIER_SCORE", 3.5, float)
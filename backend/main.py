@@ -16,19 +16,36 @@ Backend team notes:
     where you'll replace mock logic with real DB queries.
 """
 
+from contextlib import asynccontextmanager
+from typing import Optional
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # --- Router imports ---
-from routers import health, auth, dashboard, feed, registry, fraud, audit, reports
+from routers import health, auth, dashboard, feed, registry, fraud, audit, reports, export, whistleblower
 from routers import utils as utils_router
+from services.async_loader import run_blocking
+from services.pagination import InvalidCursor, decode_cursor, encode_cursor
+from services.report_jobs import get_report_queue
+from services.repository import get_repository, risk_level
+from utils.response import FastJSONResponse
 
 # --- App setup ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resume report jobs a restart interrupted now, not on the first /api/reports request
+    await run_blocking(get_report_queue)
+    yield
+
+
 app = FastAPI(
     title="TransparentProcure API",
     description="Government procurement transparency platform — Kenya",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # --- CORS — allow the React frontend ---
@@ -42,70 +59,66 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request, exc: InvalidCursor):
+    # Same shape as HTTPException errors
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
 api_router = APIRouter(prefix="/api")
 
+
 @api_router.get("/tenders")
 async def read_tenders(
     skip: int = Query(0, description="Pagination offset"),
     limit: int = Query(100, description="Pagination limit"),
     county: Optional[str] = Query(None, description="Filter by county name"),
     category: Optional[str] = Query(None, description="Filter by procurement category"),
-    status: Optional[str] = Query(None, description="Filter by project status")
+    status: Optional[str] = Query(None, description="Filter by project status"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (nextCursor); empty for the first page")
 ):
     """
     Paginated list with filtering by county, category, and status.
+    Filtering and pagination run in the repository (index lookups for JSON,
+    indexed SQL for SQLite); risk columns are attached to the page only.
+    With `cursor`, pages are keyed on tender id instead of an offset.
     """
-    tenders = load_json("tender.json") 
-    
-    # 1. Apply Filters
-    if county:
-        tenders = [t for t in tenders if t.get("county", "").lower() == county.lower()]
-    if category:
-        tenders = [t for t in tenders if t.get("category", "").lower() == category.lower()]
-    if status:
-        tenders = [t for t in tenders if t.get("status", "").lower() == status.lower()]
-
-    # 2. Standardize data and apply risk flags
-    for t in tenders:
-        t["title"] = t.get("title") or t.get("name") or "Untitled Project"
-        # Enforce DEMO DATA label globally
-        t["is_demo_data"] = True 
-        
-        val = t.get("value", 0)
-        bench = t.get("benchmark_value", 1)
-        
-        if (val / bench) > 1.5:
-            t["risk_flag"] = "High Price Anomaly"
-            t["is_critical"] = True
-        else:
-            t["is_critical"] = False
-
-    # 3. Apply Pagination
-    paginated_tenders = tenders[skip : skip + limit]
+    repo = get_repository()
+    if cursor is not None:
+        after = decode_cursor(cursor, "tender")
+        limit = max(1, limit)
+        tenders, next_key = await repo.run(repo.page_tenders, county, category, status, after, limit)
+        return FastJSONResponse({
+            "limit": limit,
+            "nextCursor": encode_cursor("tender", next_key) if next_key is not None else None,
+            "data": tenders
+        })
+
+    total, paginated_tenders = await repo.run(repo.list_tenders, county, category, status, skip, limit)
     
     # Return paginated wrapper
-    return {
-        "total": len(tenders),
+    return FastJSONResponse({
+        "total": total,
         "skip": skip,
         "limit": limit,
         "data": paginated_tenders
-    }
+    })
 
 @api_router.get("/tender/{tender_id}")
 async def get_tender(tender_id: str):
     """
     Full tender detail including awarded contractor, value, and site location.
     """
-    tenders = load_json("tender.json")
-    for t in tenders:
-        if t.get("id") == tender_id:
-            # Enforce demo data flag
-            t["is_demo_data"] = True
-            # In a real app, you would join contractor details here
-            return t
-            
+    # In a real app, you would join contractor details here
+    repo = get_repository()
+    tender = await repo.run(repo.get_tender, tender_id)
+    if tender is not None:
+        return tender
+
     raise HTTPException(status_code=404, detail=f"Tender {tender_id} not found")
 # --- UPDATED COMMUNITY FEED LOGIC ---
 @api_router.get("/posts")
@@ -114,46 +127,53 @@ async def read_posts(wardId: Optional[str] = Query(None)):
     Day 3: Serving filtered crowdsourced citizen reports.
     Simplified to return a FLAT ARRAY to match other endpoints.
     """
-    all_posts = load_json("posts.json")
-    
+    repo = get_repository()
+    # Served pre-encoded: rows are serialized once per snapshot, not per request
     if not wardId or wardId == "All Activities":
-        return all_posts  # Returns the flat list
-
-    # Flexible filtering
-    filtered_posts = [
-        p for p in all_posts 
-        if p.get("wardId") == wardId or 
-           (p.get("county") and p.get("county") in wardId) or 
-           p.get("category") == wardId
-    ]
-    
-    return filtered_posts
+        return FastJSONResponse(await repo.run(repo.posts_json))  # Returns the flat list
+
+    # Flexible filtering (ward id, county in the ward label, or category)
+    return FastJSONResponse(await repo.run(repo.posts_json, wardId))
 
 @api_router.get("/contractors")
-async def read_contractors():
+async def read_contractors(
+    explain: bool = Query(False, description="Attach the per-rule score breakdown")
+):
     """
     Registry Page Data Source.
     Fixed the parameter order to prevent the 500 Internal Server Error.
     """
-    contractors = load_json("contractors.json")
-    tenders = load_json("tender.json")
-    posts = load_json("posts.json")
-    
+    repo = get_repository()
+    contractors = await repo.run(repo.list_contractors)
+
+    # Scores are aggregated by the repository (incremental engine for JSON,
+    # GROUP BY for SQLite), so listing costs O(contractors)
+    scores = await repo.run(repo.contractor_scores)
+    explanations = await repo.run(repo.explain_all) if explain else None
+
+    results = []
     for c in contractors:
-        c_id = c.get("id")
-        
-        # FIX: The order MUST match reputation.py (tenders, posts, id)
-        c["trust_score"] = calculate_contractor_score(tenders, posts, c_id)
+        trust_score = scores.get(c.get("id"), 50) # 50 = neutral for new/unknown
         
         # Add a visual risk tier for the frontend
-        if c["trust_score"] >= 80:
-            c["risk_level"] = "Low"
-        elif c["trust_score"] >= 50:
-            c["risk_level"] = "Medium"
-        else:
-            c["risk_level"] = "High (Blacklist Warning)"
+        entry = {**c, "trust_score": trust_score, "risk_level": risk_level(trust_score)}
+        if explanations is not None:
+            breakdown = explanations.get(c.get("id"))
+            entry["explain"] = breakdown["explain"] if breakdown else []
+        results.append(entry)
             
-    return contractors
+    return FastJSONResponse(results)
+
+@api_router.get("/contractors/{contractor_id}/explain")
+async def explain_contractor(contractor_id: str):
+    """
+    Which rules moved a contractor's trust_score, tender by tender.
+    The JSON backend serves it from the engine's breakdown cache.
+    """
+    repo = get_repository()
+    if not await repo.run(repo.contractor_exists, contractor_id):
+        raise HTTPException(status_code=404, detail=f"Contractor {contractor_id} not found")
+    return await repo.run(repo.explain, contractor_id)
 
 @api_router.get("/payments")
 async def read_payments(county: Optional[str] = Query(None)):
@@ -161,32 +181,28 @@ async def read_payments(county: Optional[str] = Query(None)):
     Day 4: Payment records exposing Chronic Pending bills.
     Adapted for the pre-calculated payment.json schema.
     """
-    payments = load_json("payment.json") # using your exact filename
-    
-    # Filter by checking if the search term is IN the entity_name
-    if county:
-        payments = [p for p in payments if county.lower() in p.get("entity_name", "").lower()]
-
-    for p in payments:
-        # Fulfilling the requirement: Flag any pending > 180 days
-        if p.get("status") == "Pending" and p.get("days_outstanding", 0) > 180:
-            p["risk_flag"] = "Chronic Pending"
-        else:
-            p["risk_flag"] = None
-
-    return {"data": payments}
+    # Filter by checking if the search term is IN the entity_name;
+    # risk_flag marks any pending > 180 days as "Chronic Pending"
+    repo = get_repository()
+    return FastJSONResponse({"data": await repo.run(repo.list_payments, county)})
 
 @api_router.get("/counties")
 async def read_counties():
-    tenders = load_json("tender.json")
-    stats = {}
-    for t in tenders:
-        c_name = t.get("county", "Unknown")
-        if c_name not in stats:
-            stats[c_name] = {"name": c_name, "tender_count": 0, "total_value": 0}
-        stats[c_name]["tender_count"] += 1
-        stats[c_name]["total_value"] += t.get("value", 0)
-    return list(stats.values())
+    repo = get_repository()
+    return await repo.run(repo.county_stats)
+
+@api_router.get("/counties/reputation")
+async def read_county_reputation():
+    """
+    County leaderboard: 0-100 reputation for all 47 counties (plus any other
+    county found in the tender data).
+    """
+    repo = get_repository()
+    return await repo.run(repo.county_leaderboard)
+
+# --- Feature routers (mounted under /api, matching the frontend's base URL) ---
+for router in (health, auth, dashboard, feed, registry, fraud, audit, reports, export, whistleblower, utils_router):
+    api_router.include_router(router.router)
 
 app.include_router(api_router)
 
@@ -1,7 +1,32 @@
-import sqlite3
+"""
+Load the JSON datasets in data/ into transparent_procure.db.
+
+    python migrate_to_db.py              # rebuild every table from scratch
+    python migrate_to_db.py --upsert     # keep tables, insert new rows / update changed ones
+    python migrate_to_db.py --resume     # continue an interrupted run where it stopped
+
+Files are streamed element by element, so multi-million-row tender and payment
+histories never have to fit in memory. Rows go in through `executemany`
+batches, each batch committed together with its progress checkpoint, which is
+what makes `--resume` safe after a crash. Secondary indexes are created after
+the load and rows/sec is reported per table.
+"""
+
+import argparse
 import json
 import os
 import re
+import sqlite3
+import time
+
+from services.jsonstream import iter_json_array
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+DB_PATH = os.path.join(BASE_DIR, 'transparent_procure.db')
+
+BATCH_SIZE = 10_000
+
 
 def clean_numerical_value(value):
     if isinstance(value, (int, float)): return float(value)
@@ -10,23 +35,33 @@ def clean_numerical_value(value):
         return float(sanitized) if sanitized else 0.0
     return 0.0
 
-def migrate():
-    base_dir = os.path.dirname(__file__)
-    data_dir = os.path.join(base_dir, 'data')
-    db_path = os.path.join(base_dir, 'transparent_procure.db')
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    # Drop existing tables just to be sure
-    cursor.execute("DROP TABLE IF EXISTS contractors")
-    cursor.execute("DROP TABLE IF EXISTS tenders")
-    cursor.execute("DROP TABLE IF EXISTS posts")
-    cursor.execute("DROP TABLE IF EXISTS payments")
+# Table definitions: (key column, columns DDL, row mapper).
+# Mappers turn one JSON element into the insert tuple, in column order.
+
+def _contractor_row(c):
+    return (c.get('id'), c.get('name'), c.get('kra_pin'), c.get('reg_date'), json.dumps(c.get('directors', [])), c.get('phone'), c.get('address'), json.dumps(c.get('risk_flags', [])), c.get('reputation_score'), c.get('is_demo_data', True))
+
+
+def _tender_row(t):
+    value = clean_numerical_value(t.get('value', 0))
+    benchmark_value = clean_numerical_value(t.get('benchmark_value', 1))
+    if 'value' in t and 'benchmark_value' not in t:
+        benchmark_value = 1.0
+    return (t.get('id'), t.get('title'), t.get('name'), t.get('county'), t.get('category'), value, benchmark_value, t.get('contractor_id'), t.get('status'), t.get('description'), t.get('days_overdue'), t.get('is_demo_data', True))
 
-    # Create tables
-    cursor.execute('''
-    CREATE TABLE contractors (
+
+def _post_row(p):
+    author = p.get('author', {})
+    return (p.get('id'), p.get('title'), p.get('content'), p.get('status'), p.get('ward'), p.get('wardId'), p.get('county'), p.get('category'), p.get('likes'), p.get('comments'), p.get('referenceId'), author.get('name'), author.get('avatar'), author.get('verified'), p.get('timestamp'), json.dumps(p.get('images', [])), p.get('is_demo_data', True))
+
+
+def _payment_row(p):
+    return (p.get('invoice_id'), p.get('entity_id'), p.get('entity_name'), clean_numerical_value(p.get('amount', 0)), p.get('status'), p.get('days_outstanding'), p.get('is_chronic'), p.get('is_demo_data', True))
+
+
+TABLES = {
+    'contractors': ('contractors.json', 'id', '''
         id TEXT PRIMARY KEY,
         name TEXT,
         kra_pin TEXT,
@@ -37,13 +72,11 @@ def migrate():
         risk_flags TEXT,
         reputation_score INTEGER,
         is_demo_data BOOLEAN
-    )
-    ''')
-
-    cursor.execute('''
-    CREATE TABLE tenders (
+    ''', _contractor_row),
+    'tenders': ('tender.json', 'id', '''
         id TEXT PRIMARY KEY,
         title TEXT,
+        name TEXT,
         county TEXT,
         category TEXT,
         value REAL,
@@ -53,15 +86,13 @@ def migrate():
         description TEXT,
         days_overdue INTEGER,
         is_demo_data BOOLEAN
-    )
-    ''')
-
-    cursor.execute('''
-    CREATE TABLE posts (
+    ''', _tender_row),
+    'posts': ('posts.json', 'id', '''
         id TEXT PRIMARY KEY,
         title TEXT,
         content TEXT,
         status TEXT,
+        ward TEXT,
         wardId TEXT,
         county TEXT,
         category TEXT,
@@ -74,11 +105,8 @@ def migrate():
         timestamp TEXT,
         images TEXT,
         is_demo_data BOOLEAN
-    )
-    ''')
-
-    cursor.execute('''
-    CREATE TABLE payments (
+    ''', _post_row),
+    'payments': ('payment.json', 'invoice_id', '''
         invoice_id TEXT PRIMARY KEY,
         entity_id TEXT,
         entity_name TEXT,
@@ -87,54 +115,158 @@ def migrate():
         days_outstanding INTEGER,
         is_chronic BOOLEAN,
         is_demo_data BOOLEAN
-    )
-    ''')
-
-    # Insert Data - Contractors
-    with open(os.path.join(data_dir, 'contractors.json')) as f:
-        contractors = json.load(f)
-        for c in contractors:
-            cursor.execute('''
-            INSERT INTO contractors (id, name, kra_pin, reg_date, directors, phone, address, risk_flags, reputation_score, is_demo_data)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (c.get('id'), c.get('name'), c.get('kra_pin'), c.get('reg_date'), json.dumps(c.get('directors', [])), c.get('phone'), c.get('address'), json.dumps(c.get('risk_flags', [])), c.get('reputation_score'), c.get('is_demo_data', True)))
-
-    # Insert Data - Tenders
-    with open(os.path.join(data_dir, 'tender.json')) as f:
-        tenders = json.load(f)
-        for t in tenders:
-            value = clean_numerical_value(t.get('value', 0))
-            benchmark_value = clean_numerical_value(t.get('benchmark_value', 1))
-            if 'value' in t and 'benchmark_value' not in t:
-                benchmark_value = 1.0
-            
-            cursor.execute('''
-            INSERT INTO tenders (id, title, county, category, value, benchmark_value, contractor_id, status, description, days_overdue, is_demo_data)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (t.get('id'), t.get('title'), t.get('county'), t.get('category'), value, benchmark_value, t.get('contractor_id'), t.get('status'), t.get('description'), t.get('days_overdue'), t.get('is_demo_data', True)))
-
-    # Insert Data - Posts
-    with open(os.path.join(data_dir, 'posts.json')) as f:
-        posts = json.load(f)
-        for p in posts:
-            author = p.get('author', {})
-            cursor.execute('''
-            INSERT INTO posts (id, title, content, status, wardId, county, category, likes, comments, referenceId, author_name, author_avatar, author_verified, timestamp, images, is_demo_data)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (p.get('id'), p.get('title'), p.get('content'), p.get('status'), p.get('wardId'), p.get('county'), p.get('category'), p.get('likes'), p.get('comments'), p.get('referenceId'), author.get('name'), author.get('avatar'), author.get('verified'), p.get('timestamp'), json.dumps(p.get('images', [])), p.get('is_demo_data', True)))
-
-    # Insert Data - Payments
-    with open(os.path.join(data_dir, 'payment.json')) as f:
-        payments = json.load(f)
-        for p in payments:
-            cursor.execute('''
-            INSERT INTO payments (invoice_id, entity_id, entity_name, amount, status, days_outstanding, is_chronic, is_demo_data)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (p.get('invoice_id'), p.get('entity_id'), p.get('entity_name'), clean_numerical_value(p.get('amount', 0)), p.get('status'), p.get('days_outstanding'), p.get('is_chronic'), p.get('is_demo_data', True)))
-
-    conn.commit()
+    ''', _payment_row),
+}
+
+# Indexes used by services/repository.py (SqliteRepository).
+# NOCASE so case-insensitive API filters can use them.
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_tenders_county ON tenders(county COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_tenders_category ON tenders(category COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_tenders_status ON tenders(status COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_tenders_contractor ON tenders(contractor_id)",
+    "CREATE INDEX IF NOT EXISTS idx_posts_reference ON posts(referenceId)",
+    "CREATE INDEX IF NOT EXISTS idx_posts_ward ON posts(wardId)",
+    "CREATE INDEX IF NOT EXISTS idx_posts_ward_label ON posts(ward)",
+    "CREATE INDEX IF NOT EXISTS idx_posts_timestamp ON posts(timestamp, id)",
+    "CREATE INDEX IF NOT EXISTS idx_payments_entity ON payments(entity_name)",
+)
+
+# One row per source file: how many elements are committed, and which version
+# of the file they came from (a changed file restarts from zero).
+PROGRESS_DDL = '''
+CREATE TABLE IF NOT EXISTS migration_progress (
+    source TEXT PRIMARY KEY,
+    rows_done INTEGER,
+    file_size INTEGER,
+    file_mtime_ns INTEGER
+)
+'''
+
+
+def _column_names(columns_ddl):
+    return [line.split()[0] for line in columns_ddl.strip().splitlines()]
+
+
+def _insert_sql(table, key, columns, upsert):
+    placeholders = ', '.join('?' * len(columns))
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    if not upsert:
+        # Fresh table: the first row for a key wins, like the JSON repository
+        return sql.replace('INSERT', 'INSERT OR IGNORE', 1)
+    updates = ', '.join(f"{c} = excluded.{c}" for c in columns if c != key)
+    return f"{sql} ON CONFLICT({key}) DO UPDATE SET {updates}"
+
+
+def _add_missing_columns(conn, table, columns_ddl):
+    """Upserting into a database built by an older version: add columns it lacks (NULL until rewritten)."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for line in columns_ddl.strip().splitlines():
+        column = line.strip().rstrip(',')
+        if column.split()[0] not in existing and 'PRIMARY KEY' not in column:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+
+
+def _checkpoint(conn, source):
+    row = conn.execute("SELECT rows_done, file_size, file_mtime_ns FROM migration_progress WHERE source = ?", (source,)).fetchone()
+    return row or (0, None, None)
+
+
+def load_table(conn, table, data_dir, upsert, resume, batch_size):
+    """Stream one JSON file into its table; returns (rows written, seconds)."""
+    source, key, columns_ddl, to_row = TABLES[table]
+    path = os.path.join(data_dir, source)
+    if not os.path.exists(path):
+        print(f"  {table}: {source} not found, skipped")
+        return 0, 0.0
+
+    st = os.stat(path)
+    skip = 0
+    if resume:
+        done, size, mtime_ns = _checkpoint(conn, source)
+        if (size, mtime_ns) == (st.st_size, st.st_mtime_ns):
+            skip = done
+
+    sql = _insert_sql(table, key, _column_names(columns_ddl), upsert)
+    progress_sql = "INSERT OR REPLACE INTO migration_progress (source, rows_done, file_size, file_mtime_ns) VALUES (?, ?, ?, ?)"
+
+    start = time.perf_counter()
+    written, seen, batch = 0, 0, []
+
+    def flush():
+        nonlocal written, batch
+        with conn:  # batch and checkpoint commit together
+            conn.executemany(sql, batch)
+            conn.execute(progress_sql, (source, seen, st.st_size, st.st_mtime_ns))
+        written += len(batch)
+        batch = []
+
+    for item in iter_json_array(path):
+        seen += 1
+        if seen <= skip:
+            continue
+        batch.append(to_row(item))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    elapsed = time.perf_counter() - start
+    rate = written / elapsed if elapsed else 0
+    resumed = f", resumed after {skip:,}" if skip else ""
+    print(f"  {table}: {written:,} rows in {elapsed:.2f}s ({rate:,.0f} rows/s{resumed})")
+    return written, elapsed
+
+
+def migrate(data_dir=DATA_DIR, db_path=DB_PATH, upsert=False, resume=False, batch_size=BATCH_SIZE):
+    upsert = upsert or resume
+    conn = sqlite3.connect(db_path)
+    # WAL matches the API's connection pool; fsync only at checkpoints during the load
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-262144")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+    with conn:
+        if not upsert:
+            for table in TABLES:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute("DROP TABLE IF EXISTS migration_progress")
+        for table, (_, _, columns_ddl, _) in TABLES.items():
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns_ddl})")
+            _add_missing_columns(conn, table, columns_ddl)
+        conn.execute(PROGRESS_DDL)
+
+    mode = "resume" if resume else "upsert" if upsert else "full rebuild"
+    print(f"Migrating {data_dir} -> {db_path} ({mode}, batches of {batch_size:,})")
+    total_rows, total_seconds = 0, 0.0
+    for table in TABLES:
+        rows, seconds = load_table(conn, table, data_dir, upsert, resume, batch_size)
+        total_rows += rows
+        total_seconds += seconds
+
+    # Deferred until the data is in: one sorted build beats per-row index maintenance
+    start = time.perf_counter()
+    with conn:
+        for statement in INDEXES:
+            conn.execute(statement)
+    conn.execute("ANALYZE")
+    print(f"  indexes: built in {time.perf_counter() - start:.2f}s")
+
     conn.close()
-    print("Migration successful")
+    rate = total_rows / total_seconds if total_seconds else 0
+    print(f"Migration successful: {total_rows:,} rows ({rate:,.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--upsert', action='store_true', help='keep existing tables and upsert rows instead of rebuilding')
+    parser.add_argument('--resume', action='store_true', help='continue from the last committed batch (implies --upsert)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='rows per executemany batch/transaction')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args()
+    migrate(args.data_dir, args.db, upsert=args.upsert, resume=args.resume, batch_size=args.batch_size)
+
 
 if __name__ == '__main__':
-    migrate()
+    main()
@@ -5,8 +5,10 @@ from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from services.data_loader import load_mock_data
-from utils.response import success_response, paginated_response
+from services.async_loader import find_mock_record_async, load_mock_data_async, run_blocking
+from services.export import export_response
+from services.pagination import cursor_page
+from utils.response import success_response, paginated_response, cursor_response
 
 router = APIRouter(prefix="/audit", tags=["audit"])
 
@@ -35,8 +37,9 @@ async def get_audits(
     status: Optional[str] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (nextCursor); empty for the first page"),
 ):
-    audits = load_mock_data("audits")
+    audits = await load_mock_data_async("audits")
 
     if type:
         audits = [a for a in audits if a.get("type", "").lower() == type.lower()]
@@ -44,6 +47,10 @@ async def get_audits(
     if status:
         audits = [a for a in audits if a.get("status", "").lower() == status.lower()]
 
+    if cursor is not None:
+        items, next_cursor = cursor_page(audits, cursor, "audit", limit)
+        return cursor_response(items, next_cursor, limit, items_key="audits", message="Audits retrieved")
+
     total = len(audits)
     start = (page - 1) * limit
     end = start + limit
@@ -60,8 +67,7 @@ async def get_audits(
 
 @router.get("/audits/{audit_id}")
 async def get_audit_details(audit_id: str):
-    audits = load_mock_data("audits")
-    audit = next((a for a in audits if a["id"] == audit_id), None)
+    audit = await find_mock_record_async("audits", audit_id)
 
     if not audit:
         raise HTTPException(status_code=404, detail="Audit not found")
@@ -88,8 +94,7 @@ async def create_audit(data: CreateAuditRequest):
 @router.put("/audits/{audit_id}")
 async def update_audit(audit_id: str, data: UpdateAuditRequest):
     """Backend team: update in database."""
-    audits = load_mock_data("audits")
-    audit = next((a for a in audits if a["id"] == audit_id), None)
+    audit = await find_mock_record_async("audits", audit_id)
 
     if not audit:
         raise HTTPException(status_code=404, detail="Audit not found")
@@ -110,12 +115,18 @@ async def get_audit_trail(entity_type: str, entity_id: str):
 
 @router.get("/export")
 async def export_audit_report(
-    format: str = Query("pdf"),
+    format: str = Query("csv", description="csv or ndjson"),
     type: Optional[str] = None,
     status: Optional[str] = None,
+    gzip: bool = Query(False, description="Send a .gz file"),
 ):
-    """Backend team: implement actual report file generation."""
-    return success_response(
-        data={"downloadUrl": None, "format": format},
-        message="Export endpoint ready — implement file generation",
-    )
+    """Stream the (filtered) audit records as a CSV or NDJSON download."""
+    audits = await load_mock_data_async("audits")
+
+    if type:
+        audits = [a for a in audits if a.get("type", "").lower() == type.lower()]
+
+    if status:
+        audits = [a for a in audits if a.get("status", "").lower() == status.lower()]
+
+    return export_response(run_blocking, [audits], "audits", format, gzip)
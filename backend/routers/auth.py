@@ -6,7 +6,7 @@ when a database is connected.
 
 from fastapi import APIRouter
 from pydantic import BaseModel
-from services.data_loader import load_mock_data
+from services.async_loader import load_mock_data_async
 from utils.response import success_response, error_response
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -37,7 +37,7 @@ async def login(credentials: LoginRequest):
     if not credentials.userId or not credentials.password:
         return error_response("Invalid credentials", 401)
 
-    user = load_mock_data("user")
+    user = await load_mock_data_async("user")
     return success_response(
         data={"user": user, "token": MOCK_TOKEN},
         message="Login successful",
@@ -55,7 +55,7 @@ async def register(user_data: RegisterRequest):
     Mock register — returns the submitted data as a new user.
     Backend team: replace with real user creation + DB insert.
     """
-    user = load_mock_data("user")
+    user = await load_mock_data_async("user")
     new_user = {**user, "userId": user_data.userId, "email": user_data.email, "name": user_data.name}
     return success_response(
         data={"user": new_user, "token": MOCK_TOKEN},
@@ -78,7 +78,7 @@ async def get_current_user():
     Returns the current user profile.
     Backend team: decode JWT from Authorization header to identify user.
     """
-    user = load_mock_data("user")
+    user = await load_mock_data_async("user")
     return success_response(
         data={"user": user},
         message="User data retrieved",
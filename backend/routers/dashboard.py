@@ -1,28 +1,34 @@
 """Dashboard endpoints — aggregated stats and feeds."""
 
-from fastapi import APIRouter
-from services.data_loader import load_mock_data
+from fastapi import APIRouter, Request
+from services.response_cache import cached_response
 from utils.response import success_response
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
 @router.get("/stats")
-async def get_stats():
-    stats = load_mock_data("dashboardStats")
-    return success_response(data=stats, message="Dashboard stats retrieved")
+async def get_stats(request: Request):
+    return await cached_response(
+        request, ("mock_data.json",),
+        lambda mock: success_response(data=mock.section("dashboardStats"), message="Dashboard stats retrieved"),
+    )
 
 
 @router.get("/contractor-scores")
-async def get_contractor_scores():
-    scores = load_mock_data("contractorScores")
-    return success_response(data=scores, message="Contractor scores retrieved")
+async def get_contractor_scores(request: Request):
+    return await cached_response(
+        request, ("mock_data.json",),
+        lambda mock: success_response(data=mock.section("contractorScores"), message="Contractor scores retrieved"),
+    )
 
 
 @router.get("/anomalies")
-async def get_anomalies():
-    anomalies = load_mock_data("priceAnomalies")
-    return success_response(data=anomalies, message="Anomalies retrieved")
+async def get_anomalies(request: Request):
+    return await cached_response(
+        request, ("mock_data.json",),
+        lambda mock: success_response(data=mock.section("priceAnomalies"), message="Anomalies retrieved"),
+    )
 
 
 @router.get("/recent-activities")
@@ -35,6 +41,8 @@ async def get_recent_activities():
 
 
 @router.get("/ward-feed")
-async def get_ward_feed():
-    feed = load_mock_data("wardFeed")
-    return success_response(data=feed, message="Ward feed retrieved")
+async def get_ward_feed(request: Request):
+    return await cached_response(
+        request, ("mock_data.json",),
+        lambda mock: success_response(data=mock.section("wardFeed"), message="Ward feed retrieved"),
+    )
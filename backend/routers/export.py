@@ -0,0 +1,34 @@
+"""Bulk export endpoints — streaming NDJSON/CSV ledgers for analysts."""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from services.export import export_response
+from services.repository import get_repository
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query("ndjson", description="ndjson or csv"),
+    county: Optional[str] = Query(None, description="Filter by county (payments: matched inside entity_name)"),
+    category: Optional[str] = Query(None, description="Filter by category (tenders, posts)"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    gzip: bool = Query(False, description="Send a .gz file"),
+):
+    """
+    Stream the full filtered tenders, payments or posts ledger row by row.
+    Memory stays constant however large the export is.
+    """
+    repo = get_repository()
+    if dataset in ("tenders", "posts"):
+        batches = getattr(repo, f"export_{dataset}")(county, category, status)
+    elif dataset == "payments":
+        if category:
+            raise HTTPException(status_code=400, detail="Payments cannot be filtered by category")
+        batches = repo.export_payments(county, status)
+    else:
+        raise HTTPException(status_code=404, detail=f"Unknown export '{dataset}' (tenders, payments or posts)")
+    return export_response(repo.run, batches, dataset, format, gzip)
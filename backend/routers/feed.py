@@ -1,12 +1,17 @@
 """Feed endpoints — ward-level community posts."""
 
+import heapq
+import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Query
 from pydantic import BaseModel
-from services.data_loader import load_mock_data, get_all_posts
-from utils.response import success_response, paginated_response
+from services.async_loader import load_mock_data_async, load_snapshot_async
+from services.indexes import intersect, section_post_index
+from services.pagination import decode_cursor, encode_cursor, feed_key
+from services.repository import get_repository
+from utils.response import success_response, paginated_response, cursor_response
 
 router = APIRouter(prefix="/feed", tags=["feed"])
 
@@ -26,18 +31,43 @@ class CreatePostRequest(BaseModel):
     geoTag: Optional[GeoTag] = None
 
 
+async def _mock_feed():
+    """Mock feedPosts and their ward/county/category indexes."""
+    snapshot = await load_snapshot_async("mock_data.json")
+    return snapshot.section("feedPosts"), section_post_index(snapshot, "feedPosts")
+
+
+def _merge_newest(citizen_posts: list, mock_posts: list, limit: int) -> tuple[list, str | None]:
+    """
+    Merge two newest-first pages (each up to limit + 1 rows after the
+    cursor) into one page and the cursor that continues it.
+    """
+    merged = heapq.nlargest(limit + 1, citizen_posts + mock_posts, key=feed_key)
+    next_cursor = encode_cursor("feed", feed_key(merged[limit - 1])) if len(merged) > limit else None
+    return merged[:limit], next_cursor
+
+
 @router.get("/ward/{ward_id}")
-async def get_ward_feed(ward_id: str):
-    # Merge both data sources
-    citizen_posts = get_all_posts()
-    mock_posts = load_mock_data("feedPosts")
-    all_posts = citizen_posts + mock_posts
-    filtered = [
-        p for p in all_posts
-        if ward_id.lower() in p.get("ward", "").lower()
-        or ward_id.lower() in p.get("wardId", "").lower()
-    ]
-    return success_response(data=filtered, message="Ward feed retrieved")
+async def get_ward_feed(
+    ward_id: str,
+    cursor: Optional[str] = Query(None, description="Keyset cursor (nextCursor); empty for the first page"),
+    limit: int = Query(10, ge=1, le=100),
+):
+    repo = get_repository()
+    if cursor is not None:
+        # Infinite scroll: newest first, each source resumes at the cursor
+        after = decode_cursor(cursor, "feed")
+        citizen_posts = await repo.run(repo.page_ward_feed, ward_id, after, limit + 1)
+        mock_posts, mock_index = await _mock_feed()
+        mock_page = [mock_posts[i] for i in mock_index.newest(mock_index.search_groups(ward_id), after, limit + 1)]
+        items, next_cursor = _merge_newest(citizen_posts, mock_page, limit)
+        return cursor_response(items, next_cursor, limit, items_key="posts", message="Ward feed retrieved")
+
+    # Merge both data sources; each side is an index lookup
+    citizen_posts = await repo.run(repo.ward_feed, ward_id)
+    mock_posts, mock_index = await _mock_feed()
+    filtered = citizen_posts + [mock_posts[i] for i in mock_index.search_ward(ward_id)]
+    return success_response(data=filtered, message="Ward feed retrieved", fast=True)
 
 
 @router.get("/posts")
@@ -46,48 +76,68 @@ async def get_posts(
     category: Optional[str] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (nextCursor); empty for the first page"),
 ):
-    # Merge citizen posts (posts.json) with mock feed posts
-    citizen_posts = get_all_posts()
-    mock_posts = load_mock_data("feedPosts")
-    posts = citizen_posts + mock_posts
-
-    if wardId and wardId not in ("All Activities", ""):
-        posts = [
-            p for p in posts
-            if p.get("ward") == wardId
-            or p.get("wardId") == wardId
-            or (p.get("county") and p.get("county") in wardId)
-            or p.get("category") == wardId
-        ]
-
+    if wardId in ("All Activities", ""):
+        wardId = None
+
+    repo = get_repository()
+    if cursor is not None:
+        # Newest first by (timestamp, id); same filters as the paged listing
+        after = decode_cursor(cursor, "feed")
+        citizen_posts = await repo.run(repo.page_posts, wardId, category, after, limit + 1)
+        mock_posts, mock_index = await _mock_feed()
+        mock_page = [mock_posts[i] for i in mock_index.newest_matching(mock_posts, wardId, category, after, limit + 1)]
+        items, next_cursor = _merge_newest(citizen_posts, mock_page, limit)
+        return cursor_response(items, next_cursor, limit, items_key="posts", message="Feed posts retrieved")
+
+    # Merge citizen posts (posts.json) with mock feed posts. Matches on ward,
+    # wardId, category or a county named in the filter label, plus an
+    # optional case-insensitive category, are index lookups on both sides.
+    citizen_posts = await repo.run(repo.list_posts, wardId, category)
+    mock_posts, mock_index = await _mock_feed()
+    id_lists = []
+    if wardId:
+        id_lists.append(mock_index.match_ward(wardId))
     if category:
-        posts = [p for p in posts if p.get("category", "").lower() == category.lower()]
+        id_lists.append(mock_index.category(category))
+    mock_ids = intersect(*id_lists) if id_lists else range(len(mock_posts))
 
-    total = len(posts)
+    # Page through citizen posts then mock posts without concatenating them
+    total = len(citizen_posts) + len(mock_ids)
     start = (page - 1) * limit
     end = start + limit
+    offset = len(citizen_posts)
+    items = list(citizen_posts[start:end]) + [
+        mock_posts[i] for i in mock_ids[max(0, start - offset) : max(0, end - offset)]
+    ]
 
     return paginated_response(
-        items=posts[start:end],
+        items=items,
         total=total,
         page=page,
         limit=limit,
         items_key="posts",
         message="Feed posts retrieved",
+        fast=True,
     )
 
 
 @router.post("/posts")
 async def create_post(post_data: CreatePostRequest):
-    """
-    Backend team: save to database and return the created post.
-    """
-    user = load_mock_data("user")
+    """Persist a citizen post; it shows up in feeds and ward filters immediately."""
+    user = await load_mock_data_async("user")
+    wards = await load_mock_data_async("wards")
+    county = next(
+        (w.get("county") for w in wards if post_data.ward in (w.get("name"), w.get("id"))),
+        None,
+    )
     new_post = {
-        "id": f"post_{int(datetime.now(timezone.utc).timestamp())}",
+        "id": f"post_{uuid.uuid4().hex[:12]}",
         "author": {"id": user["id"], "name": user["name"], "avatar": "", "verified": True},
         "ward": post_data.ward,
+        "wardId": post_data.ward,
+        "county": county,
         "title": post_data.title,
         "content": post_data.content,
         "images": post_data.images,
@@ -97,5 +147,8 @@ async def create_post(post_data: CreatePostRequest):
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "referenceId": None,
         "geoTag": post_data.geoTag.model_dump() if post_data.geoTag else None,
+        "is_demo_data": True,
     }
+    repo = get_repository()
+    await repo.run(repo.create_post, new_post)
     return success_response(data=new_post, message="Post created successfully", status_code=201)
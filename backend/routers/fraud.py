@@ -5,8 +5,11 @@ from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from services.data_loader import load_mock_data
-from utils.response import success_response, paginated_response
+from services.async_loader import find_mock_record_async, load_mock_data_async
+from services.patterns import pattern_cache
+from services.pagination import cursor_page
+from services.repository import get_repository
+from utils.response import success_response, paginated_response, cursor_response
 
 router = APIRouter(prefix="/fraud", tags=["fraud"])
 
@@ -38,8 +41,9 @@ async def get_alerts(
     status: Optional[str] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (nextCursor); empty for the first page"),
 ):
-    alerts = load_mock_data("fraudAlerts")
+    alerts = await load_mock_data_async("fraudAlerts")
 
     if severity:
         alerts = [a for a in alerts if a.get("severity", "").lower() == severity.lower()]
@@ -47,6 +51,10 @@ async def get_alerts(
     if status:
         alerts = [a for a in alerts if a.get("status", "").lower() == status.lower()]
 
+    if cursor is not None:
+        items, next_cursor = cursor_page(alerts, cursor, "alert", limit)
+        return cursor_response(items, next_cursor, limit, items_key="alerts", message="Fraud alerts retrieved")
+
     total = len(alerts)
     start = (page - 1) * limit
     end = start + limit
@@ -63,8 +71,7 @@ async def get_alerts(
 
 @router.get("/alerts/{alert_id}")
 async def get_alert_details(alert_id: str):
-    alerts = load_mock_data("fraudAlerts")
-    alert = next((a for a in alerts if a["id"] == alert_id), None)
+    alert = await find_mock_record_async("fraudAlerts", alert_id)
 
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
@@ -90,8 +97,7 @@ async def create_alert(data: CreateAlertRequest):
 @router.put("/alerts/{alert_id}")
 async def update_alert(alert_id: str, data: UpdateAlertRequest):
     """Backend team: update in database."""
-    alerts = load_mock_data("fraudAlerts")
-    alert = next((a for a in alerts if a["id"] == alert_id), None)
+    alert = await find_mock_record_async("fraudAlerts", alert_id)
 
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
@@ -104,22 +110,45 @@ async def update_alert(alert_id: str, data: UpdateAlertRequest):
 @router.patch("/alerts/{alert_id}/resolve")
 async def resolve_alert(alert_id: str, data: ResolveAlertRequest = ResolveAlertRequest()):
     """Backend team: update status in database."""
-    alerts = load_mock_data("fraudAlerts")
-    alert = next((a for a in alerts if a["id"] == alert_id), None)
+    alert = await find_mock_record_async("fraudAlerts", alert_id)
 
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
 
-    alert["status"] = "resolved"
-    alert["resolutionNotes"] = data.resolutionNotes
-    alert["resolvedAt"] = datetime.now(timezone.utc).isoformat()
+    # Copy before editing: the loaded record is shared through the dataset cache.
+    alert = {
+        **alert,
+        "status": "resolved",
+        "resolutionNotes": data.resolutionNotes,
+        "resolvedAt": datetime.now(timezone.utc).isoformat(),
+    }
     return success_response(data=alert, message="Alert resolved successfully")
 
 
 @router.get("/patterns")
-async def get_patterns():
-    """Backend team: implement pattern detection logic."""
-    return success_response(data=[], message="Fraud patterns retrieved")
+async def get_patterns(
+    type: Optional[str] = Query(None, description="shared_attributes, award_concentration or price_outlier"),
+    severity: Optional[str] = None,
+    county: Optional[str] = None,
+):
+    """
+    Detected fraud patterns, most severe first. Served from the last
+    detection run; new data triggers a background re-run (services/patterns.py).
+    """
+    repo = get_repository()
+    patterns, fresh = await repo.run(pattern_cache.get, repo)
+
+    if type:
+        patterns = [p for p in patterns if p["type"] == type.lower()]
+
+    if severity:
+        patterns = [p for p in patterns if p["severity"] == severity.lower()]
+
+    if county:
+        patterns = [p for p in patterns if (p["county"] or "").lower() == county.lower()]
+
+    message = "Fraud patterns retrieved" if fresh else "Fraud patterns retrieved (refresh in progress)"
+    return success_response(data=patterns, message=message)
 
 
 @router.get("/risk-assessment/{tender_id}")
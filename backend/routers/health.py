@@ -1,14 +1,28 @@
 """Health check endpoint — the frontend pings this to detect the backend."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from config import HEALTH_CACHE_SECONDS
+from services.data_loader import cache_stats
+from services.repository import get_repository
+from services.response_cache import cached_response, response_cache_stats
 from utils.response import success_response
 
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
-async def health_check():
-    return success_response(
-        data={"status": "healthy"},
-        message="API is healthy",
+async def health_check(request: Request):
+    # Polled constantly: one body per HEALTH_CACHE_SECONDS, 304 for repeat probes
+    return await cached_response(
+        request, (),
+        lambda: success_response(
+            data={
+                "status": "healthy",
+                "dataCache": cache_stats(),
+                "responseCache": response_cache_stats(),
+                "storage": get_repository().stats(),
+            },
+            message="API is healthy",
+        ),
+        ttl=HEALTH_CACHE_SECONDS,
     )
@@ -5,8 +5,11 @@ from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from services.data_loader import load_mock_data
-from utils.response import success_response, error_response, paginated_response
+from config import FUZZY_MIN_QUERY
+from services.async_loader import find_mock_record_async, load_mock_data_async, load_snapshot_async, run_blocking
+from services.fuzzy import contractor_fuzzy_index
+from services.pagination import cursor_page
+from utils.response import success_response, error_response, paginated_response, cursor_response
 
 router = APIRouter(prefix="/registry", tags=["registry"])
 
@@ -40,6 +43,21 @@ class BlacklistRequest(BaseModel):
     reason: str
 
 
+def _search_contractors(snapshot, search: str) -> list:
+    """
+    Substring hits on name or KRA PIN first, in registry order, then
+    typo-tolerant hits ranked by trigram similarity of name, directors or
+    KRA PIN (services/fuzzy.py).
+    """
+    rows = snapshot.section("contractors")
+    index = contractor_fuzzy_index(snapshot, "contractors")
+    hit_ids = index.contains(search)
+    if len(search.strip()) >= FUZZY_MIN_QUERY:
+        seen = set(hit_ids)
+        hit_ids += [m["row"] for m in index.match(search) if m["row"] not in seen]
+    return [rows[i] for i in hit_ids]
+
+
 @router.get("/contractors")
 async def get_contractors(
     search: Optional[str] = None,
@@ -48,16 +66,13 @@ async def get_contractors(
     status: Optional[str] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (nextCursor); empty for the first page"),
 ):
-    contractors = load_mock_data("contractors")
-
     if search:
-        q = search.lower()
-        contractors = [
-            c for c in contractors
-            if q in c.get("name", "").lower()
-            or q in c.get("kraPin", "").lower()
-        ]
+        snapshot = await load_snapshot_async("mock_data.json")
+        contractors = await run_blocking(_search_contractors, snapshot, search)
+    else:
+        contractors = await load_mock_data_async("contractors")
 
     if category:
         contractors = [c for c in contractors if c.get("category", "").lower() == category.lower()]
@@ -68,6 +83,10 @@ async def get_contractors(
     if status:
         contractors = [c for c in contractors if c.get("status", "").lower() == status.lower()]
 
+    if cursor is not None:
+        items, next_cursor = cursor_page(contractors, cursor, "contractor", limit)
+        return cursor_response(items, next_cursor, limit, items_key="contractors", message="Contractors retrieved")
+
     total = len(contractors)
     start = (page - 1) * limit
     end = start + limit
@@ -79,13 +98,31 @@ async def get_contractors(
         limit=limit,
         items_key="contractors",
         message="Contractors retrieved",
+        fast=True,
     )
 
 
+@router.get("/duplicates")
+async def get_duplicate_contractors(threshold: float = Query(0.8, ge=0.5, le=1.0)):
+    """Pairs of contractors registered under near-identical names or KRA PINs."""
+    snapshot = await load_snapshot_async("mock_data.json")
+    pairs = await run_blocking(lambda: contractor_fuzzy_index(snapshot, "contractors").near_duplicates(threshold))
+    rows = snapshot.section("contractors")
+    duplicates = [
+        {
+            "contractors": [{"id": rows[i].get("id"), "name": rows[i].get("name")} for i in pair["rows"]],
+            "field": pair["field"],
+            "values": pair["values"],
+            "score": pair["score"],
+        }
+        for pair in pairs
+    ]
+    return success_response(data=duplicates, message="Duplicate contractors retrieved")
+
+
 @router.get("/contractors/{contractor_id}")
 async def get_contractor_details(contractor_id: str):
-    contractors = load_mock_data("contractors")
-    contractor = next((c for c in contractors if c["id"] == contractor_id), None)
+    contractor = await find_mock_record_async("contractors", contractor_id)
 
     if not contractor:
         raise HTTPException(status_code=404, detail="Contractor not found")
@@ -115,8 +152,7 @@ async def create_contractor(data: CreateContractorRequest):
 @router.put("/contractors/{contractor_id}")
 async def update_contractor(contractor_id: str, data: UpdateContractorRequest):
     """Backend team: update in database."""
-    contractors = load_mock_data("contractors")
-    contractor = next((c for c in contractors if c["id"] == contractor_id), None)
+    contractor = await find_mock_record_async("contractors", contractor_id)
 
     if not contractor:
         raise HTTPException(status_code=404, detail="Contractor not found")
@@ -129,8 +165,7 @@ async def update_contractor(contractor_id: str, data: UpdateContractorRequest):
 @router.delete("/contractors/{contractor_id}")
 async def delete_contractor(contractor_id: str):
     """Backend team: delete from database."""
-    contractors = load_mock_data("contractors")
-    contractor = next((c for c in contractors if c["id"] == contractor_id), None)
+    contractor = await find_mock_record_async("contractors", contractor_id)
 
     if not contractor:
         raise HTTPException(status_code=404, detail="Contractor not found")
@@ -141,20 +176,18 @@ async def delete_contractor(contractor_id: str):
 @router.post("/contractors/{contractor_id}/blacklist")
 async def blacklist_contractor(contractor_id: str, data: BlacklistRequest):
     """Backend team: update blacklist status in database."""
-    contractors = load_mock_data("contractors")
-    contractor = next((c for c in contractors if c["id"] == contractor_id), None)
+    contractor = await find_mock_record_async("contractors", contractor_id)
 
     if not contractor:
         raise HTTPException(status_code=404, detail="Contractor not found")
 
-    contractor["blacklisted"] = True
-    contractor["blacklistReason"] = data.reason
-    contractor["status"] = "blacklisted"
+    # Copy before editing: the loaded record is shared through the dataset cache.
+    contractor = {**contractor, "blacklisted": True, "blacklistReason": data.reason, "status": "blacklisted"}
     return success_response(data=contractor, message="Contractor blacklisted successfully")
 
 
 @router.get("/blacklisted")
 async def get_blacklisted_contractors():
-    contractors = load_mock_data("contractors")
+    contractors = await load_mock_data_async("contractors")
     blacklisted = [c for c in contractors if c.get("blacklisted")]
     return success_response(data=blacklisted, message="Blacklisted contractors retrieved")
@@ -1,12 +1,14 @@
 """Reports endpoints — report listing, generation, export."""
 
-from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from services.data_loader import load_mock_data
-from utils.response import success_response, paginated_response
+from services.async_loader import find_mock_record_async, load_mock_data_async, run_blocking
+from services.pagination import cursor_page
+from services.report_jobs import ARTIFACT_FORMATS, TEMPLATES, get_report_queue
+from utils.response import success_response, paginated_response, cursor_response
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
@@ -27,8 +29,11 @@ async def get_reports(
     period: Optional[str] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (nextCursor); empty for the first page"),
 ):
-    reports = load_mock_data("reports")
+    # Generated reports (newest first), then the published archive
+    generated = await run_blocking(lambda: get_report_queue().list())
+    reports = generated + list(await load_mock_data_async("reports"))
 
     if type:
         reports = [r for r in reports if r.get("type", "").lower() == type.lower()]
@@ -36,6 +41,10 @@ async def get_reports(
     if category:
         reports = [r for r in reports if r.get("category", "").lower() == category.lower()]
 
+    if cursor is not None:
+        items, next_cursor = cursor_page(reports, cursor, "report", limit)
+        return cursor_response(items, next_cursor, limit, items_key="reports", message="Reports retrieved")
+
     total = len(reports)
     start = (page - 1) * limit
     end = start + limit
@@ -52,23 +61,15 @@ async def get_reports(
 
 @router.get("/templates")
 async def get_report_templates():
-    """Backend team: return actual report templates."""
-    return success_response(
-        data=[
-            {"id": "tpl_001", "name": "Blacklist Summary", "type": "summary", "category": "blacklist"},
-            {"id": "tpl_002", "name": "Fraud Monthly", "type": "monthly", "category": "fraud"},
-            {"id": "tpl_003", "name": "Compliance Annual", "type": "annual", "category": "compliance"},
-            {"id": "tpl_004", "name": "Compliance Monthly", "type": "monthly", "category": "compliance"},
-            {"id": "tpl_005", "name": "Compliance Quarterly", "type": "quarterly", "category": "compliance"},
-        ],
-        message="Report templates retrieved",
-    )
+    return success_response(data=list(TEMPLATES), message="Report templates retrieved")
 
 
 @router.get("/{report_id}")
 async def get_report_details(report_id: str):
-    reports = load_mock_data("reports")
-    report = next((r for r in reports if r["id"] == report_id), None)
+    """Generated reports carry `status` (queued, generating, published, failed) and `progress` (0-1)."""
+    report = await run_blocking(lambda: get_report_queue().get(report_id))
+    if report is None:
+        report = await find_mock_record_async("reports", report_id)
 
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
@@ -78,31 +79,41 @@ async def get_report_details(report_id: str):
 
 @router.post("/generate")
 async def generate_report(data: GenerateReportRequest):
-    """Backend team: implement actual report generation."""
-    new_report = {
-        "id": f"report_{int(datetime.now(timezone.utc).timestamp())}",
-        "title": data.title,
-        "description": f"Auto-generated {data.type} report for {data.period}",
-        "type": data.type,
-        "category": data.category,
-        "period": data.period,
-        "generatedAt": datetime.now(timezone.utc).isoformat(),
-        "generatedBy": "System",
-        "status": "generating",
-        "fileUrl": None,
-        "size": None,
-        "pageCount": None,
-        "recipients": data.recipients,
-        "accessLevel": "restricted",
-    }
-    return success_response(data=new_report, message="Report generation started", status_code=201)
+    """
+    Queue a report rendered from the matching template. Poll /reports/{id}
+    for progress; an identical request already in progress is returned as is.
+    """
+    try:
+        report, created = await run_blocking(
+            lambda: get_report_queue().submit(
+                data.title, data.type, data.category, data.period, data.filters, data.recipients
+            )
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    if not created:
+        return success_response(data=report, message="Report generation already in progress")
+    return success_response(data=report, message="Report generation started", status_code=201)
 
 
 @router.get("/{report_id}/export")
-async def export_report(report_id: str, format: str = Query("pdf")):
-    """Backend team: implement actual file download."""
-    reports = load_mock_data("reports")
-    report = next((r for r in reports if r["id"] == report_id), None)
+async def export_report(report_id: str, format: str = Query("json", description="json or md")):
+    queue = await run_blocking(get_report_queue)
+    job = await run_blocking(queue.get, report_id)
+    if job is not None:
+        if format not in ARTIFACT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported report format '{format}' (use json or md)")
+        if job["status"] != "published":
+            raise HTTPException(status_code=409, detail=f"Report is {job['status']} ({round(job['progress'] * 100)}%)")
+        # Rendered once when the job finished; served from disk from then on
+        return FileResponse(
+            queue.artifact_path(report_id, format),
+            media_type=ARTIFACT_FORMATS[format],
+            filename=f"{report_id}.{format}",
+        )
+
+    report = await find_mock_record_async("reports", report_id)
 
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
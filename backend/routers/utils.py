@@ -1,10 +1,11 @@
 """Utility endpoints — search, wards, counties, file upload."""
 
-import json
 from typing import Optional
 
-from fastapi import APIRouter, File, Form, Query, UploadFile
-from services.data_loader import load_mock_data
+from fastapi import APIRouter, File, Form, Query, Request, UploadFile
+from services import search as search_service
+from services.async_loader import prefetch, run_blocking
+from services.response_cache import cached_response
 from utils.response import success_response
 
 router = APIRouter(prefix="/utils", tags=["utils"])
@@ -30,73 +31,34 @@ async def upload_file(file: UploadFile = File(...), folder: Optional[str] = Form
 @router.get("/search")
 async def search(
     q: str = Query(...),
-    type: Optional[str] = None,
+    type: Optional[str] = Query(None, description="Comma-separated: contractor, fraud, audit, report, tender, post"),
+    limit: int = Query(10, ge=1, le=50),
 ):
-    """Simple text search across all mock data collections."""
-    query = q.lower()
-    results = []
-
-    # Search contractors
-    if not type or type == "contractor":
-        for c in load_mock_data("contractors"):
-            if query in json.dumps(c).lower():
-                results.append({
-                    "id": c["id"],
-                    "type": "contractor",
-                    "title": c["name"],
-                    "description": f"{c['category']} — {c['region']}",
-                    "url": f"/registry/contractors/{c['id']}",
-                })
-
-    # Search fraud alerts
-    if not type or type == "fraud":
-        for a in load_mock_data("fraudAlerts"):
-            if query in json.dumps(a).lower():
-                results.append({
-                    "id": a["id"],
-                    "type": "fraud_alert",
-                    "title": a["title"],
-                    "description": a["description"][:100],
-                    "url": f"/fraud/alerts/{a['id']}",
-                })
-
-    # Search audits
-    if not type or type == "audit":
-        for a in load_mock_data("audits"):
-            if query in json.dumps(a).lower():
-                results.append({
-                    "id": a["id"],
-                    "type": "audit",
-                    "title": a["title"],
-                    "description": a["description"][:100],
-                    "url": f"/audit/audits/{a['id']}",
-                })
-
-    # Search reports
-    if not type or type == "report":
-        for r in load_mock_data("reports"):
-            if query in json.dumps(r).lower():
-                results.append({
-                    "id": r["id"],
-                    "type": "report",
-                    "title": r["title"],
-                    "description": r["description"][:100],
-                    "url": f"/reports/{r['id']}",
-                })
-
+    """
+    Ranked full-text search over contractors, fraud alerts, audits, reports,
+    tenders and citizen posts. Terms match whole words or word prefixes
+    (names, KRA PINs, titles, descriptions); see services/search.py.
+    """
+    types = {t.strip() for t in type.split(",")} if type else None
+    await prefetch(*search_service.SEARCH_FILES)
+    results = await run_blocking(search_service.search, q, types, limit)
     return success_response(
-        data={"results": results[:10]},
+        data={"results": results},
         message="Search results retrieved",
     )
 
 
 @router.get("/wards")
-async def get_wards():
-    wards = load_mock_data("wards")
-    return success_response(data=wards, message="Wards retrieved")
+async def get_wards(request: Request):
+    return await cached_response(
+        request, ("mock_data.json",),
+        lambda mock: success_response(data=mock.section("wards"), message="Wards retrieved"),
+    )
 
 
 @router.get("/counties")
-async def get_counties():
-    counties = load_mock_data("counties")
-    return success_response(data=counties, message="Counties retrieved")
+async def get_counties(request: Request):
+    return await cached_response(
+        request, ("mock_data.json",),
+        lambda mock: success_response(data=mock.section("counties"), message="Counties retrieved"),
+    )
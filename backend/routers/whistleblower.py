@@ -0,0 +1,27 @@
+"""Whistleblower endpoints — anonymous report intake."""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from services.async_loader import run_blocking
+from services.whistleblower import save_report
+from utils.response import success_response
+
+router = APIRouter(prefix="/whistleblower", tags=["whistleblower"])
+
+
+class WhistleblowerReportRequest(BaseModel):
+    project_ref: str
+    description: str
+    evidence_url: Optional[str] = None
+
+
+@router.post("/reports")
+async def submit_report(report: WhistleblowerReportRequest):
+    """Append an anonymous report; the reference number is the only way to follow it up."""
+    # The append waits for fsync (group commit), so keep it off the event loop
+    result = await run_blocking(save_report, report.model_dump())
+    if result is None:
+        raise HTTPException(status_code=500, detail="Report could not be saved, please try again")
+    return success_response(data=result, message="Report received", status_code=201)
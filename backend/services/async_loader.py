@@ -0,0 +1,69 @@
+"""
+Async counterparts of services/data_loader.py for `async def` handlers.
+
+A request whose data file was validated recently is served straight from
+the cached snapshot without touching the disk. Otherwise the stat (and the
+re-parse, if the file changed) runs on a small thread pool, so one slow
+disk read or large parse never stalls other requests on the event loop:
+
+    contractors = await load_mock_data_async("contractors")
+    alert = await find_mock_record_async("fraudAlerts", alert_id)
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import DATA_LOADER_THREADS
+from services.data_loader import dataset_cache, find_row_id, load_snapshot
+from services.snapshot import Snapshot
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(DATA_LOADER_THREADS, thread_name_prefix="data-loader")
+    return _executor
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking call on the data loader threads."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def load_snapshot_async(filename: str) -> Snapshot:
+    entry = dataset_cache.peek(filename)
+    if entry is not None:
+        return entry.snapshot
+    return await run_blocking(load_snapshot, filename)
+
+
+async def prefetch(*filenames: str) -> None:
+    """Make sure the cached copies of filenames are fresh before sync code reads them."""
+    await asyncio.gather(*(load_snapshot_async(name) for name in filenames))
+
+
+async def load_json_async(filename: str) -> list | dict:
+    return (await load_snapshot_async(filename)).rows
+
+
+async def load_mock_data_async(key: str | None = None):
+    data = await load_json_async("mock_data.json")
+    if key and isinstance(data, dict):
+        return data.get(key, [])
+    return data
+
+
+async def find_mock_record_async(key: str, record_id):
+    snapshot = await load_snapshot_async("mock_data.json")
+    row_id = find_row_id(snapshot, record_id, section=key)
+    if row_id is None:
+        return None
+    return snapshot.section(key)[row_id]
@@ -0,0 +1,137 @@
+"""
+Optional NumPy columnar store for tender.json and payment.json.
+
+Numeric fields become NumPy arrays and categorical fields (county, category,
+status, contractor_id, entity_name) become integer-coded columns, so
+aggregates and ratio thresholds run vectorized instead of as per-dict Python
+loops. Columns are built once per dataset snapshot:
+
+    cols = load_snapshot("tender.json").derive("columns", tender_columns)
+
+NumPy is an optional dependency. When it is not installed `tender_columns`
+and `payment_columns` return None and every caller keeps its pure-Python
+path, which produces identical results.
+"""
+
+from config import CHRONIC_PENDING_DAYS, PRICE_ANOMALY_MULTIPLIER
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _numeric(values):
+    """int64 when every value is an int (exact sums), float64 otherwise."""
+    if all(type(v) is int for v in values):
+        return np.asarray(values, dtype=np.int64)
+    return np.asarray([v if isinstance(v, (int, float)) else 0 for v in values], dtype=np.float64)
+
+
+class Categorical:
+    """Integer-coded column; labels keep first-seen order."""
+
+    __slots__ = ("codes", "labels", "_lookup")
+
+    def __init__(self, values):
+        lookup: dict = {}
+        codes = np.fromiter(
+            (lookup.setdefault(v, len(lookup)) for v in values),
+            dtype=np.int32,
+            count=len(values),
+        )
+        self.codes = codes
+        self.labels = list(lookup)
+        self._lookup = lookup
+
+    def code(self, label) -> int:
+        return self._lookup.get(label, -1)
+
+    def mask(self, label):
+        return self.codes == self.code(label)
+
+    def sum_by_code(self, weights=None):
+        """Per-label sums of weights (or counts), indexed by code."""
+        return np.bincount(self.codes, weights=weights, minlength=len(self.labels))
+
+
+class TenderColumns:
+    __slots__ = ("size", "ids", "value", "benchmark_value", "county", "category", "status", "contractor_id")
+
+    def __init__(self, rows):
+        self.size = len(rows)
+        self.ids = [t.get("id") for t in rows]
+        self.value = _numeric([t.get("value", 0) for t in rows])
+        self.benchmark_value = _numeric([t.get("benchmark_value", 1) for t in rows])
+        self.county = Categorical([t.get("county") for t in rows])
+        self.category = Categorical([t.get("category") for t in rows])
+        self.status = Categorical([t.get("status") for t in rows])
+        self.contractor_id = Categorical([t.get("contractor_id") for t in rows])
+
+    def price_ratio(self):
+        """value / benchmark_value, NaN where the benchmark is zero."""
+        bench = self.benchmark_value
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = self.value / bench
+        ratio[bench == 0] = np.nan
+        return ratio
+
+    def anomaly_mask(self, multiplier: float = PRICE_ANOMALY_MULTIPLIER):
+        with np.errstate(invalid="ignore"):
+            return self.price_ratio() > multiplier
+
+    def delayed_mask(self, delayed_refs):
+        return np.fromiter((i in delayed_refs for i in self.ids), dtype=bool, count=self.size)
+
+    def group_totals(self, column: str = "county") -> list:
+        """[(label, tender_count, total_value)] per county/category/status."""
+        col = getattr(self, column)
+        counts = col.sum_by_code()
+        totals = col.sum_by_code(self.value)
+        if self.value.dtype == np.int64:
+            totals = totals.round().astype(np.int64)
+        return [
+            (label, int(counts[code]), totals[code].item())
+            for code, label in enumerate(col.labels)
+        ]
+
+    def penalty_by(self, column: str, delayed_refs, stalled: int, anomaly: int, delayed: int):
+        """Per-label penalty sums for one of the categorical columns."""
+        per_row = (
+            stalled * self.status.mask("Stalled")
+            + anomaly * self.anomaly_mask()
+            + delayed * self.delayed_mask(delayed_refs)
+        )
+        return getattr(self, column).sum_by_code(per_row).round().astype(np.int64)
+
+
+class PaymentColumns:
+    __slots__ = ("size", "days_outstanding", "status", "entity_name")
+
+    def __init__(self, rows):
+        self.size = len(rows)
+        self.days_outstanding = _numeric([p.get("days_outstanding", 0) or 0 for p in rows])
+        self.status = Categorical([p.get("status") for p in rows])
+        self.entity_name = Categorical([p.get("entity_name") or "" for p in rows])
+
+    def on_time_mask(self):
+        return self.status.mask("Paid") & (self.days_outstanding <= 60)
+
+    def chronic_mask(self):
+        return self.status.mask("Pending") & (self.days_outstanding > CHRONIC_PENDING_DAYS)
+
+
+def tender_columns(snapshot) -> TenderColumns | None:
+    if np is None or not isinstance(snapshot.rows, list):
+        return None
+    return TenderColumns(snapshot.rows)
+
+
+def payment_columns(snapshot) -> PaymentColumns | None:
+    if np is None or not isinstance(snapshot.rows, list):
+        return None
+    return PaymentColumns(snapshot.rows)
@@ -1,14 +1,45 @@
 """
 Data loader utilities for reading/writing JSON data files.
+
+Parsed files are kept in a process-wide cache and revalidated against the
+file's mtime/size (at most every DATA_REVALIDATE_SECONDS), so callers see
+current data without paying for a re-parse when nothing has changed. Cached
+data is frozen (see services/snapshot.py) because every request shares it.
+
+Files are written atomically (temp file + rename), so readers never see a
+half-written file. `save_json` writes immediately; `update_json` applies a
+mutation in memory at once and leaves the disk write to a write-behind
+thread that coalesces bursts of mutations into one write per file.
+
+Async handlers should use services/async_loader.py, which serves fresh
+cached snapshots directly and moves stats and parses to a thread pool.
 """
 
+import atexit
 import json
+import logging
 import os
 import re
+import tempfile
+import threading
+import time
+
+from config import DATA_REVALIDATE_SECONDS, JSON_COMPACT, WRITE_BEHIND_SECONDS
+from services.indexes import primary_key_index
+from services.jsonstream import iter_json_array
+from services.snapshot import FrozenList, Snapshot, freeze
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional fast encoder
+    orjson = None
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BASE_DIR, "data")
 DB_PATH = os.path.join(BASE_DIR, "transparent_procure.db")
 
+logger = logging.getLogger(__name__)
+
 
 def clean_numerical_value(value):
     """Standardizes currency strings into floats."""
@@ -23,24 +54,332 @@ def clean_numerical_value(value):
     return 0.0
 
 
+def _parse(path: str):
+    """
+    Parse and freeze a data file. Top-level arrays are decoded element by
+    element, so a parse on a worker thread does not hold the GIL (and stall
+    the event loop) for the whole file.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        head = f.read(64).lstrip()
+    try:
+        if head.startswith("["):
+            return FrozenList(freeze(item) for item in iter_json_array(path))
+        with open(path, "r", encoding="utf-8") as f:
+            return freeze(json.load(f))
+    except (json.JSONDecodeError, ValueError):
+        return FrozenList()
+
+
+class _CacheEntry:
+    __slots__ = ("signature", "snapshot", "checked_at", "pinned")
+
+    def __init__(self, signature, snapshot: Snapshot, pinned: bool = False):
+        self.signature = signature
+        self.snapshot = snapshot
+        self.checked_at = time.monotonic()
+        # In-memory data not yet written to disk: served without revalidation
+        self.pinned = pinned
+
+
+class DatasetCache:
+    """
+    Parsed JSON datasets keyed by filename.
+
+    Each entry remembers the (mtime_ns, size) signature of the file it was
+    parsed from. A lookup stats the file and only re-parses when the
+    signature changed; the new entry replaces the old one in a single dict
+    assignment, so concurrent readers see either the old or the new data,
+    never a partial state.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, _CacheEntry] = {}
+        self._file_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def _file_lock(self, filename: str) -> threading.Lock:
+        with self._lock:
+            lock = self._file_locks.get(filename)
+            if lock is None:
+                lock = self._file_locks[filename] = threading.Lock()
+            return lock
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def peek(self, filename: str, max_age: float = DATA_REVALIDATE_SECONDS) -> _CacheEntry | None:
+        """The cached entry if it was validated within max_age seconds (no I/O)."""
+        entry = self._entries.get(filename)
+        if entry is not None and (entry.pinned or time.monotonic() - entry.checked_at < max_age):
+            self._count("hits")
+            return entry
+        return None
+
+    def get(self, filename: str) -> _CacheEntry | None:
+        """Return the current entry for filename, or None if the file is missing."""
+        entry = self.peek(filename)
+        if entry is not None:
+            return entry
+
+        path = os.path.join(DATA_PATH, filename)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self._entries.pop(filename, None)
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+
+        entry = self._entries.get(filename)
+        if entry is not None and entry.signature == signature:
+            entry.checked_at = time.monotonic()
+            self._count("hits")
+            return entry
+
+        # Only one thread parses a given file; the others wait and reuse it.
+        with self._file_lock(filename):
+            entry = self._entries.get(filename)
+            if entry is not None and entry.signature == signature:
+                entry.checked_at = time.monotonic()
+                self._count("hits")
+                return entry
+
+            data = _parse(path)
+
+            with self._lock:
+                current = self._entries.get(filename)
+                if current is not None and current.pinned:
+                    return current  # published while we parsed; newer than the file
+                self._version += 1
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self.reloads += 1
+                new_entry = _CacheEntry(signature, Snapshot(filename, self._version, data))
+                self._entries[filename] = new_entry
+            return new_entry
+
+    def publish(self, filename: str, rows, appended: bool = False) -> Snapshot:
+        """
+        Serve frozen in-memory rows as the current version ahead of their
+        write to disk. `appended` means rows only extend the current version's
+        rows, so the new snapshot keeps its lineage.
+        """
+        with self._lock:
+            self._version += 1
+            old = self._entries.get(filename)
+            lineage = old.snapshot.lineage if appended and old is not None else None
+            snapshot = Snapshot(filename, self._version, rows, lineage)
+            entry = _CacheEntry(old and old.signature, snapshot, pinned=True)
+            self._entries[filename] = entry
+        return entry.snapshot
+
+    def settle(self, filename: str, rows, signature) -> None:
+        """`rows` reached disk with this signature; resume normal revalidation if still current."""
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None and entry.snapshot.rows is rows:
+                entry.signature = signature
+                entry.checked_at = time.monotonic()
+                entry.pinned = False
+
+    def invalidate(self, filename: str | None = None) -> None:
+        """Drop one cached file (or all of them) so the next read re-parses."""
+        if filename is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(filename, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "files": {name: e.snapshot.version for name, e in self._entries.items()},
+            }
+
+
+dataset_cache = DatasetCache()
+
+
+def load_snapshot(filename: str) -> Snapshot:
+    """Current read-only snapshot of a data file (empty, version 0, if missing)."""
+    entry = dataset_cache.get(filename)
+    if entry is None:
+        return Snapshot(filename, 0, FrozenList())
+    return entry.snapshot
+
+
 def load_json(filename: str) -> list | dict:
-    """Load and return raw JSON data from the data directory."""
-    path = os.path.join(DATA_PATH, filename)
-    if not os.path.exists(path):
-        return []
-    with open(path, "r") as f:
+    """Load and return read-only JSON data from the data directory (cached)."""
+    return load_snapshot(filename).rows
+
+
+def dataset_version(filename: str) -> int:
+    """Version number of the currently cached copy of filename (0 if missing)."""
+    return load_snapshot(filename).version
+
+
+def cache_stats() -> dict:
+    """Hit/miss/reload counters, cached file versions and write-behind counters."""
+    return {**dataset_cache.stats(), "write_behind": write_behind.stats()}
+
+
+def encode_json(data, compact: bool = JSON_COMPACT) -> bytes:
+    """Serialize for a data file: orjson when installed, compact or 2-space indented."""
+    if orjson is not None:
         try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return []
+            return orjson.dumps(data, default=str, option=0 if compact else orjson.OPT_INDENT_2)
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits; the stdlib encoder handles them
+    if compact:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+    return json.dumps(data, indent=2, ensure_ascii=False, default=str).encode()
+
+
+def _write_atomic(path: str, payload: bytes) -> None:
+    """Write to a temp file in the same directory, fsync, then rename over path."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def save_json(filename: str, data, compact: bool = JSON_COMPACT) -> None:
+    """Atomically replace a JSON file in the data directory."""
+    _write_atomic(os.path.join(DATA_PATH, filename), encode_json(data, compact))
+    dataset_cache.invalidate(filename)
+
+
+class WriteBehind:
+    """
+    Coalesces `update_json` mutations: each one is visible to readers at once
+    (published to the dataset cache), and a background thread writes the
+    latest version of each changed file at most once per WRITE_BEHIND_SECONDS.
+    """
+
+    def __init__(self, delay: float = WRITE_BEHIND_SECONDS):
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._mutate_locks: dict[str, threading.Lock] = {}
+        self._pending: dict = {}
+        self._thread: threading.Thread | None = None
+        self.mutations = 0
+        self.flushes = 0
+        self.failures = 0
+
+    def _mutate_lock(self, filename: str) -> threading.Lock:
+        with self._cond:
+            return self._mutate_locks.setdefault(filename, threading.Lock())
+
+    def update(self, filename: str, mutate):
+        """
+        Apply mutate(draft) to an editable shallow copy of the file's data
+        (a list or dict whose items are still frozen; replace them rather
+        than editing them). Values must be JSON types. Returns mutate's result.
+        """
+        with self._mutate_lock(filename):
+            current = load_json(filename)
+            draft = dict(current) if isinstance(current, dict) else list(current)
+            result = mutate(draft)
+            self._publish(filename, freeze(draft))
+        return result
+
+    def append(self, filename: str, items) -> None:
+        """Append rows to a list-shaped file, keeping the snapshot lineage."""
+        with self._mutate_lock(filename):
+            current = load_snapshot(filename)
+            if not isinstance(current.rows, list):
+                raise TypeError(f"{filename} is not a JSON array")
+            rows = FrozenList([*current.rows, *(freeze(item) for item in items)])
+            self._publish(filename, rows, appended=current.version > 0)
 
+    def _publish(self, filename: str, rows, appended: bool = False) -> None:
+        dataset_cache.publish(filename, rows, appended)
+        with self._cond:
+            self._pending[filename] = rows
+            self.mutations += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="json-write-behind", daemon=True)
+                self._thread.start()
+            self._cond.notify()
 
-def save_json(filename: str, data) -> None:
-    """Save data to a JSON file in the data directory."""
-    path = os.path.join(DATA_PATH, filename)
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2, default=str)
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            time.sleep(self.delay)  # let the rest of a burst arrive
+            self.flush()
+
+    def flush(self) -> None:
+        """Write every pending file now."""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, {}
+            for filename, rows in batch.items():
+                path = os.path.join(DATA_PATH, filename)
+                try:
+                    _write_atomic(path, encode_json(rows))
+                    st = os.stat(path)
+                except Exception:
+                    # The rows stay pinned in the dataset cache (not settled) and
+                    # queued, so a transient disk error delays the write instead
+                    # of losing it; a newer pending version wins over this one.
+                    logger.exception("Write-behind of %s failed; retrying on the next cycle", filename)
+                    with self._cond:
+                        self._pending.setdefault(filename, rows)
+                        self.failures += 1
+                    continue
+                dataset_cache.settle(filename, rows, (st.st_mtime_ns, st.st_size))
+                with self._cond:
+                    self.flushes += 1
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "mutations": self.mutations,
+                "flushes": self.flushes,
+                "failures": self.failures,
+                "pending": len(self._pending),
+            }
+
+
+write_behind = WriteBehind()
+atexit.register(write_behind.flush)
+
+
+def update_json(filename: str, mutate):
+    """Mutate a data file through the write-behind queue (see WriteBehind.update)."""
+    return write_behind.update(filename, mutate)
+
+
+def append_json(filename: str, items) -> None:
+    """Append rows to a list-shaped data file through the write-behind queue."""
+    write_behind.append(filename, items)
+
+
+def flush_writes() -> None:
+    """Block until every queued update_json mutation is on disk."""
+    write_behind.flush()
 
 
 def load_mock_data(key: str | None = None):
@@ -54,6 +393,34 @@ def load_mock_data(key: str | None = None):
     return data
 
 
+def find_row_id(snapshot: Snapshot, record_id, section: str | None = None, key: str = "id"):
+    """Row id of the record with the given key in a snapshot (or section), or None."""
+    rows = snapshot.section(section) if section else snapshot.rows
+    index = snapshot.derive(
+        f"pk:{section or ''}:{key}",
+        lambda snap: primary_key_index(rows, key),
+    )
+    return index.get(record_id)
+
+
+def find_record(filename: str, record_id, section: str | None = None, key: str = "id"):
+    """
+    Constant-time lookup of one record by primary key.
+    The id index is built once per dataset version; misses cost a dict probe.
+    """
+    snapshot = load_snapshot(filename)
+    row_id = find_row_id(snapshot, record_id, section, key)
+    if row_id is None:
+        return None
+    rows = snapshot.section(section) if section else snapshot.rows
+    return rows[row_id]
+
+
+def find_mock_record(key: str, record_id):
+    """find_record over a section of mock_data.json (e.g. "contractors")."""
+    return find_record("mock_data.json", record_id, section=key)
+
+
 # Convenience helpers for individual data files
 def get_all_tenders():
     """Backend team: replace with DB query."""
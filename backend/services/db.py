@@ -0,0 +1,152 @@
+"""
+SQLite connection pool for the SQLite repository backend.
+
+- Readers get one long-lived connection per thread (sqlite3 connections must
+  not be shared across threads), so a request never pays for a connect.
+  Each connection keeps its own compiled-statement cache, which makes the
+  repository's constant SQL strings effectively prepared statements.
+- The database runs in WAL mode: readers see the last committed state and
+  never wait for a writer (whistleblower intake, post creation, migrations).
+- Writers share one connection behind a lock, so concurrent writes queue up
+  in-process instead of failing with "database is locked".
+- Async handlers hand queries to a dedicated thread pool with `run()`, so the
+  event loop never blocks on disk.
+
+Pool metrics are reported by /health when the SQLite backend is active.
+"""
+
+import asyncio
+import functools
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from config import SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE, SQLITE_POOL_SIZE, SQLITE_SYNCHRONOUS
+
+
+class ConnectionPool:
+    """Per-thread read connections, one serialized writer, WAL journaling."""
+
+    def __init__(self, path: str, pool_size: int = SQLITE_POOL_SIZE):
+        self.path = path
+        self.pool_size = pool_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer: sqlite3.Connection | None = None
+        self._connections: list[sqlite3.Connection] = []
+        self._executor: ThreadPoolExecutor | None = None
+        self._wal_ready = False
+        self.metrics = {
+            "connections_opened": 0,
+            "reads": 0,
+            "writes": 0,
+            "read_seconds": 0.0,
+            "write_wait_seconds": 0.0,
+        }
+
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=30,
+            cached_statements=256,
+            check_same_thread=readonly,  # the writer is shared across threads behind _write_lock
+        )
+        conn.row_factory = sqlite3.Row
+        with self._lock:
+            if not self._wal_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                self._wal_ready = True
+            self._connections.append(conn)
+            self.metrics["connections_opened"] += 1
+        conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size=-{int(SQLITE_CACHE_SIZE_KB)}")
+        conn.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """This thread's read-only connection (opened on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect(readonly=True)
+        return conn
+
+    def query(self, sql: str, params=()) -> list[sqlite3.Row]:
+        start = time.perf_counter()
+        rows = self.reader().execute(sql, params).fetchall()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.metrics["reads"] += 1
+            self.metrics["read_seconds"] += elapsed
+        return rows
+
+    @contextmanager
+    def writer(self):
+        """
+        Exclusive write transaction on the shared writer connection.
+        Commits on success, rolls back on error; readers are never blocked.
+        """
+        start = time.perf_counter()
+        with self._write_lock:
+            waited = time.perf_counter() - start
+            if self._writer is None:
+                self._writer = self._connect(readonly=False)
+            conn = self._writer
+            try:
+                with conn:
+                    yield conn
+            finally:
+                with self._lock:
+                    self.metrics["writes"] += 1
+                    self.metrics["write_wait_seconds"] += waited
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking database call on the pool's threads, off the event loop."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.pool_size, thread_name_prefix="sqlite")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.metrics)
+            stats["open_connections"] = len(self._connections)
+        stats["pool_size"] = self.pool_size
+        stats["avg_read_ms"] = round(stats["read_seconds"] / stats["reads"] * 1000, 3) if stats["reads"] else 0.0
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Read connections belong to their threads; those that already
+                # exited have closed them.
+                pass
+        self._local = threading.local()
+        self._writer = None
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path: str) -> ConnectionPool:
+    """The process-wide pool for a database file."""
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = ConnectionPool(path)
+        return pool
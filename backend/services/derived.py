@@ -0,0 +1,57 @@
+"""
+Derived columns computed once per dataset snapshot.
+
+Each builder takes a Snapshot and is meant to be passed to
+`Snapshot.derive`, e.g. `load_snapshot("tender.json").derive("risk", tender_risk)`.
+Results are aligned with `snapshot.rows` by position, so handlers can filter
+and paginate row ids first and only materialize the rows they return.
+"""
+
+from services.columnar import tender_columns
+from services.reputation import is_chronic_pending, is_price_anomaly, price_ratio
+
+
+class TenderRiskColumns:
+    """Normalized title and price-anomaly flags for every tender in a snapshot."""
+
+    __slots__ = ("titles", "price_ratios", "is_critical")
+
+    def __init__(self, titles, price_ratios, is_critical):
+        self.titles = titles
+        self.price_ratios = price_ratios
+        self.is_critical = is_critical
+
+    def overlay(self, i: int) -> dict:
+        """Fields merged over tender row i in API responses."""
+        fields = {
+            "title": self.titles[i],
+            # Enforce DEMO DATA label globally
+            "is_demo_data": True,
+            "price_ratio": self.price_ratios[i],
+            "is_critical": self.is_critical[i],
+        }
+        if self.is_critical[i]:
+            fields["risk_flag"] = "High Price Anomaly"
+        return fields
+
+
+def tender_risk(snapshot) -> TenderRiskColumns:
+    rows = snapshot.rows
+    titles = tuple(t.get("title") or t.get("name") or "Untitled Project" for t in rows)
+
+    columns = snapshot.derive("columns", tender_columns)
+    if columns is not None:
+        # Vectorized ratio/threshold; NaN (no benchmark) becomes None
+        ratios = tuple(None if r != r else r for r in columns.price_ratio().tolist())
+        return TenderRiskColumns(titles, ratios, tuple(columns.anomaly_mask().tolist()))
+
+    return TenderRiskColumns(
+        titles=titles,
+        price_ratios=tuple(price_ratio(t) for t in rows),
+        is_critical=tuple(is_price_anomaly(t) for t in rows),
+    )
+
+
+def payment_risk_flags(snapshot) -> tuple:
+    # Fulfilling the requirement: Flag any pending > CHRONIC_PENDING_DAYS
+    return tuple("Chronic Pending" if is_chronic_pending(p) else None for p in snapshot.rows)
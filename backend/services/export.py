@@ -0,0 +1,120 @@
+"""
+Streaming bulk exports (NDJSON or CSV, optionally gzipped).
+
+An export is a generator of row batches from the repository
+(`repo.export_tenders(...)` etc.). `export_response` pulls one batch at a
+time on the repository's worker threads, encodes (and compresses) it
+there, and hands the bytes to a StreamingResponse. Only one batch is held
+in memory at a time, whatever the size of the ledger, and the event loop
+only ever passes finished chunks along, so a large export never stalls
+other requests.
+
+CSV columns are fixed per dataset so every row has the same shape;
+nested values (post authors, image lists, audit findings) are written as
+JSON text. NDJSON rows are written whole.
+"""
+
+import csv
+import io
+import zlib
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from utils.response import dumps
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+COLUMNS = {
+    "tenders": (
+        "id", "title", "county", "category", "value", "benchmark_value", "contractor_id", "status",
+        "description", "days_overdue", "price_ratio", "is_critical", "risk_flag", "is_demo_data",
+    ),
+    "payments": (
+        "invoice_id", "entity_id", "entity_name", "amount", "status", "days_outstanding", "is_chronic",
+        "risk_flag", "is_demo_data",
+    ),
+    "posts": (
+        "id", "title", "content", "status", "wardId", "county", "category", "likes", "comments",
+        "referenceId", "author", "timestamp", "images", "is_demo_data",
+    ),
+    "audits": (
+        "id", "title", "description", "type", "status", "startDate", "endDate", "assignedTo",
+        "findings", "recommendations", "reportUrl", "createdAt", "completedAt",
+    ),
+}
+
+
+def _cell(value):
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode()
+    return value
+
+
+class ExportWriter:
+    """Encodes row batches as NDJSON or CSV bytes, through gzip when asked."""
+
+    def __init__(self, fmt: str, columns, compress: bool = False):
+        self.fmt = fmt
+        self.columns = columns
+        # wbits=31: gzip container, so the output is a plain .gz file
+        self._gzip = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer, lineterminator="\n")
+
+    def _out(self, data: bytes) -> bytes:
+        return self._gzip.compress(data) if self._gzip is not None else data
+
+    def header(self) -> bytes:
+        if self.fmt != "csv":
+            return b""
+        self._csv.writerow(self.columns)
+        return self._out(self._take())
+
+    def write(self, rows) -> bytes:
+        if self.fmt == "ndjson":
+            return self._out(b"".join(dumps(row) + b"\n" for row in rows))
+        self._csv.writerows([_cell(row.get(c)) for c in self.columns] for row in rows)
+        return self._out(self._take())
+
+    def close(self) -> bytes:
+        return self._gzip.flush() if self._gzip is not None else b""
+
+    def _take(self) -> bytes:
+        text = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return text.encode()
+
+
+def _next_chunk(batches, writer: ExportWriter):
+    """Encode the next batch; (bytes, done)."""
+    batch = next(batches, None)
+    if batch is None:
+        return writer.close(), True
+    return writer.write(batch), False
+
+
+async def _stream(run, batches, writer: ExportWriter):
+    yield await run(writer.header)
+    done = False
+    while not done:
+        chunk, done = await run(_next_chunk, batches, writer)
+        if chunk:
+            yield chunk
+
+
+def export_response(run, batches, dataset: str, fmt: str = "ndjson", compress: bool = False) -> StreamingResponse:
+    """
+    Stream batches as a file download. `run` executes blocking calls off the
+    event loop (`repo.run` or `run_blocking`).
+    """
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format '{fmt}' (use ndjson or csv)")
+    writer = ExportWriter(fmt, COLUMNS[dataset], compress)
+    filename = f"{dataset}.{fmt}" + (".gz" if compress else "")
+    return StreamingResponse(
+        _stream(run, iter(batches), writer),
+        media_type="application/gzip" if compress else FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,298 @@
+"""
+Typo-tolerant contractor matching on character trigrams.
+
+Contractor names, directors and KRA PINs are normalized (case, punctuation
+and legal suffixes such as "Ltd" or "Co." dropped) and split into padded
+trigrams: "safari" -> "  s", " sa", "saf", "afa", "far", "ari", "ri ".
+One typo only disturbs the few trigrams around it, so misspellings keep
+most of them.
+
+A query is scored against each indexed value as the better of
+- Dice similarity of the two trigram sets (whole-value typos), and
+- the share of the query's inner trigrams found in the value (a partial
+  or slightly wrong name, like the old substring search).
+
+With NumPy installed, trigram overlaps for every indexed value are
+counted at once with `bincount` over the query's posting arrays. Without
+it, candidates come from the posting lists of the query's rarest trigrams
+only: a value reaching the threshold must contain at least one of them
+(prefix filtering). Each candidate is then scored exactly. Both paths return
+the same matches.
+
+Plain substring lookups (`contains`) use a second trigram map over the raw,
+lowercased name and PIN values: only the rows holding the query's rarest
+trigram are checked, instead of every contractor.
+
+The same index finds near-duplicate registrations (`near_duplicates`),
+e.g. shell companies re-registered under a slightly different name.
+"""
+
+import math
+import re
+
+from config import FUZZY_THRESHOLD
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+# (field reported in matches, record keys it is read from)
+CONTRACTOR_FIELDS = (
+    ("name", ("name",)),
+    ("kraPin", ("kraPin", "kra_pin")),
+    ("directors", ("directors", "contactPerson")),
+)
+
+# Fields `contains` matches against, raw and case-insensitive
+SUBSTRING_FIELDS = ("name", "kraPin")
+
+_EPS = 1e-9  # keeps float bounds like 0.8 / 1.2 * 15 from rounding up a whole trigram
+
+_LEGAL_SUFFIXES = {"ltd", "limited", "co", "company", "inc", "plc", "llc", "enterprises", "the"}
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_EDGE = "\x00"  # pads raw values so values and queries shorter than a trigram still get one
+
+
+def normalize(value) -> str:
+    words = _NON_ALNUM.sub(" ", str(value).lower().replace("&", " and ")).split()
+    kept = [w for w in words if w not in _LEGAL_SUFFIXES]
+    return " ".join(kept or words)
+
+
+def trigrams(text: str) -> frozenset:
+    padded = f"  {text} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def inner_trigrams(text: str) -> frozenset:
+    """Trigrams that do not depend on where the value starts or ends."""
+    grams = frozenset(g for g in trigrams(text) if g[0] != " " and g[-1] != " ")
+    return grams or trigrams(text)
+
+
+def _values(row, keys):
+    for key in keys:
+        value = row.get(key)
+        if isinstance(value, (list, tuple)):
+            yield from (v for v in value if v)
+        elif value:
+            yield value
+
+
+class FuzzyIndex:
+    """Trigram postings over the normalized name/director/PIN values of a row list."""
+
+    __slots__ = ("fields", "entries", "postings", "raw_values", "raw_postings", "_arrays")
+
+    def __init__(self, rows, fields=CONTRACTOR_FIELDS):
+        self.fields = fields
+        self.entries: list[tuple] = []  # (row id, field, original value, trigrams)
+        self.postings: dict[str, list[int]] = {}
+        self.raw_values: list[tuple] = []  # (row id, lowercased value) for SUBSTRING_FIELDS
+        self.raw_postings: dict[str, list[int]] = {}
+        self._arrays = None
+        for i, row in enumerate(rows):
+            for field, keys in fields:
+                for value in _values(row, keys):
+                    if field in SUBSTRING_FIELDS:
+                        self._add_raw(i, str(value).lower())
+                    norm = normalize(value)
+                    if not norm:
+                        continue
+                    grams = trigrams(norm)
+                    entry_id = len(self.entries)
+                    self.entries.append((i, field, value, grams))
+                    for g in grams:
+                        self.postings.setdefault(g, []).append(entry_id)
+        if np is not None:
+            self._vectors()
+
+    def _add_raw(self, row_id: int, raw: str) -> None:
+        value_id = len(self.raw_values)
+        self.raw_values.append((row_id, raw))
+        padded = f"{_EDGE}{raw}{_EDGE}"
+        for g in {padded[i : i + 3] for i in range(len(padded) - 2)}:
+            self.raw_postings.setdefault(g, []).append(value_id)
+
+    def contains(self, text) -> list[int]:
+        """Row ids, in order, whose name or PIN contains text (case-insensitive)."""
+        q = str(text).lower()
+        if len(q) >= 3:
+            grams = [q[i : i + 3] for i in range(len(q) - 2)]
+            candidates = min((self.raw_postings.get(g, ()) for g in grams), key=len)
+        else:
+            # Shorter than a trigram: scan the trigram vocabulary, not the rows
+            candidates = {v for g, ids in self.raw_postings.items() if q in g for v in ids}
+        return sorted({self.raw_values[v][0] for v in candidates if q in self.raw_values[v][1]})
+
+    def _candidates(self, grams: frozenset, required: int) -> set:
+        """Entries sharing at least one of the rarest len(grams) - required + 1 trigrams."""
+        ranked = sorted(grams, key=lambda g: len(self.postings.get(g, ())))
+        found = set()
+        for g in ranked[: max(1, len(ranked) - required + 1)]:
+            found.update(self.postings.get(g, ()))
+        return found
+
+    def _vectors(self):
+        """NumPy posting arrays and per-entry columns; __init__ builds them when NumPy is installed."""
+        if self._arrays is None:
+            self._arrays = (
+                {g: np.asarray(ids, dtype=np.int32) for g, ids in self.postings.items()},
+                np.asarray([len(e[3]) for e in self.entries], dtype=np.float64),
+                np.asarray([e[0] for e in self.entries], dtype=np.int64),
+                np.asarray([e[1] for e in self.entries]),
+            )
+        return self._arrays
+
+    def _pair_scores_vectorized(self, pairs_a: list, pairs_b: list, threshold: float, chunk: int = 200_000):
+        """
+        Dice of many (a, b) entry pairs, counted in chunks: a's trigram ids
+        are probed against a sorted array of (entry, trigram id) keys.
+        Yields (a, b, score) for pairs at or above threshold.
+        """
+        gram_ids = {g: i for i, g in enumerate(self.postings)}
+        width = len(gram_ids)
+        sizes = np.asarray([len(e[3]) for e in self.entries], dtype=np.int64)
+        indptr = np.concatenate(([0], np.cumsum(sizes)))
+        indices = np.fromiter(
+            (i for e in self.entries for i in sorted(gram_ids[g] for g in e[3])),
+            dtype=np.int64,
+            count=int(indptr[-1]),
+        )
+        keys = np.repeat(np.arange(len(self.entries), dtype=np.int64), sizes) * width + indices
+        for start in range(0, len(pairs_a), chunk):
+            a = np.asarray(pairs_a[start : start + chunk], dtype=np.int64)
+            b = np.asarray(pairs_b[start : start + chunk], dtype=np.int64)
+            lens = sizes[a]
+            ends = np.cumsum(lens)
+            positions = np.repeat(indptr[a] - ends + lens, lens) + np.arange(ends[-1])
+            probes = np.repeat(b, lens) * width + indices[positions]
+            found = np.minimum(np.searchsorted(keys, probes), len(keys) - 1)
+            common = np.add.reduceat((keys[found] == probes).astype(np.int64), ends - lens)
+            scores = 2 * common / (lens + sizes[b])
+            keep = scores >= threshold - _EPS
+            yield from zip(a[keep].tolist(), b[keep].tolist(), scores[keep].tolist())
+
+    def _counts(self, postings, grams):
+        lists = [postings[g] for g in grams if g in postings]
+        if not lists:
+            return np.zeros(len(self.entries), dtype=np.int64)
+        return np.bincount(np.concatenate(lists), minlength=len(self.entries))
+
+    def _lookup_vectorized(self, grams, inner, threshold: float, fields=None, limit=None) -> dict:
+        postings, sizes, entry_rows, entry_fields = self._vectors()
+        inner_hits = self._counts(postings, inner)
+        overlap = inner_hits + self._counts(postings, grams - inner)
+        scores = np.maximum(2 * overlap / (len(grams) + sizes), inner_hits / len(inner))
+        keep = scores >= threshold - _EPS
+        if fields:
+            keep &= np.isin(entry_fields, list(fields))
+        hits = np.nonzero(keep)[0]
+        # Best entry per row: highest score, then lowest entry id
+        hits = hits[np.lexsort((hits, -scores[hits]))]
+        _, first = np.unique(entry_rows[hits], return_index=True)
+        best_entries = hits[first]
+        if limit is not None:
+            best_entries = best_entries[np.lexsort((entry_rows[best_entries], -scores[best_entries]))][:limit]
+        best = {}
+        for entry_id in best_entries.tolist():
+            row_id, field, value, _ = self.entries[entry_id]
+            best[row_id] = (float(scores[entry_id]), field, value)
+        return best
+
+    def _lookup(self, text, threshold: float, fields=None, limit=None) -> dict:
+        """
+        row id -> (score, field, value) of its best entry at or above
+        threshold; at least the best `limit` rows when limit is given.
+        """
+        norm = normalize(text)
+        if not norm or not self.entries:
+            return {}
+        grams, inner = trigrams(norm), inner_trigrams(norm)
+        if np is not None:
+            return self._lookup_vectorized(grams, inner, threshold, fields, limit)
+        # Dice >= t needs overlap >= t*|A|/(2-t); containment >= t needs t*|inner|
+        candidates = self._candidates(grams, math.ceil(threshold * len(grams) / (2 - threshold) - _EPS))
+        candidates |= self._candidates(inner, math.ceil(threshold * len(inner) - _EPS))
+        best: dict = {}
+        for entry_id in sorted(candidates):
+            row_id, field, value, entry_grams = self.entries[entry_id]
+            if fields and field not in fields:
+                continue
+            score = max(
+                2 * len(grams & entry_grams) / (len(grams) + len(entry_grams)),
+                len(inner & entry_grams) / len(inner),
+            )
+            if score >= threshold - _EPS and score > best.get(row_id, (0,))[0]:
+                best[row_id] = (score, field, value)
+        return best
+
+    def match(self, text, limit: int | None = None, threshold: float = FUZZY_THRESHOLD, fields=None) -> list[dict]:
+        """Rows whose name, director or PIN resembles text, best first."""
+        best = self._lookup(text, threshold, fields, limit)
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[0]))
+        return [
+            {"row": row_id, "score": round(score, 3), "field": field, "value": value}
+            for row_id, (score, field, value) in ranked[:limit]
+        ]
+
+    def near_duplicates(self, threshold: float = 0.8, fields=("name", "kraPin")) -> list[dict]:
+        """
+        Pairs of different rows with a near-identical value in one of
+        `fields`, most similar first. Each pair is reported once.
+
+        A self-join with prefix filtering: trigrams are ranked rarest first
+        across the whole index, and each value is only indexed under the
+        prefix of its ranked trigrams that any match must share, so common
+        trigrams never produce candidates. Candidate pairs are scored in
+        one vectorized pass when NumPy is available.
+        """
+        rarity = {g: (len(ids), g) for g, ids in self.postings.items()}
+        shrink = threshold / (2 - threshold)  # Dice >= t needs overlap >= this * size
+        seen: dict[tuple, list[int]] = {}
+        pairs_a: list[int] = []
+        pairs_b: list[int] = []
+        for entry_id, (row_id, field, _, grams) in enumerate(self.entries):
+            if field not in fields:
+                continue
+            ranked = sorted(grams, key=rarity.__getitem__)
+            candidates = set()
+            for g in ranked[: len(ranked) - math.ceil(shrink * len(ranked) - _EPS) + 1]:
+                bucket = seen.setdefault((field, g), [])
+                candidates.update(bucket)
+                bucket.append(entry_id)
+            low, high = shrink * len(grams) - _EPS, len(grams) / shrink + _EPS
+            for other_id in candidates:
+                if low <= len(self.entries[other_id][3]) <= high and self.entries[other_id][0] != row_id:
+                    pairs_a.append(other_id)
+                    pairs_b.append(entry_id)
+
+        if np is not None and pairs_a:
+            scored = self._pair_scores_vectorized(pairs_a, pairs_b, threshold)
+        else:
+            scored = (
+                (a, b, 2 * len(self.entries[a][3] & self.entries[b][3]) / (len(self.entries[a][3]) + len(self.entries[b][3])))
+                for a, b in zip(pairs_a, pairs_b)
+            )
+        pairs: dict = {}
+        for a, b, score in scored:
+            if score < threshold - _EPS:
+                continue
+            (row_a, field, value_a, _), (row_b, _, value_b, _) = self.entries[a], self.entries[b]
+            if row_a > row_b:
+                row_a, row_b, value_a, value_b = row_b, row_a, value_b, value_a
+            if score > pairs.get((row_a, row_b), (0,))[0]:
+                pairs[(row_a, row_b)] = (score, field, value_a, value_b)
+        ranked_pairs = sorted(pairs.items(), key=lambda item: (-item[1][0], item[0]))
+        return [
+            {"rows": [a, b], "score": round(score, 3), "field": field, "values": [va, vb]}
+            for (a, b), (score, field, va, vb) in ranked_pairs
+        ]
+
+
+def contractor_fuzzy_index(snapshot, section: str | None = None) -> FuzzyIndex:
+    """Fuzzy index over a snapshot's contractors, built once per snapshot version."""
+    if section is None:
+        return snapshot.derive("fuzzy", lambda snap: FuzzyIndex(snap.rows if isinstance(snap.rows, list) else ()))
+    return snapshot.derive(f"fuzzy:{section}", lambda snap: FuzzyIndex(snap.section(section)))
@@ -0,0 +1,304 @@
+"""
+Secondary indexes over dataset snapshots.
+
+Indexes map a case-folded field value to the sorted row ids (positions in
+`snapshot.rows`) that carry it. They are built once per snapshot through
+`Snapshot.derive`, so filtered listings cost O(result) instead of a scan of
+the whole table. Post indexes are the exception: citizen posts only grow by
+appends, so one PostIndex is extended in place across snapshots of the same
+lineage instead of being rebuilt for every new post.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left, insort
+
+from services.columnar import tender_columns
+from services.pagination import feed_key
+from services.snapshot import FrozenDict
+
+
+def _fold(value) -> str:
+    return "" if value is None else str(value).lower()
+
+
+class FieldIndex:
+    """Case-insensitive equality index: value -> sorted tuple of row ids."""
+
+    __slots__ = ("field", "_ids")
+
+    def __init__(self, rows, field: str):
+        self.field = field
+        groups: dict[str, list[int]] = {}
+        for i, row in enumerate(rows):
+            groups.setdefault(_fold(row.get(field)), []).append(i)
+        self._ids = {key: tuple(ids) for key, ids in groups.items()}
+
+    def lookup(self, value) -> tuple:
+        return self._ids.get(_fold(value), ())
+
+    def keys(self):
+        return self._ids.keys()
+
+
+def primary_key_index(rows, key: str = "id") -> dict:
+    """Map each record's key to its row id. The first occurrence of a key wins."""
+    index: dict = {}
+    for i, row in enumerate(rows):
+        if isinstance(row, dict):
+            index.setdefault(row.get(key), i)
+    index.pop(None, None)
+    return index
+
+
+def intersect(*id_lists) -> list:
+    """
+    Intersect sorted row-id sequences, keeping ascending order.
+    Walks the smallest list and probes the others as sets: O(smallest).
+    """
+    if not id_lists:
+        return []
+    ordered = sorted(id_lists, key=len)
+    smallest, others = ordered[0], [set(ids) for ids in ordered[1:]]
+    return [i for i in smallest if all(i in other for other in others)]
+
+
+class TenderIndex:
+    """County / category / status indexes plus per-county aggregates."""
+
+    __slots__ = ("size", "county", "category", "status", "county_stats")
+
+    def __init__(self, rows, columns=None):
+        self.size = len(rows)
+        self.county = FieldIndex(rows, "county")
+        self.category = FieldIndex(rows, "category")
+        self.status = FieldIndex(rows, "status")
+
+        if columns is not None:
+            # Vectorized group-by over the columnar store (services/columnar.py)
+            self.county_stats = tuple(
+                FrozenDict(name="Unknown" if name is None else name, tender_count=count, total_value=total)
+                for name, count, total in columns.group_totals("county")
+            )
+            return
+
+        # Grouped by the raw value and labelled like the columnar path:
+        # a missing or None county is reported as "Unknown"
+        stats: dict = {}
+        for t in rows:
+            c_name = t.get("county")
+            if c_name not in stats:
+                stats[c_name] = {"name": "Unknown" if c_name is None else c_name, "tender_count": 0, "total_value": 0}
+            stats[c_name]["tender_count"] += 1
+            stats[c_name]["total_value"] += t.get("value", 0)
+        self.county_stats = tuple(FrozenDict(s) for s in stats.values())
+
+    def filter(self, county=None, category=None, status=None):
+        """Row ids matching every given filter, in table order."""
+        lists = []
+        if county:
+            lists.append(self.county.lookup(county))
+        if category:
+            lists.append(self.category.lookup(category))
+        if status:
+            lists.append(self.status.lookup(status))
+        if not lists:
+            return range(self.size)
+        return intersect(*lists)
+
+
+def tender_index(snapshot) -> TenderIndex:
+    return TenderIndex(snapshot.rows, snapshot.derive("columns", tender_columns))
+
+
+class PostIndex:
+    """
+    Posts by ward, wardId, county, category and referenceId (exact values).
+
+    Append-only: `extend` indexes rows added since the previous call, and
+    row-id lists only ever grow at the end, so a view of an older snapshot
+    stays correct by clipping ids to its own length.
+
+    For cursor pagination every group also keeps its rows sorted by feed key
+    (timestamp, id), as does `order` for the whole table; a newest-first page
+    starts with a bisect at the cursor instead of a scan.
+    """
+
+    FIELDS = ("ward", "wardId", "county", "category", "referenceId")
+
+    __slots__ = ("lineage", "size", "fields", "order", "ordered", "_lock")
+
+    def __init__(self, lineage=None):
+        self.lineage = lineage
+        self.size = 0
+        self.fields: dict[str, dict] = {field: {} for field in self.FIELDS}
+        self.order: list[tuple] = []  # (feed key, row id), ascending
+        self.ordered: dict[str, dict] = {field: {} for field in self.FIELDS}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _add_sorted(entries: list, new: list) -> None:
+        if len(new) < 32:
+            for entry in new:
+                insort(entries, entry)
+        else:
+            entries.extend(new)
+            entries.sort()  # two sorted runs: merged in linear time
+
+    def extend(self, rows) -> "PostIndex":
+        with self._lock:
+            new: dict = {}  # sorted list -> entries to merge into it
+            for i in range(self.size, len(rows)):
+                row = rows[i]
+                entry = (feed_key(row), i)
+                new.setdefault(id(self.order), (self.order, []))[1].append(entry)
+                for field, groups in self.fields.items():
+                    value = row.get(field)
+                    if value is not None:
+                        groups.setdefault(value, []).append(i)
+                        entries = self.ordered[field].setdefault(value, [])
+                        new.setdefault(id(entries), (entries, []))[1].append(entry)
+            for entries, added in new.values():
+                self._add_sorted(entries, sorted(added))
+            self.size = max(self.size, len(rows))
+        return self
+
+    def view(self, size: int) -> "PostIndexView":
+        return PostIndexView(self, size)
+
+
+class PostIndexView:
+    """Queries over a PostIndex limited to the first `size` rows (one snapshot)."""
+
+    __slots__ = ("index", "size")
+
+    def __init__(self, index: PostIndex, size: int):
+        self.index = index
+        self.size = size
+
+    def lookup(self, field: str, value) -> list:
+        ids = self.index.fields[field].get(value, ())
+        return ids[: bisect_left(ids, self.size)]
+
+    def _keys(self, field: str) -> tuple:
+        return tuple(self.index.fields[field])
+
+    @staticmethod
+    def _union(id_lists) -> list:
+        return sorted(set().union(*id_lists))
+
+    def ward_groups(self, ward_id: str, fields=("ward", "wardId", "category")) -> list:
+        """
+        (field, value) groups matched by match_ward: ward/wardId/category
+        equal to ward_id, or a county appearing in the ward label. Counties
+        are matched by scanning the distinct county values, not the rows.
+        """
+        groups = [(field, ward_id) for field in fields]
+        groups += [("county", c) for c in self._keys("county") if c and c in ward_id]
+        return groups
+
+    def search_groups(self, term: str) -> list:
+        """(field, value) groups whose ward or wardId contains term (case-insensitive)."""
+        term = term.lower()
+        return [
+            (field, key)
+            for field in ("ward", "wardId")
+            for key in self._keys(field)
+            if isinstance(key, str) and term in key.lower()
+        ]
+
+    def category_groups(self, category: str) -> list:
+        """(field, value) groups whose category equals category (case-insensitive)."""
+        folded = category.lower()
+        return [("category", key) for key in self._keys("category") if isinstance(key, str) and key.lower() == folded]
+
+    def _ids(self, groups) -> list:
+        return self._union(self.lookup(field, value) for field, value in groups)
+
+    def match_ward(self, ward_id: str, fields=("ward", "wardId", "category")) -> list:
+        """Rows in ward_groups(ward_id), ascending."""
+        return self._ids(self.ward_groups(ward_id, fields))
+
+    def search_ward(self, term: str) -> list:
+        """Rows whose ward or wardId contains term (case-insensitive)."""
+        return self._ids(self.search_groups(term))
+
+    def category(self, category: str) -> list:
+        """Rows whose category equals category (case-insensitive)."""
+        return self._ids(self.category_groups(category))
+
+    def references(self, reference_id) -> list:
+        return self.lookup("referenceId", reference_id)
+
+    @staticmethod
+    def _older(entries: list, after):
+        """Entries of one sorted list below the cursor key, newest first."""
+        end = len(entries) if after is None else bisect_left(entries, (after,))
+        for j in range(end - 1, -1, -1):
+            yield entries[j]
+
+    def newest(self, groups=None, after=None, limit: int = 10, where=None) -> list:
+        """
+        Up to `limit` row ids, newest first by (timestamp, id), strictly
+        older than the cursor key `after`. `groups` restricts to the union of
+        (field, value) groups (all rows when None); `where(row_id)` filters
+        further. Each group is walked from a bisect at the cursor and merged,
+        so a page costs O(groups + limit) rather than O(matching rows).
+        """
+        with self.index._lock:
+            if groups is None:
+                sources = [self.index.order]
+            else:
+                sources = [self.index.ordered[field].get(value) for field, value in groups]
+            streams = [self._older(entries, after) for entries in sources if entries]
+            picked, last = [], None
+            for entry in heapq.merge(*streams, reverse=True):
+                if len(picked) == limit:
+                    break
+                if entry == last or entry[1] >= self.size:
+                    continue  # in several groups, or appended after this snapshot
+                last = entry
+                if where is None or where(entry[1]):
+                    picked.append(entry[1])
+            return picked
+
+    def newest_matching(self, rows, ward_id=None, category=None, after=None, limit: int = 10) -> list:
+        """
+        newest() over the rows list_posts would return for ward_id and
+        category: ward groups are merged and the category is checked per row.
+        """
+        groups, where = None, None
+        if category:
+            groups = self.category_groups(category)
+        if ward_id:
+            if groups is not None:
+                categories = {value for _, value in groups}
+                where = lambda i: rows[i].get("category") in categories  # noqa: E731
+            groups = self.ward_groups(ward_id)
+        return self.newest(groups, after, limit, where)
+
+
+_post_indexes: dict[str, PostIndex] = {}
+_post_indexes_lock = threading.Lock()
+
+
+def _shared_post_index(snapshot) -> PostIndexView:
+    rows = snapshot.rows if isinstance(snapshot.rows, list) else ()
+    with _post_indexes_lock:
+        index = _post_indexes.get(snapshot.filename)
+        if index is None or index.lineage != snapshot.lineage:
+            index = _post_indexes[snapshot.filename] = PostIndex(snapshot.lineage)
+    return index.extend(rows).view(len(rows))
+
+
+def post_index(snapshot) -> PostIndexView:
+    """Post indexes for a list-shaped snapshot, extended incrementally across appends."""
+    return snapshot.derive("post_index", _shared_post_index)
+
+
+def section_post_index(snapshot, key: str) -> PostIndexView:
+    """Post indexes for a section of a dict-shaped file (e.g. mock feedPosts)."""
+    def build(snap):
+        rows = snap.section(key)
+        return PostIndex().extend(rows).view(len(rows))
+    return snapshot.derive(f"post_index:{key}", build)
@@ -0,0 +1,65 @@
+"""
+Incremental reader for files holding one large JSON array.
+
+`iter_json_array` decodes one element at a time from fixed-size chunks, so
+memory stays bounded by the largest element rather than the file, and a
+thread parsing a big file returns to the interpreter between elements
+(letting other threads, including the event loop, take the GIL) instead of
+holding it for one long `json.load`.
+"""
+
+import json
+import os
+
+READ_CHUNK = 1 << 20
+
+
+def iter_json_array(path, chunk_size=READ_CHUNK):
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        fill()
+        skip_whitespace()
+        if buf[pos:pos + 1] != "[":
+            raise ValueError(f"{os.path.basename(path)}: expected a JSON array")
+        pos += 1
+
+        while True:
+            skip_whitespace()
+            if buf[pos:pos + 1] == "]":
+                return
+            if buf[pos:pos + 1] == ",":
+                pos += 1
+                skip_whitespace()
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                # A value ending exactly at the buffer edge may be cut short (numbers)
+                complete = end < len(buf) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                fill()
+                continue
+            pos = end
+            yield item
@@ -0,0 +1,127 @@
+"""
+Keyset (cursor) pagination.
+
+Offset paging re-walks every earlier row for each page, and pages shift when
+rows are inserted ahead of the offset. Keyset paging instead remembers the
+sort key of the last row returned and continues strictly after it:
+
+- registries (tenders, contractors, alerts, audits, reports) are ordered by
+  id, ties broken by row position;
+- feeds are ordered newest first by (timestamp, id).
+
+The key travels to the client as an opaque `nextCursor` string; it is tagged
+with its ordering so a feed cursor cannot be replayed against a registry.
+"""
+
+import base64
+import heapq
+import json
+from bisect import bisect_right
+
+
+class InvalidCursor(ValueError):
+    """A cursor that was not produced by encode_cursor for this ordering."""
+
+
+# Element types of each ordering's key: id_key for registries, feed_key for feeds
+ID_KEY_TYPES = (str, int)
+KEY_TYPES = {"feed": (str, str)}
+
+
+def encode_cursor(kind: str, key) -> str:
+    raw = json.dumps([kind, list(key)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None, kind: str) -> tuple | None:
+    """Key encoded in cursor, or None to start from the first page (empty cursor)."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        tag, key = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if tag != kind or not isinstance(key, list):
+        raise InvalidCursor(f"Cursor is not a {kind} cursor")
+    types = KEY_TYPES.get(kind, ID_KEY_TYPES)
+    # bool is an int subclass, but never a row position
+    if len(key) != len(types) or any(
+        not isinstance(value, t) or isinstance(value, bool) for value, t in zip(key, types)
+    ):
+        raise InvalidCursor(f"Malformed {kind} cursor")
+    return tuple(key)
+
+
+def id_key(row, position: int) -> tuple:
+    """Registry ordering: id, then row position for duplicate ids."""
+    record_id = row.get("id")
+    return ("" if record_id is None else str(record_id), position)
+
+
+def feed_key(row) -> tuple:
+    """Feed ordering (newest first): ISO timestamp, then id."""
+    return (str(row.get("timestamp") or ""), str(row.get("id") or ""))
+
+
+def keyset_select(keyed, after, limit: int, descending: bool = False) -> list:
+    """
+    The first `limit` (key, value) pairs strictly after `after` in key order,
+    picked from an unordered iterable without sorting it: O(n log limit).
+    """
+    if after is not None:
+        if descending:
+            keyed = (kv for kv in keyed if kv[0] < after)
+        else:
+            keyed = (kv for kv in keyed if kv[0] > after)
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    return pick(limit, keyed, key=lambda kv: kv[0])
+
+
+def keyset_rows(rows, after, limit: int) -> tuple[list, tuple | None]:
+    """
+    One id-ordered page of an already filtered list: (rows, next key), where
+    next key is None on the last page. Used for small registry sections.
+    """
+    picked = keyset_select(((id_key(r, i), r) for i, r in enumerate(rows)), after, limit + 1)
+    next_key = picked[limit - 1][0] if len(picked) > limit else None
+    return [r for _, r in picked[:limit]], next_key
+
+
+def cursor_page(rows, cursor: str, kind: str, limit: int) -> tuple[list, str | None]:
+    """keyset_rows driven by an opaque cursor: (rows, nextCursor)."""
+    items, next_key = keyset_rows(rows, decode_cursor(cursor, kind), limit)
+    return items, encode_cursor(kind, next_key) if next_key is not None else None
+
+
+class KeysetOrder:
+    """
+    Row ids of a snapshot sorted by id_key, built once per snapshot
+    (`snapshot.derive("id_order", ...)`). Unfiltered pages are a bisect plus a
+    slice; filtered pages select from the candidate row ids.
+    """
+
+    __slots__ = ("keys", "row_ids", "row_keys")
+
+    def __init__(self, rows):
+        self.row_keys = [id_key(r, i) for i, r in enumerate(rows)]
+        order = sorted(range(len(rows)), key=self.row_keys.__getitem__)
+        self.row_ids = order
+        self.keys = [self.row_keys[i] for i in order]
+
+    def page(self, after, limit: int, candidates=None) -> tuple[list, tuple | None]:
+        """(row ids, next key) for up to `limit` rows after the cursor key."""
+        if candidates is None:
+            start = 0 if after is None else bisect_right(self.keys, after)
+            ids = self.row_ids[start : start + limit + 1]
+            picked = [(self.row_keys[i], i) for i in ids]
+        else:
+            picked = keyset_select(((self.row_keys[i], i) for i in candidates), after, limit + 1)
+        next_key = picked[limit - 1][0] if len(picked) > limit else None
+        return [i for _, i in picked[:limit]], next_key
+
+
+def id_order(snapshot) -> KeysetOrder:
+    rows = snapshot.rows if isinstance(snapshot.rows, list) else ()
+    return KeysetOrder(rows)
+
@@ -0,0 +1,295 @@
+"""
+Fraud pattern detection behind /fraud/patterns.
+
+Detectors:
+- shared attributes: contractors linked by the same address, phone number,
+  director or KRA PIN, or by near-identical names/PINs (FuzzyIndex), are
+  grouped into networks; a network whose members won tenders in the same
+  county and category is the classic bid-rigging shape.
+- award concentration: within one county and category, a single
+  contractor holding most of the awarded value.
+- price-ratio outliers: tenders whose value / benchmark ratio is far above
+  the other tenders of the same county and category (robust z-score on the
+  median and MAD, so a few inflated tenders cannot hide each other).
+
+Tenders are partitioned by (county, category) and each partition is an
+independent task; the contractor network is one more task. On large
+datasets the tasks run on a process pool (CPU-bound, so threads would
+serialize on the GIL); small ones run inline, where spawning workers would
+cost more than the detection.
+
+Results are computed once per dataset version, in the background. Requests
+are answered from the last finished run: a request that sees new data
+starts a refresh and keeps getting the previous results until it lands;
+only the very first request waits.
+"""
+
+import hashlib
+import multiprocessing
+import statistics
+import threading
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from config import (
+    AWARD_CONCENTRATION_SHARE,
+    PATTERN_MIN_PARTITION,
+    PATTERN_PARALLEL_MIN_TENDERS,
+    PATTERN_WORKERS,
+    PRICE_OUTLIER_SCORE,
+)
+from services.fuzzy import FuzzyIndex, normalize
+
+NEAR_DUPLICATE_THRESHOLD = 0.9
+# A value shared by more contractors than this (a registry agent's address,
+# a placeholder phone number) is too generic to link them
+MAX_SHARED = 25
+
+
+# --- Detectors (module-level and fed plain tuples, so they pickle cheaply) ---
+
+def _pattern_id(kind: str, *parts) -> str:
+    return f"pattern_{kind}_{hashlib.sha1(repr(parts).encode()).hexdigest()[:10]}"
+
+
+def detect_partition(partition) -> list[dict]:
+    """
+    Award concentration and price outliers for one (county, category).
+    partition = (county, category, [(tender id, contractor id, value, benchmark), ...]).
+    """
+    county, category, tenders = partition
+    if len(tenders) < PATTERN_MIN_PARTITION:
+        return []
+    patterns = []
+
+    awarded: dict = {}
+    for _, contractor_id, value, _ in tenders:
+        if contractor_id:
+            awarded[contractor_id] = awarded.get(contractor_id, 0) + (value or 0)
+    total = sum(awarded.values())
+    if total > 0:
+        top_id, top_value = max(awarded.items(), key=lambda kv: (kv[1], kv[0]))
+        share = top_value / total
+        if share >= AWARD_CONCENTRATION_SHARE:
+            won = [t[0] for t in tenders if t[1] == top_id]
+            patterns.append({
+                "id": _pattern_id("award", county, category, top_id),
+                "type": "award_concentration",
+                "severity": "high" if share >= 0.75 else "medium",
+                "title": f"{top_id} holds {share:.0%} of {category} awards in {county}",
+                "county": county,
+                "category": category,
+                "contractors": [top_id],
+                "tenders": won[:50],
+                "evidence": {
+                    "share": round(share, 3),
+                    "hhi": round(sum((v / total) ** 2 for v in awarded.values()), 3),
+                    "contractorTenders": len(won),
+                    "partitionTenders": len(tenders),
+                    "partitionContractors": len(awarded),
+                },
+            })
+
+    ratios = [(value / benchmark, tender_id, contractor_id) for tender_id, contractor_id, value, benchmark in tenders
+              if value and benchmark]
+    if len(ratios) >= PATTERN_MIN_PARTITION:
+        values = [r for r, _, _ in ratios]
+        median = statistics.median(values)
+        spread = statistics.median(abs(r - median) for r in values) * 1.4826  # MAD, scaled to a std dev
+        if spread == 0:
+            spread = statistics.fmean(abs(r - median) for r in values) * 1.2533
+        if spread > 0:
+            for ratio, tender_id, contractor_id in ratios:
+                score = (ratio - median) / spread
+                if score >= PRICE_OUTLIER_SCORE:
+                    patterns.append({
+                        "id": _pattern_id("price", tender_id),
+                        "type": "price_outlier",
+                        "severity": "high" if score >= 2 * PRICE_OUTLIER_SCORE else "medium",
+                        "title": f"Tender {tender_id} priced at {ratio:.1f}x benchmark ({category}, {county})",
+                        "county": county,
+                        "category": category,
+                        "contractors": [contractor_id] if contractor_id else [],
+                        "tenders": [tender_id],
+                        "evidence": {"priceRatio": round(ratio, 3), "medianRatio": round(median, 3), "score": round(score, 2)},
+                    })
+    return patterns
+
+
+def _phone_key(phone) -> str:
+    digits = "".join(ch for ch in str(phone) if ch.isdigit())
+    return digits[-9:] if len(digits) >= 9 else ""  # +2547.. and 07.. are the same line
+
+
+def detect_shared_attributes(contractors) -> list[dict]:
+    """
+    Networks of contractors linked by shared attributes.
+    contractors = [(id, name, kra pin, phone, address, (directors...), ((county, category), ...)), ...].
+    """
+    parent = list(range(len(contractors)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    holders: dict[tuple, list[int]] = {}
+    for i, (_, _, kra_pin, phone, address, directors, _) in enumerate(contractors):
+        keys = {("kraPin", (kra_pin or "").strip().upper()), ("phone", _phone_key(phone or "")),
+                ("address", normalize(address or ""))}
+        keys.update(("director", normalize(d)) for d in directors if d)
+        for key in keys:
+            if key[1]:
+                holders.setdefault(key, []).append(i)
+    links: list[tuple[int, int, str, str]] = [
+        (members[0], other, attribute, value)
+        for (attribute, value), members in holders.items()
+        if 1 < len(members) <= MAX_SHARED
+        for other in members[1:]
+    ]
+
+    rows = [{"name": c[1], "kraPin": c[2]} for c in contractors]
+    for pair in FuzzyIndex(rows, (("name", ("name",)), ("kraPin", ("kraPin",)))).near_duplicates(
+        NEAR_DUPLICATE_THRESHOLD
+    ):
+        a, b = pair["rows"]
+        links.append((a, b, f"similar {pair['field']}", " / ".join(str(v) for v in pair["values"])))
+
+    links.sort()  # set/dict order differs between worker processes (hash seeds)
+    for a, b, _, _ in links:
+        parent[find(a)] = find(b)
+    networks: dict[int, list] = {}
+    for link in links:
+        networks.setdefault(find(link[0]), []).append(link)
+
+    patterns = []
+    for network in networks.values():
+        members = sorted({i for a, b, _, _ in network for i in (a, b)})
+        ids = [contractors[i][0] for i in members]
+        seen_markets = Counter(market for i in members for market in contractors[i][6])
+        shared_markets = {market for market, count in seen_markets.items() if count > 1}
+        patterns.append({
+            "id": _pattern_id("shared", *sorted(ids)),
+            "type": "shared_attributes",
+            "severity": "high" if shared_markets else "medium",
+            "title": f"{len(ids)} contractors share " + ", ".join(sorted({attr for _, _, attr, _ in network})),
+            "county": None,
+            "category": None,
+            "contractors": ids,
+            "tenders": [],
+            "evidence": {
+                "links": [
+                    {"contractors": [contractors[a][0], contractors[b][0]], "attribute": attr, "value": value}
+                    for a, b, attr, value in network[:50]
+                ],
+                "sharedMarkets": [{"county": c, "category": k} for c, k in sorted(shared_markets)],
+            },
+        })
+    return patterns
+
+
+# --- Orchestration ---
+
+def _inputs(repo):
+    """Tender partitions and contractor tuples, streamed from the repository."""
+    partitions: dict[tuple, list] = {}
+    markets: dict[str, set] = {}
+    tender_count = 0
+    for batch in repo.export_tenders():
+        for t in batch:
+            key = (t.get("county") or "Unknown", t.get("category") or "Uncategorized")
+            contractor_id = t.get("contractor_id")
+            partitions.setdefault(key, []).append((t.get("id"), contractor_id, t.get("value"), t.get("benchmark_value")))
+            if contractor_id:
+                markets.setdefault(contractor_id, set()).add(key)
+            tender_count += 1
+    contractors = [
+        (
+            c.get("id"),
+            c.get("name"),
+            c.get("kra_pin") or c.get("kraPin"),
+            c.get("phone") or c.get("contactPhone"),
+            c.get("address"),
+            tuple(c.get("directors") or ()),
+            tuple(sorted(markets.get(c.get("id"), ()))),
+        )
+        for c in repo.list_contractors()
+    ]
+    return [(county, category, rows) for (county, category), rows in partitions.items()], contractors, tender_count
+
+
+_SEVERITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+_process_pool: ProcessPoolExecutor | None = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                # spawn: forking a process that runs thread pools can copy held locks
+                _process_pool = ProcessPoolExecutor(PATTERN_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool
+
+
+def detect_patterns(repo, parallel: bool | None = None) -> list[dict]:
+    """Run every detector over the repository's current data, most severe first."""
+    partitions, contractors, tender_count = _inputs(repo)
+    if parallel is None:
+        parallel = tender_count >= PATTERN_PARALLEL_MIN_TENDERS
+    if parallel:
+        pool = _get_process_pool()
+        shared = pool.submit(detect_shared_attributes, contractors)
+        # Largest partitions first so one big county does not finish last
+        partitions.sort(key=lambda p: -len(p[2]))
+        chunksize = max(1, len(partitions) // (4 * (PATTERN_WORKERS or 4)))
+        per_partition = list(pool.map(detect_partition, partitions, chunksize=chunksize))
+        patterns = shared.result()
+    else:
+        per_partition = [detect_partition(p) for p in partitions]
+        patterns = detect_shared_attributes(contractors)
+    for found in per_partition:
+        patterns.extend(found)
+    patterns.sort(key=lambda p: (_SEVERITY_ORDER[p["severity"]], p["type"], p["id"]))
+    return patterns
+
+
+class PatternCache:
+    """Last detection result per repository data version, refreshed in the background."""
+
+    def __init__(self):
+        self.version = None
+        self.patterns: list[dict] | None = None
+        self.generated_at: str | None = None
+        self._pending: Future | None = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="patterns")
+
+    def _refresh(self, repo, version) -> None:
+        patterns = detect_patterns(repo)
+        with self._lock:
+            self.version, self.patterns = version, patterns
+            self.generated_at = datetime.now(timezone.utc).isoformat()
+
+    def get(self, repo) -> tuple[list[dict], bool]:
+        """(patterns, fresh). Blocks only until the first run has finished."""
+        version = repo.data_version()
+        with self._lock:
+            if self.version == version:
+                return self.patterns, True
+            if self._pending is None or self._pending.done():
+                # Done but not current: the data moved on, or the run failed
+                self._pending = self._executor.submit(self._refresh, repo, version)
+            pending, patterns = self._pending, self.patterns
+        if patterns is not None:
+            return patterns, False
+        pending.result()
+        with self._lock:
+            return self.patterns, self.version == version
+
+
+pattern_cache = PatternCache()
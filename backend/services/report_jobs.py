@@ -0,0 +1,447 @@
+"""
+Background report generation for /reports/generate.
+
+`POST /reports/generate` only records a job and returns its report id; a
+small worker pool renders the report from one of the TEMPLATES while the
+client polls `/reports/{id}` for `status` and `progress`.
+
+- Jobs live in a SQLite table (data/report_jobs.db, WAL, through the
+  services/db.py pool), so they survive a restart: jobs left queued, or
+  running in a process that is gone, are picked up again on startup.
+- Identical requests (same template, title, period and filters) while one
+  is still queued or generating get the existing job back instead of a
+  second render. A partial unique index enforces this across processes.
+- A worker claims a job with a conditional UPDATE, renders it section by
+  section (tenders, payments and posts are streamed from the repository
+  in batches, so county-wide reports never load a whole ledger), and
+  records progress after each section.
+- Finished artifacts (JSON and Markdown) are written once to
+  data/reports/ and served as files by `/reports/{id}/export`.
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from config import REPORT_WORKERS
+from services.data_loader import BASE_DIR, load_mock_data
+from services.db import get_pool
+from services.repository import get_repository, risk_level
+
+JOBS_DB_PATH = os.path.join(BASE_DIR, "data", "report_jobs.db")
+ARTIFACT_DIR = os.path.join(BASE_DIR, "data", "reports")
+
+# Identifies this process in worker_instance. A PID alone is not enough: a
+# restarted process (in a container, typically) can get the PID its
+# predecessor had, and would then take that predecessor's jobs for its own.
+INSTANCE_ID = uuid.uuid4().hex
+
+ARTIFACT_FORMATS = {"json": "application/json", "md": "text/markdown"}
+
+TEMPLATES = (
+    {"id": "tpl_001", "name": "Blacklist Summary", "type": "summary", "category": "blacklist"},
+    {"id": "tpl_002", "name": "Fraud Monthly", "type": "monthly", "category": "fraud"},
+    {"id": "tpl_003", "name": "Compliance Annual", "type": "annual", "category": "compliance"},
+    {"id": "tpl_004", "name": "Compliance Monthly", "type": "monthly", "category": "compliance"},
+    {"id": "tpl_005", "name": "Compliance Quarterly", "type": "quarterly", "category": "compliance"},
+)
+
+TOP_ROWS = 100  # rows kept per report table; summaries always cover everything
+
+JOBS_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS report_jobs (
+        id TEXT PRIMARY KEY,
+        dedupe_key TEXT,
+        template_id TEXT,
+        title TEXT,
+        type TEXT,
+        category TEXT,
+        period TEXT,
+        filters TEXT,
+        recipients TEXT,
+        status TEXT,
+        progress REAL,
+        stage TEXT,
+        error TEXT,
+        worker_pid INTEGER,
+        worker_instance TEXT,
+        created_at TEXT,
+        started_at TEXT,
+        finished_at TEXT,
+        size INTEGER,
+        page_count INTEGER
+    )
+    """,
+    # At most one active job per identical request
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_report_jobs_active
+    ON report_jobs(dedupe_key) WHERE status IN ('queued', 'generating')
+    """,
+)
+
+
+def find_template(report_type: str, category: str) -> dict | None:
+    for template in TEMPLATES:
+        if template["type"] == report_type.lower() and template["category"] == category.lower():
+            return template
+    return None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _human_size(size: int | None) -> str | None:
+    if size is None:
+        return None
+    for unit in ("B", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+# --- Sections: each returns {"title", "summary", "rows"} ---
+
+def _ranked(rows, columns, key, total):
+    """(count, sum of `total`, top TOP_ROWS rows by `key`) over a row stream, in constant memory."""
+    count, amount, top = 0, 0, []
+    for row in rows:
+        count += 1
+        amount += row.get(total) or 0
+        entry = (row.get(key) or 0, -count, {c: row.get(c) for c in columns})
+        if len(top) < TOP_ROWS:
+            heapq.heappush(top, entry)
+        elif entry[:2] > top[0][:2]:
+            heapq.heapreplace(top, entry)
+    return count, amount, [entry[2] for entry in sorted(top, reverse=True)]
+
+
+def _overview(repo, county):
+    count, total, by_status, anomalies = 0, 0, {}, 0
+    for batch in repo.export_tenders(county):
+        for t in batch:
+            count += 1
+            total += t.get("value") or 0
+            status = t.get("status") or "Unknown"
+            by_status[status] = by_status.get(status, 0) + 1
+            anomalies += bool(t.get("is_critical"))
+    summary = {"tenders": count, "totalValue": total, "priceAnomalies": anomalies, **{f"status:{k}": v for k, v in by_status.items()}}
+    return {"title": "Overview", "summary": summary, "rows": []}
+
+
+def _price_anomalies(repo, county):
+    count, value, rows = _ranked(
+        (t for batch in repo.export_tenders(county) for t in batch if t.get("is_critical")),
+        ("id", "title", "county", "contractor_id", "value", "benchmark_value", "price_ratio"),
+        key="price_ratio", total="value",
+    )
+    return {"title": "Price anomalies", "summary": {"flaggedTenders": count, "flaggedValue": value}, "rows": rows}
+
+
+def _stalled_projects(repo, county):
+    count, value, rows = _ranked(
+        (t for batch in repo.export_tenders(county, status="Stalled") for t in batch),
+        ("id", "title", "county", "contractor_id", "value", "days_overdue"),
+        key="value", total="value",
+    )
+    return {"title": "Stalled projects", "summary": {"stalledTenders": count, "stalledValue": value}, "rows": rows}
+
+
+def _chronic_payments(repo, county):
+    count, amount, rows = _ranked(
+        (p for batch in repo.export_payments(county) for p in batch if p.get("risk_flag") == "Chronic Pending"),
+        ("invoice_id", "entity_name", "amount", "days_outstanding"),
+        key="days_outstanding", total="amount",
+    )
+    return {"title": "Chronic pending payments", "summary": {"chronicInvoices": count, "chronicAmount": amount}, "rows": rows}
+
+
+def _county_reputation(repo, county):
+    rows = repo.county_leaderboard()
+    if county:
+        rows = [r for r in rows if r["county"].lower() == county.lower()]
+    return {
+        "title": "County reputation",
+        "summary": {"counties": len(rows), "averageScore": round(sum(r["score"] for r in rows) / len(rows), 1) if rows else None},
+        "rows": rows[:TOP_ROWS],
+    }
+
+
+def _fraud_alerts(repo, county):
+    alerts = load_mock_data("fraudAlerts")
+    by_severity: dict = {}
+    for a in alerts:
+        by_severity[a.get("severity")] = by_severity.get(a.get("severity"), 0) + 1
+    columns = ("id", "title", "severity", "status", "detectedAt")
+    return {
+        "title": "Fraud alerts",
+        "summary": {"alerts": len(alerts), **{f"severity:{k}": v for k, v in by_severity.items()}},
+        "rows": [{c: a.get(c) for c in columns} for a in alerts[:TOP_ROWS]],
+    }
+
+
+def _citizen_reports(repo, county):
+    count, by_category = 0, {}
+    for batch in repo.export_posts(county):
+        for p in batch:
+            count += 1
+            category = p.get("category") or "Uncategorized"
+            by_category[category] = by_category.get(category, 0) + 1
+    rows = [{"category": k, "posts": v} for k, v in sorted(by_category.items(), key=lambda kv: -kv[1])]
+    return {"title": "Citizen reports", "summary": {"posts": count}, "rows": rows}
+
+
+def _high_risk_contractors(repo, county):
+    names = {c.get("id"): c.get("name") for c in repo.list_contractors()}
+    rows = [
+        {"contractor_id": cid, "name": names.get(cid), "trust_score": score, "risk_level": risk_level(score)}
+        for cid, score in repo.contractor_scores().items()
+        if score < 50
+    ]
+    rows.sort(key=lambda r: (r["trust_score"], r["contractor_id"]))
+    return {"title": "High-risk contractors", "summary": {"highRisk": len(rows)}, "rows": rows[:TOP_ROWS]}
+
+
+def _blacklisted_contractors(repo, county):
+    columns = ("id", "name", "kraPin", "region", "blacklistReason")
+    rows = [
+        {c: x.get(c) for c in columns}
+        for x in load_mock_data("contractors")
+        if x.get("blacklisted") and (not county or (x.get("region") or "").lower() == county.lower())
+    ]
+    return {"title": "Blacklisted contractors", "summary": {"blacklisted": len(rows)}, "rows": rows}
+
+
+SECTIONS = {
+    "blacklist": (_blacklisted_contractors, _high_risk_contractors),
+    "fraud": (_overview, _price_anomalies, _fraud_alerts, _citizen_reports),
+    "compliance": (_overview, _stalled_projects, _chronic_payments, _county_reputation),
+}
+
+
+def render_markdown(report: dict) -> str:
+    lines = [f"# {report['title']}", "", f"{report['description']}", ""]
+    for section in report["sections"]:
+        lines += [f"## {section['title']}", ""]
+        lines += [f"- **{k}**: {v}" for k, v in section["summary"].items()] + [""]
+        rows = section["rows"]
+        if rows:
+            columns = list(rows[0])
+            lines.append("| " + " | ".join(columns) + " |")
+            lines.append("|" + "---|" * len(columns))
+            for row in rows:
+                cells = ("" if row.get(c) is None else str(row.get(c)).replace("|", "\\|") for c in columns)
+                lines.append("| " + " | ".join(cells) + " |")
+            lines.append("")
+    return "\n".join(lines)
+
+
+# --- Queue ---
+
+def _pid_alive(pid: int | None) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _worker_alive(pid: int | None, instance: str | None) -> bool:
+    """Whether the process that claimed a job is still running it."""
+    if instance == INSTANCE_ID:
+        return True
+    if pid == os.getpid():
+        return False  # our PID, another instance: a previous process that held it
+    return _pid_alive(pid)
+
+
+class ReportQueue:
+    """Persisted job table plus the worker threads that render the jobs."""
+
+    def __init__(self, db_path: str = JOBS_DB_PATH, artifact_dir: str = ARTIFACT_DIR, workers: int = REPORT_WORKERS):
+        self.pool = get_pool(db_path)
+        self.artifact_dir = artifact_dir
+        os.makedirs(artifact_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="report")
+        with self.pool.writer() as conn:
+            for statement in JOBS_DDL:
+                conn.execute(statement)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(report_jobs)")}
+            if "worker_instance" not in columns:  # table created before the column existed
+                conn.execute("ALTER TABLE report_jobs ADD COLUMN worker_instance TEXT")
+        self._recover()
+
+    def _recover(self) -> None:
+        """Requeue jobs whose worker process died, and resume queued ones."""
+        rows = self.pool.query(
+            "SELECT id, status, worker_pid, worker_instance FROM report_jobs WHERE status IN ('queued', 'generating')"
+        )
+        for row in rows:
+            if row["status"] == "generating":
+                if _worker_alive(row["worker_pid"], row["worker_instance"]):
+                    continue
+                with self.pool.writer() as conn:
+                    conn.execute(
+                        "UPDATE report_jobs SET status = 'queued', progress = 0, stage = NULL WHERE id = ? AND status = 'generating'",
+                        (row["id"],),
+                    )
+            self._executor.submit(self._run, row["id"])
+
+    def _job(self, job_id: str):
+        rows = self.pool.query("SELECT * FROM report_jobs WHERE id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def submit(self, title, report_type, category, period, filters=None, recipients=None) -> tuple[dict, bool]:
+        """
+        Queue a report; returns (report, created). created is False when an
+        identical request is already queued or generating.
+        """
+        template = find_template(report_type, category)
+        if template is None:
+            raise ValueError(f"No report template for type '{report_type}' and category '{category}'")
+        filters = filters or {}
+        key = hashlib.sha256(
+            json.dumps([template["id"], title, period, filters], sort_keys=True, default=str).encode()
+        ).hexdigest()
+        job_id = f"report_{uuid.uuid4().hex[:12]}"
+        try:
+            with self.pool.writer() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO report_jobs (id, dedupe_key, template_id, title, type, category, period, filters,
+                                             recipients, status, progress, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'queued', 0, ?)
+                    """,
+                    (job_id, key, template["id"], title, template["type"], template["category"], period,
+                     json.dumps(filters, default=str), json.dumps(recipients or []), _now()),
+                )
+        except sqlite3.IntegrityError:
+            rows = self.pool.query(
+                "SELECT * FROM report_jobs WHERE dedupe_key = ? AND status IN ('queued', 'generating')", (key,)
+            )
+            if rows:
+                return self._report(rows[0]), False
+            return self.submit(title, report_type, category, period, filters, recipients)  # finished meanwhile
+        self._executor.submit(self._run, job_id)
+        return self._report(self._job(job_id)), True
+
+    def _progress(self, job_id: str, progress: float, stage: str | None) -> None:
+        with self.pool.writer() as conn:
+            conn.execute("UPDATE report_jobs SET progress = ?, stage = ? WHERE id = ?", (round(progress, 3), stage, job_id))
+
+    def _run(self, job_id: str) -> None:
+        with self.pool.writer() as conn:
+            claimed = conn.execute(
+                """
+                UPDATE report_jobs SET status = 'generating', started_at = ?, worker_pid = ?, worker_instance = ?
+                WHERE id = ? AND status = 'queued'
+                """,
+                (_now(), os.getpid(), INSTANCE_ID, job_id),
+            ).rowcount
+        if not claimed:
+            return
+        job = self._job(job_id)
+        try:
+            filters = json.loads(job["filters"] or "{}")
+            county = filters.get("county")
+            repo = get_repository()
+            sections = SECTIONS[job["category"]]
+            rendered = []
+            for i, section in enumerate(sections):
+                self._progress(job_id, i / len(sections), section.__name__.strip("_"))
+                rendered.append(section(repo, county))
+            report = {**self._report(job), "status": "published", "sections": rendered}
+            for key in ("progress", "stage", "fileUrl", "size", "pageCount"):
+                report.pop(key, None)
+            report["generatedAt"] = _now()
+            markdown = render_markdown(report)
+            size = self._write_artifact(job_id, "json", json.dumps(report, default=str, ensure_ascii=False).encode())
+            self._write_artifact(job_id, "md", markdown.encode())
+            with self.pool.writer() as conn:
+                conn.execute(
+                    """
+                    UPDATE report_jobs SET status = 'published', progress = 1, stage = NULL, finished_at = ?,
+                                           size = ?, page_count = ?
+                    WHERE id = ?
+                    """,
+                    (report["generatedAt"], size, max(1, math.ceil(markdown.count("\n") / 50)), job_id),
+                )
+        except Exception as exc:
+            with self.pool.writer() as conn:
+                conn.execute(
+                    "UPDATE report_jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                    (f"{type(exc).__name__}: {exc}", _now(), job_id),
+                )
+
+    def artifact_path(self, job_id: str, fmt: str) -> str:
+        return os.path.join(self.artifact_dir, f"{job_id}.{fmt}")
+
+    def _write_artifact(self, job_id: str, fmt: str, payload: bytes) -> int:
+        path = self.artifact_path(job_id, fmt)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        return len(payload)
+
+    @staticmethod
+    def _report(row) -> dict:
+        """A job in the shape of the mock report records."""
+        published = row["status"] == "published"
+        report = {
+            "id": row["id"],
+            "title": row["title"],
+            "description": f"Auto-generated {row['type']} {row['category']} report for {row['period']}",
+            "type": row["type"],
+            "category": row["category"],
+            "period": row["period"],
+            "templateId": row["template_id"],
+            "filters": json.loads(row["filters"] or "{}"),
+            "requestedAt": row["created_at"],
+            "generatedAt": row["finished_at"] if published else None,
+            "generatedBy": "System",
+            "status": row["status"],
+            "progress": row["progress"],
+            "stage": row["stage"],
+            "fileUrl": f"/reports/{row['id']}/export" if published else None,
+            "size": _human_size(row["size"]),
+            "pageCount": row["page_count"],
+            "recipients": json.loads(row["recipients"] or "[]"),
+            "accessLevel": "restricted",
+        }
+        if row["status"] == "failed":
+            report["error"] = row["error"]
+        return report
+
+    def get(self, job_id: str) -> dict | None:
+        row = self._job(job_id)
+        return self._report(row) if row is not None else None
+
+    def list(self) -> list[dict]:
+        return [self._report(r) for r in self.pool.query("SELECT * FROM report_jobs ORDER BY created_at DESC")]
+
+
+_queue: ReportQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_report_queue() -> ReportQueue:
+    """The process-wide report queue; main.py creates it at startup, which resumes interrupted jobs."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = ReportQueue(JOBS_DB_PATH, ARTIFACT_DIR)
+    return _queue
@@ -0,0 +1,637 @@
+"""
+Repository layer for tenders, contractors, posts and payments.
+
+The /api endpoints in main.py talk to a repository instead of reading files
+directly. Two backends implement the same methods:
+
+- JsonRepository   — the cached JSON snapshots in data/ (default).
+- SqliteRepository — transparent_procure.db built by migrate_to_db.py.
+                     Filtering, pagination and aggregation run in SQL on
+                     indexed columns, so the full dataset never has to be
+                     loaded into a worker's memory.
+
+Pick one with TP_DATA_BACKEND=json|sqlite (see config.py).
+
+Async handlers call methods through `await repo.run(repo.method, ...)`:
+the JSON backend refreshes its snapshots off the event loop and then answers
+inline from memory, the SQLite backend runs the query on the connection
+pool's threads (services/db.py).
+"""
+
+import json
+import os
+import sqlite3
+from itertools import islice
+
+from config import CHRONIC_PENDING_DAYS, DATA_BACKEND, EXPORT_BATCH_ROWS, PRICE_ANOMALY_MULTIPLIER
+from services.async_loader import prefetch, run_blocking
+from services.data_loader import DB_PATH, append_json, find_row_id, load_json, load_snapshot
+from services.db import get_pool
+from services.derived import payment_risk_flags, tender_risk
+from services.expand_data import all_counties
+from services.indexes import intersect, post_index, tender_index
+from services.pagination import id_order
+from services.reputation import county_score_entry, entity_county_map, rank_counties
+from services.reputation_engine import RULES, current_engine
+from services.snapshot import FrozenDict, FrozenList
+from utils.response import Encoded, encoded_rows
+
+
+def risk_level(trust_score: int) -> str:
+    """Visual risk tier for the frontend."""
+    if trust_score >= 80:
+        return "Low"
+    if trust_score >= 50:
+        return "Medium"
+    return "High (Blacklist Warning)"
+
+
+def _equals(row, field, value) -> bool:
+    """Case-insensitive filter match; an empty filter matches everything."""
+    return not value or (row.get(field) or "").lower() == value.lower()
+
+
+def _batches(rows, size: int):
+    """Lists of up to size items from an iterator, for streaming exports."""
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+class JsonRepository:
+    """Reads the cached, read-only JSON snapshots."""
+
+    name = "json"
+    files = ("tender.json", "posts.json", "payment.json", "contractors.json")
+
+    async def run(self, fn, *args, **kwargs):
+        # Stats/parses happen on the loader threads. Derived columns for a
+        # freshly reloaded snapshot are built on first use, which can be
+        # heavy, so the call itself also runs there.
+        await prefetch(*self.files)
+        return await run_blocking(fn, *args, **kwargs)
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+    def data_version(self) -> tuple:
+        """Changes whenever any of the data files does."""
+        return tuple(load_snapshot(f).version for f in self.files)
+
+    def list_tenders(self, county=None, category=None, status=None, skip=0, limit=100):
+        snapshot = load_snapshot("tender.json")
+        rows = snapshot.rows
+        # Index intersection, case-insensitive; then attach the precomputed
+        # risk columns to the returned page only
+        ids = snapshot.derive("index", tender_index).filter(county, category, status)
+        risk = snapshot.derive("risk", tender_risk)
+        return len(ids), [{**rows[i], **risk.overlay(i)} for i in ids[skip : skip + limit]]
+
+    def page_tenders(self, county=None, category=None, status=None, after=None, limit=100):
+        """
+        Keyset page ordered by (id, row position): (rows, next key), next key
+        None on the last page. Unfiltered pages bisect a sorted id order;
+        filtered pages select from the index matches.
+        """
+        snapshot = load_snapshot("tender.json")
+        rows = snapshot.rows
+        candidates = None
+        if county or category or status:
+            candidates = snapshot.derive("index", tender_index).filter(county, category, status)
+        ids, next_key = snapshot.derive("id_order", id_order).page(after, limit, candidates)
+        risk = snapshot.derive("risk", tender_risk)
+        return [{**rows[i], **risk.overlay(i)} for i in ids], next_key
+
+    def get_tender(self, tender_id):
+        snapshot = load_snapshot("tender.json")
+        row_id = find_row_id(snapshot, tender_id)
+        if row_id is None:
+            return None
+        return {**snapshot.rows[row_id], **snapshot.derive("risk", tender_risk).overlay(row_id)}
+
+    def county_stats(self):
+        # Per-county aggregates are maintained by the tender index
+        return list(load_snapshot("tender.json").derive("index", tender_index).county_stats)
+
+    def list_posts(self, ward_id=None, category=None):
+        """
+        Citizen posts, optionally filtered. ward_id matches ward, wardId or
+        category exactly, or a county named in the ward label; category is
+        case-insensitive. Both are index lookups (services/indexes.py).
+        """
+        snapshot = load_snapshot("posts.json")
+        posts = snapshot.rows
+        if not ward_id and not category:
+            return posts
+        return [posts[i] for i in self._post_ids(snapshot, ward_id, category)]
+
+    @staticmethod
+    def _post_ids(snapshot, ward_id, category):
+        index = post_index(snapshot)
+        id_lists = []
+        if ward_id:
+            id_lists.append(index.match_ward(ward_id))
+        if category:
+            id_lists.append(index.category(category))
+        return intersect(*id_lists)
+
+    def posts_json(self, ward_id=None, category=None) -> Encoded:
+        """list_posts as JSON, spliced from the per-row encodings of the snapshot."""
+        snapshot = load_snapshot("posts.json")
+        encoded = encoded_rows(snapshot)
+        if not ward_id and not category:
+            return Encoded.join(encoded)
+        return Encoded.join(encoded[i] for i in self._post_ids(snapshot, ward_id, category))
+
+    def page_posts(self, ward_id=None, category=None, after=None, limit=10):
+        """
+        list_posts as a keyset page: newest first by (timestamp, id), older
+        than the cursor key `after`.
+        """
+        snapshot = load_snapshot("posts.json")
+        posts = snapshot.rows
+        return [posts[i] for i in post_index(snapshot).newest_matching(posts, ward_id, category, after, limit)]
+
+    def ward_feed(self, ward_id):
+        """Citizen posts whose ward or wardId contains ward_id (case-insensitive)."""
+        snapshot = load_snapshot("posts.json")
+        return [snapshot.rows[i] for i in post_index(snapshot).search_ward(ward_id)]
+
+    def page_ward_feed(self, ward_id, after=None, limit=10):
+        """ward_feed as a keyset page, newest first."""
+        snapshot = load_snapshot("posts.json")
+        index = post_index(snapshot)
+        return [snapshot.rows[i] for i in index.newest(index.search_groups(ward_id), after, limit)]
+
+    def create_post(self, post) -> None:
+        # Visible to readers immediately; written to posts.json by the write-behind queue
+        append_json("posts.json", [post])
+
+    def list_payments(self, county=None):
+        snapshot = load_snapshot("payment.json")
+        payments = list(enumerate(snapshot.rows))
+        # Filter by checking if the search term is IN the entity_name
+        if county:
+            payments = [(i, p) for i, p in payments if county.lower() in p.get("entity_name", "").lower()]
+        risk_flags = snapshot.derive("risk_flags", payment_risk_flags)
+        return [{**p, "risk_flag": risk_flags[i]} for i, p in payments]
+
+    def list_contractors(self):
+        return load_json("contractors.json")
+
+    # --- Bulk export: row batches from one snapshot, streamed by services/export.py ---
+
+    def export_tenders(self, county=None, category=None, status=None, batch_size=EXPORT_BATCH_ROWS):
+        snapshot = load_snapshot("tender.json")
+        rows = snapshot.rows
+        ids = snapshot.derive("index", tender_index).filter(county, category, status)
+        risk = snapshot.derive("risk", tender_risk)
+        for start in range(0, len(ids), batch_size):
+            yield [{**rows[i], **risk.overlay(i)} for i in ids[start : start + batch_size]]
+
+    def export_payments(self, county=None, status=None, batch_size=EXPORT_BATCH_ROWS):
+        # county matches inside entity_name, like list_payments
+        snapshot = load_snapshot("payment.json")
+        risk_flags = snapshot.derive("risk_flags", payment_risk_flags)
+        yield from _batches(
+            (
+                {**p, "risk_flag": risk_flags[i]}
+                for i, p in enumerate(snapshot.rows)
+                if (not county or county.lower() in p.get("entity_name", "").lower()) and _equals(p, "status", status)
+            ),
+            batch_size,
+        )
+
+    def export_posts(self, county=None, category=None, status=None, batch_size=EXPORT_BATCH_ROWS):
+        posts = load_snapshot("posts.json").rows
+        yield from _batches(
+            (
+                p for p in posts
+                if _equals(p, "county", county) and _equals(p, "category", category) and _equals(p, "status", status)
+            ),
+            batch_size,
+        )
+
+    def contractor_exists(self, contractor_id) -> bool:
+        return current_engine().has_contractor(contractor_id) or (
+            find_row_id(load_snapshot("contractors.json"), contractor_id) is not None
+        )
+
+    def contractor_scores(self) -> dict:
+        return current_engine().contractor_scores()
+
+    def explain(self, contractor_id):
+        return current_engine().explain(contractor_id)
+
+    def explain_all(self):
+        return current_engine().explain_all()
+
+    def county_leaderboard(self):
+        engine = current_engine()
+        return engine.county_leaderboard(engine.counties())
+
+
+# --- SQLite ---
+
+_FLAGGED_TENDERS = """
+    SELECT rowid AS row_id, id, contractor_id, county,
+           COALESCE(status = 'Stalled', 0) AS stalled,
+           COALESCE(value / NULLIF(benchmark_value, 0) > :multiplier, 0) AS anomaly,
+           -- EXISTS, not IN: a NULL referenceId would make IN NULL for every other tender
+           EXISTS (
+               SELECT 1 FROM posts p WHERE p.referenceId = tenders.id AND p.status = 'delay_reported'
+           ) AS delayed
+    FROM tenders
+"""
+
+_TENDER_COLUMNS = """
+    *, COALESCE(NULLIF(title, ''), NULLIF(name, ''), 'Untitled Project') AS display_title,
+    value / NULLIF(benchmark_value, 0) AS price_ratio,
+    COALESCE(value / NULLIF(benchmark_value, 0) > :multiplier, 0) AS is_critical
+"""
+
+
+def _penalty_sql(weight_index: int) -> str:
+    stalled, anomaly, delayed = (RULES[r][weight_index] for r in ("stalled", "price_anomaly", "citizen_delay"))
+    return f"COALESCE(SUM(stalled * {stalled} + anomaly * {anomaly} + delayed * {delayed}), 0)"
+
+
+def _number(value):
+    """SQLite REAL sums back to int when they are whole numbers, like the JSON data."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class SqliteRepository:
+    """Pushes filtering, pagination and aggregation down into SQLite."""
+
+    name = "sqlite"
+
+    # Columns added to migrate_to_db.py after databases were already built:
+    # (table, column, type). Added empty (NULL) so an old database keeps
+    # working; re-run the migration to fill them.
+    _ADDED_COLUMNS = (("tenders", "name", "TEXT"), ("posts", "ward", "TEXT"))
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self.pool = get_pool(db_path)
+        self._add_missing_columns()
+
+    def _add_missing_columns(self) -> None:
+        missing = [
+            (table, column, kind) for table, column, kind in self._ADDED_COLUMNS
+            if column not in {row["name"] for row in self._query(f"PRAGMA table_info({table})")}
+        ]
+        if missing:
+            with self.pool.writer() as conn:
+                for table, column, kind in missing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+
+    async def run(self, fn, *args, **kwargs):
+        return await self.pool.run(fn, *args, **kwargs)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "pool": self.pool.stats()}
+
+    def data_version(self) -> tuple:
+        """Changes with every committed write: WAL commits touch the -wal file, checkpoints the database."""
+        version = []
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            try:
+                st = os.stat(path)
+                version.append((st.st_size, st.st_mtime_ns))
+            except OSError:
+                version.append(None)
+        return tuple(version)
+
+    def _query(self, sql: str, params=()) -> list[sqlite3.Row]:
+        return self.pool.query(sql, params)
+
+    # --- Tenders ---
+
+    @staticmethod
+    def _tender(row: sqlite3.Row) -> dict:
+        # A NULL column is a field the source tender did not have (days_overdue, name, ...)
+        tender = {
+            k: _number(row[k]) for k in row.keys()
+            if row[k] is not None and k not in ("row_id", "display_title", "price_ratio", "is_critical")
+        }
+        tender.update(
+            title=row["display_title"],
+            # Enforce DEMO DATA label globally
+            is_demo_data=True,
+            price_ratio=row["price_ratio"],
+            is_critical=bool(row["is_critical"]),
+        )
+        if tender["is_critical"]:
+            tender["risk_flag"] = "High Price Anomaly"
+        return tender
+
+    def list_tenders(self, county=None, category=None, status=None, skip=0, limit=100):
+        clauses, params = [], {"multiplier": PRICE_ANOMALY_MULTIPLIER}
+        for column, value in (("county", county), ("category", category), ("status", status)):
+            if value:
+                clauses.append(f"{column} = :{column} COLLATE NOCASE")
+                params[column] = value
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        total = self._query(f"SELECT COUNT(*) FROM tenders {where}", params)[0][0]
+        rows = self._query(
+            f"SELECT {_TENDER_COLUMNS} FROM tenders {where} ORDER BY rowid LIMIT :limit OFFSET :skip",
+            {**params, "limit": limit, "skip": skip},
+        )
+        return total, [self._tender(r) for r in rows]
+
+    def page_tenders(self, county=None, category=None, status=None, after=None, limit=100):
+        # Walks the primary key index from the cursor; rowid breaks ties
+        clauses, params = [], {"multiplier": PRICE_ANOMALY_MULTIPLIER, "limit": limit + 1}
+        for column, value in (("county", county), ("category", category), ("status", status)):
+            if value:
+                clauses.append(f"{column} = :{column} COLLATE NOCASE")
+                params[column] = value
+        if after is not None:
+            clauses.append("(id, rowid) > (:after_id, :after_rowid)")
+            params["after_id"], params["after_rowid"] = after
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(
+            f"SELECT rowid AS row_id, {_TENDER_COLUMNS} FROM tenders {where} ORDER BY id, rowid LIMIT :limit",
+            params,
+        )
+        next_key = (rows[limit - 1]["id"], rows[limit - 1]["row_id"]) if len(rows) > limit else None
+        return [self._tender(r) for r in rows[:limit]], next_key
+
+    def get_tender(self, tender_id):
+        rows = self._query(
+            f"SELECT {_TENDER_COLUMNS} FROM tenders WHERE id = :id LIMIT 1",
+            {"id": tender_id, "multiplier": PRICE_ANOMALY_MULTIPLIER},
+        )
+        return self._tender(rows[0]) if rows else None
+
+    def county_stats(self):
+        rows = self._query(
+            """
+            SELECT COALESCE(county, 'Unknown') AS name, COUNT(*) AS tender_count, SUM(value) AS total_value
+            FROM tenders GROUP BY county ORDER BY MIN(rowid)
+            """
+        )
+        return [
+            {"name": r["name"], "tender_count": r["tender_count"], "total_value": _number(r["total_value"])}
+            for r in rows
+        ]
+
+    # --- Posts / payments / contractors ---
+
+    @staticmethod
+    def _post(row: sqlite3.Row) -> dict:
+        post = {k: row[k] for k in row.keys() if not k.startswith("author_") and k != "row_id"}
+        post["author"] = {
+            "name": row["author_name"],
+            "avatar": row["author_avatar"],
+            "verified": bool(row["author_verified"]),
+        }
+        post["images"] = json.loads(row["images"] or "[]")
+        post["is_demo_data"] = bool(row["is_demo_data"])
+        if post["ward"] is None:
+            del post["ward"]  # set by POST /feed/posts, absent from posts.json
+        return post
+
+    # Same predicates as PostIndexView.match_ward / search_ward on the JSON backend
+    _WARD_MATCH = """(
+        ward = :ward
+        OR wardId = :ward
+        OR (county IS NOT NULL AND county != '' AND instr(:ward, county) > 0)
+        OR category = :ward
+    )"""
+    _WARD_SEARCH = "(instr(lower(ward), lower(:ward)) > 0 OR instr(lower(wardId), lower(:ward)) > 0)"
+
+    def list_posts(self, ward_id=None, category=None):
+        clauses, params = [], {}
+        if ward_id:
+            clauses.append(self._WARD_MATCH)
+            params["ward"] = ward_id
+        if category:
+            clauses.append("category = :category COLLATE NOCASE")
+            params["category"] = category
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return [self._post(r) for r in self._query(f"SELECT * FROM posts {where} ORDER BY rowid", params)]
+
+    def page_posts(self, ward_id=None, category=None, after=None, limit=10):
+        # Same filters as list_posts, read backwards along idx_posts_timestamp
+        clauses, params = [], {"limit": limit}
+        if ward_id:
+            clauses.append(self._WARD_MATCH)
+            params["ward"] = ward_id
+        if category:
+            clauses.append("category = :category COLLATE NOCASE")
+            params["category"] = category
+        return self._newest_posts(clauses, params, after)
+
+    def posts_json(self, ward_id=None, category=None) -> Encoded:
+        return Encoded.of(self.list_posts(ward_id, category))
+
+    def ward_feed(self, ward_id):
+        rows = self._query(
+            f"SELECT * FROM posts WHERE {self._WARD_SEARCH} ORDER BY rowid",
+            {"ward": ward_id},
+        )
+        return [self._post(r) for r in rows]
+
+    def page_ward_feed(self, ward_id, after=None, limit=10):
+        return self._newest_posts(
+            [self._WARD_SEARCH], {"ward": ward_id, "limit": limit}, after
+        )
+
+    def _newest_posts(self, clauses, params, after):
+        if after is not None:
+            clauses.append("(timestamp, id) < (:after_ts, :after_id)")
+            params["after_ts"], params["after_id"] = after
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(f"SELECT * FROM posts {where} ORDER BY timestamp DESC, id DESC LIMIT :limit", params)
+        return [self._post(r) for r in rows]
+
+    def create_post(self, post) -> None:
+        author = post.get("author") or {}
+        with self.pool.writer() as conn:
+            conn.execute(
+                """
+                INSERT INTO posts (id, title, content, status, ward, wardId, county, category, likes, comments,
+                                   referenceId, author_name, author_avatar, author_verified, timestamp,
+                                   images, is_demo_data)
+                VALUES (:id, :title, :content, :status, :ward, :wardId, :county, :category, :likes, :comments,
+                        :referenceId, :author_name, :author_avatar, :author_verified, :timestamp,
+                        :images, :is_demo_data)
+                """,
+                {
+                    **{k: post.get(k) for k in ("id", "title", "content", "status", "ward", "wardId",
+                                                 "county", "category", "likes", "comments", "referenceId", "timestamp")},
+                    "author_name": author.get("name"),
+                    "author_avatar": author.get("avatar"),
+                    "author_verified": author.get("verified"),
+                    "images": json.dumps(post.get("images", [])),
+                    "is_demo_data": post.get("is_demo_data", True),
+                },
+            )
+
+    @staticmethod
+    def _payment(row: sqlite3.Row) -> dict:
+        payment = {k: row[k] for k in row.keys() if k != "row_id"}
+        payment["amount"] = _number(payment["amount"])
+        for flag in ("is_chronic", "is_demo_data"):
+            if payment[flag] is not None:
+                payment[flag] = bool(payment[flag])
+        return payment
+
+    def list_payments(self, county=None):
+        sql = """
+            SELECT *, CASE WHEN status = 'Pending' AND days_outstanding > :chronic
+                           THEN 'Chronic Pending' END AS risk_flag
+            FROM payments
+        """
+        params = {"chronic": CHRONIC_PENDING_DAYS}
+        if county:
+            sql += " WHERE instr(lower(entity_name), lower(:county)) > 0"
+            params["county"] = county
+        return [self._payment(r) for r in self._query(sql + " ORDER BY rowid", params)]
+
+    # --- Bulk export: one rowid-keyset query per batch, so no cursor stays open ---
+
+    def _export(self, table, columns, filters, params, to_row, batch_size):
+        clauses = ["rowid > :last"]
+        for column, value, clause in filters:
+            if value:
+                clauses.append(clause)
+                params[column] = value
+        sql = f"SELECT rowid AS row_id, {columns} FROM {table} WHERE {' AND '.join(clauses)} ORDER BY rowid LIMIT :batch"
+        last = 0
+        while rows := self._query(sql, {**params, "last": last, "batch": batch_size}):
+            last = rows[-1]["row_id"]
+            yield [to_row(r) for r in rows]
+
+    def export_tenders(self, county=None, category=None, status=None, batch_size=EXPORT_BATCH_ROWS):
+        return self._export(
+            "tenders", _TENDER_COLUMNS,
+            [(c, v, f"{c} = :{c} COLLATE NOCASE") for c, v in (("county", county), ("category", category), ("status", status))],
+            {"multiplier": PRICE_ANOMALY_MULTIPLIER}, self._tender, batch_size,
+        )
+
+    def export_payments(self, county=None, status=None, batch_size=EXPORT_BATCH_ROWS):
+        return self._export(
+            "payments",
+            "*, CASE WHEN status = 'Pending' AND days_outstanding > :chronic THEN 'Chronic Pending' END AS risk_flag",
+            [
+                ("county", county, "instr(lower(entity_name), lower(:county)) > 0"),
+                ("status", status, "status = :status COLLATE NOCASE"),
+            ],
+            {"chronic": CHRONIC_PENDING_DAYS}, self._payment, batch_size,
+        )
+
+    def export_posts(self, county=None, category=None, status=None, batch_size=EXPORT_BATCH_ROWS):
+        return self._export(
+            "posts", "*",
+            [(c, v, f"{c} = :{c} COLLATE NOCASE") for c, v in (("county", county), ("category", category), ("status", status))],
+            {}, self._post, batch_size,
+        )
+
+    def list_contractors(self):
+        contractors = []
+        for r in self._query("SELECT * FROM contractors ORDER BY rowid"):
+            c = dict(r)
+            c["directors"] = json.loads(c["directors"] or "[]")
+            c["risk_flags"] = json.loads(c["risk_flags"] or "[]")
+            c["is_demo_data"] = bool(c["is_demo_data"])
+            contractors.append(c)
+        return contractors
+
+    def contractor_exists(self, contractor_id) -> bool:
+        return bool(self._query(
+            """
+            SELECT 1 FROM contractors WHERE id = :id
+            UNION ALL SELECT 1 FROM tenders WHERE contractor_id = :id
+            LIMIT 1
+            """,
+            {"id": contractor_id},
+        ))
+
+    # --- Scores ---
+
+    def contractor_scores(self) -> dict:
+        rows = self._query(
+            f"SELECT contractor_id, {_penalty_sql(0)} AS penalty FROM ({_FLAGGED_TENDERS}) GROUP BY contractor_id",
+            {"multiplier": PRICE_ANOMALY_MULTIPLIER},
+        )
+        return {r["contractor_id"]: max(0, min(100, 100 - r["penalty"])) for r in rows}
+
+    def _explanations(self, contractor_id=None) -> dict:
+        sql = f"SELECT * FROM ({_FLAGGED_TENDERS})"
+        params = {"multiplier": PRICE_ANOMALY_MULTIPLIER}
+        if contractor_id is not None:
+            sql += " WHERE contractor_id = :contractor_id"
+            params["contractor_id"] = contractor_id
+        breakdowns: dict = {}
+        for r in self._query(sql + " ORDER BY contractor_id, id, row_id", params):
+            entries = breakdowns.setdefault(r["contractor_id"], [])
+            for rule, column in (("stalled", "stalled"), ("price_anomaly", "anomaly"), ("citizen_delay", "delayed")):
+                if r[column]:
+                    entries.append(FrozenDict(rule=rule, tenderId=r["id"], penalty=RULES[rule][0]))
+        return breakdowns
+
+    @staticmethod
+    def _explanation(contractor_id, entries) -> FrozenDict:
+        if entries is None:
+            return FrozenDict(contractorId=contractor_id, trust_score=50, base=50, explain=FrozenList())
+        score = max(0, min(100, 100 - sum(e["penalty"] for e in entries)))
+        return FrozenDict(contractorId=contractor_id, trust_score=score, base=100, explain=FrozenList(entries))
+
+    def explain(self, contractor_id):
+        return self._explanation(contractor_id, self._explanations(contractor_id).get(contractor_id))
+
+    def explain_all(self):
+        return {c_id: self._explanation(c_id, entries) for c_id, entries in self._explanations().items()}
+
+    def county_leaderboard(self):
+        params = {"multiplier": PRICE_ANOMALY_MULTIPLIER}
+        tender_rows = self._query(
+            f"SELECT county, {_penalty_sql(1)} AS penalty, COUNT(*) AS tender_count "
+            f"FROM ({_FLAGGED_TENDERS}) GROUP BY county",
+            params,
+        )
+        payment_rows = self._query(
+            """
+            SELECT COALESCE(entity_name, '') AS entity_name, COUNT(*) AS invoices,
+                   SUM(status = 'Paid' AND days_outstanding <= 60) AS on_time,
+                   SUM(status = 'Pending' AND days_outstanding > :chronic) AS chronic
+            FROM payments GROUP BY COALESCE(entity_name, '')
+            """,
+            {"chronic": CHRONIC_PENDING_DAYS},
+        )
+
+        counties = list(all_counties)
+        counties += sorted({r["county"] for r in tender_rows if r["county"]} - set(counties))
+        totals = {c: [0, 0, 0, 0, 0] for c in counties}  # penalty, tenders, invoices, on_time, chronic
+        for r in tender_rows:
+            if r["county"] in totals:
+                totals[r["county"]][0:2] = [r["penalty"], r["tender_count"]]
+        entity_counties = entity_county_map([r["entity_name"] for r in payment_rows], counties)
+        for r in payment_rows:
+            for c in entity_counties[r["entity_name"]]:
+                t = totals[c]
+                t[2] += r["invoices"]
+                t[3] += r["on_time"]
+                t[4] += r["chronic"]
+        return rank_counties({c: county_score_entry(*t) for c, t in totals.items()})
+
+
+_repositories = {"json": JsonRepository, "sqlite": SqliteRepository}
+_repository = None
+
+
+def get_repository():
+    """The repository selected by TP_DATA_BACKEND (created once per process)."""
+    global _repository
+    if _repository is None:
+        try:
+            _repository = _repositories[DATA_BACKEND]()
+        except KeyError:
+            raise ValueError(f"Unknown TP_DATA_BACKEND {DATA_BACKEND!r}; expected one of {sorted(_repositories)}")
+    return _repository
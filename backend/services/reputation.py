@@ -1,3 +1,35 @@
+"""
+Risk Intelligence math engine — trust scores for contractors and counties.
+
+Thresholds come from config.py so the precomputed tender risk columns
+(services/derived.py) and the scores here always agree.
+"""
+
+from config import CHRONIC_PENDING_DAYS, PRICE_ANOMALY_MULTIPLIER
+
+
+def price_ratio(tender):
+    """value / benchmark_value, or None when there is no usable benchmark."""
+    bench = tender.get("benchmark_value", 1)
+    if not bench:
+        return None
+    return tender.get("value", 0) / bench
+
+
+def is_price_anomaly(tender) -> bool:
+    ratio = price_ratio(tender)
+    return ratio is not None and ratio > PRICE_ANOMALY_MULTIPLIER
+
+
+def is_chronic_pending(payment) -> bool:
+    return payment.get("status") == "Pending" and payment.get("days_outstanding", 0) > CHRONIC_PENDING_DAYS
+
+
+def delayed_references(posts) -> set:
+    """Tender ids that citizens have reported as delayed."""
+    return {p.get("referenceId") for p in posts if p.get("status") == "delay_reported"}
+
+
 def calculate_county_reputation(tenders, payments, posts, county_name):
     """
     Calculates a 0-100 score for a county based on project success AND payment reliability.
@@ -6,14 +38,12 @@ def calculate_county_reputation(tenders, payments, posts, county_name):
     
     # --- 1. PROJECT PENALTIES (Your Existing Logic) ---
     county_tenders = [t for t in tenders if t.get("county") == county_name]
-    delayed_refs = {p.get("referenceId") for p in posts if p.get("status") == "delay_reported"}
+    delayed_refs = delayed_references(posts)
     
     for project in county_tenders:
         if project.get("status") == "Stalled":
             score -= 10
-        val = project.get("value", 0)
-        bench = project.get("benchmark_value", 1)
-        if (val / bench) > 1.5:
+        if is_price_anomaly(project):
             score -= 15
         if project.get("id") in delayed_refs:
             score -= 10
@@ -34,10 +64,7 @@ def calculate_county_reputation(tenders, payments, posts, county_name):
     ])
     
     # Count how many are dangerously late
-    chronic_count = len([
-        p for p in county_payments 
-        if p.get("status") == "Pending" and p.get("days_outstanding", 0) > 180
-    ])
+    chronic_count = len([p for p in county_payments if is_chronic_pending(p)])
                 
     # Metric A: % Paid on time
     on_time_percentage = (on_time_count / total_invoices) * 100
@@ -60,21 +87,177 @@ def calculate_contractor_score(tenders, posts, contractor_id):
     if not contractor_tenders:
         return 50 # Neutral trust for new/unknown contractors
         
-    delayed_refs = {
-        p.get("referenceId") for p in posts 
-        if p.get("status") == "delay_reported"
-    }
+    delayed_refs = delayed_references(posts)
     
     for project in contractor_tenders:
         if project.get("status") == "Stalled":
             score -= 25 # Heavier penalty for contractors stalling
             
-        val = project.get("value", 0)
-        bench = project.get("benchmark_value", 1)
-        if (val / bench) > 1.5:
+        if is_price_anomaly(project):
             score -= 20
             
         if project.get("id") in delayed_refs:
             score -= 15
             
-    return max(0, min(100, score))
\ No newline at end of file
+    return max(0, min(100, score))
+
+
+def score_all_contractors(tenders, posts, contractor_ids=(), columns=None):
+    """
+    Batch version of calculate_contractor_score: one pass over tenders and
+    one over posts, instead of one full scan per contractor.
+
+    Returns {contractor_id: score} for every contractor that has tenders,
+    plus any extra `contractor_ids` (scored 50, like unknown contractors).
+    Results are identical to calling calculate_contractor_score per id.
+
+    `columns` is an optional services.columnar.TenderColumns for the same
+    tenders; when given, the penalty sums run vectorized.
+    """
+    delayed_refs = delayed_references(posts)
+
+    if columns is not None:
+        sums = columns.penalty_by("contractor_id", delayed_refs, stalled=25, anomaly=20, delayed=15)
+        penalties = dict(zip(columns.contractor_id.labels, sums.tolist()))
+    else:
+        penalties = {}
+        for project in tenders:
+            c_id = project.get("contractor_id")
+            penalty = 0
+            if project.get("status") == "Stalled":
+                penalty += 25
+            if is_price_anomaly(project):
+                penalty += 20
+            if project.get("id") in delayed_refs:
+                penalty += 15
+            penalties[c_id] = penalties.get(c_id, 0) + penalty
+
+    scores = {c_id: 50 for c_id in contractor_ids}
+    for c_id, penalty in penalties.items():
+        scores[c_id] = max(0, min(100, 100 - penalty))
+    return scores
+
+
+def entity_county_map(entity_names, counties) -> dict:
+    """
+    Resolve each distinct payment entity_name to the counties it mentions,
+    using the same case-insensitive substring rule as
+    calculate_county_reputation ("Mombasa" -> "Mombasa County Government").
+    Each name is matched once, however many invoices carry it.
+    """
+    folded = [(c, c.lower()) for c in counties]
+    mapping = {}
+    for name in entity_names:
+        if name not in mapping:
+            lowered = name.lower()
+            mapping[name] = tuple(c for c, c_low in folded if c_low in lowered)
+    return mapping
+
+
+def score_all_counties(tenders, payments, posts, counties=None, tender_columns=None, payment_columns=None):
+    """
+    Batch version of calculate_county_reputation. Tenders and payments are
+    grouped by county in one pass each, so scoring all 47 counties costs
+    O(tenders + payments + posts) instead of 47 scans of every dataset.
+
+    `counties` defaults to every county seen in tenders. Returns
+    {county: {"score", "tender_count", "invoice_count", "chronic_count"}}
+    with scores identical to calculate_county_reputation.
+
+    `tender_columns` / `payment_columns` are optional services.columnar
+    stores for the same rows; when given, grouping runs vectorized.
+    """
+    if counties is None:
+        counties = sorted({t.get("county") for t in tenders if t.get("county")})
+    delayed_refs = delayed_references(posts)
+
+    stats = {
+        c: {"penalty": 0, "tender_count": 0, "invoices": 0, "on_time": 0, "chronic": 0}
+        for c in counties
+    }
+
+    if tender_columns is not None:
+        col = tender_columns.county
+        penalties = tender_columns.penalty_by("county", delayed_refs, stalled=10, anomaly=15, delayed=10)
+        counts = col.sum_by_code()
+        for c, s in stats.items():
+            code = col.code(c)
+            if code >= 0:
+                s["penalty"] = int(penalties[code])
+                s["tender_count"] = int(counts[code])
+    else:
+        for project in tenders:
+            s = stats.get(project.get("county"))
+            if s is None:
+                continue
+            s["tender_count"] += 1
+            if project.get("status") == "Stalled":
+                s["penalty"] += 10
+            if is_price_anomaly(project):
+                s["penalty"] += 15
+            if project.get("id") in delayed_refs:
+                s["penalty"] += 10
+
+    if payment_columns is not None:
+        col = payment_columns.entity_name
+        invoices = col.sum_by_code().tolist()
+        on_time = col.sum_by_code(payment_columns.on_time_mask()).tolist()
+        chronic = col.sum_by_code(payment_columns.chronic_mask()).tolist()
+        entity_counties = entity_county_map(col.labels, counties)
+        for code, name in enumerate(col.labels):
+            for c in entity_counties[name]:
+                s = stats[c]
+                s["invoices"] += int(invoices[code])
+                s["on_time"] += int(on_time[code])
+                s["chronic"] += int(chronic[code])
+    else:
+        names = [p.get("entity_name") or "" for p in payments]
+        entity_counties = entity_county_map(names, counties)
+        for p, name in zip(payments, names):
+            matched = entity_counties[name]
+            if not matched:
+                continue
+            on_time_paid = p.get("status") == "Paid" and p.get("days_outstanding", 0) <= 60
+            is_chronic = is_chronic_pending(p)
+            for c in matched:
+                s = stats[c]
+                s["invoices"] += 1
+                s["on_time"] += on_time_paid
+                s["chronic"] += is_chronic
+
+    return {
+        c: county_score_entry(s["penalty"], s["tender_count"], s["invoices"], s["on_time"], s["chronic"])
+        for c, s in stats.items()
+    }
+
+
+def county_score_entry(penalty, tender_count, invoices, on_time, chronic) -> dict:
+    """
+    Final county score from pre-aggregated totals; shared by the batch
+    scorer, the incremental engine and the SQLite repository.
+    """
+    score = 100 - penalty
+    if invoices:
+        if (on_time / invoices) * 100 < 50:
+            score -= 15 # Penalty if they pay late more than half the time
+        score -= chronic * 10 # 10 point deduction for EVERY chronic invoice
+    return {
+        "score": max(0, min(100, int(score))),
+        "tender_count": tender_count,
+        "invoice_count": invoices,
+        "chronic_count": chronic,
+    }
+
+
+def rank_counties(scored: dict) -> list:
+    """Leaderboard rows from {county: score entry}, best first, ties by name."""
+    ranked = sorted(scored.items(), key=lambda item: (-item[1]["score"], item[0]))
+    return [
+        {"rank": rank, "county": county, **entry}
+        for rank, (county, entry) in enumerate(ranked, start=1)
+    ]
+
+
+def county_leaderboard(tenders, payments, posts, counties=None, **columns) -> list:
+    """All counties ranked by reputation score (best first, ties by name)."""
+    return rank_counties(score_all_counties(tenders, payments, posts, counties, **columns))
@@ -0,0 +1,413 @@
+"""
+Incremental reputation engine.
+
+`services/reputation.py` scores from scratch: every call walks the whole
+tender, post and payment history. This engine keeps per-contractor and
+per-county penalty accumulators instead. Adding, changing or removing one
+tender, post or payment only touches the contractor and counties it affects,
+so reading every score costs O(contractors) / O(counties) regardless of how
+much history has accumulated.
+
+The rules are the same as calculate_contractor_score and
+calculate_county_reputation; `verify()` recomputes everything with the batch
+scorers and reports any disagreement (set TP_REPUTATION_VERIFY=1 to run it
+after every dataset sync).
+
+Every tender contribution records which rules fired, so `explain()` can
+return a per-contractor breakdown (rule id, tender id, penalty) without a
+second scan. Breakdowns are memoized in an LRU keyed by the engine revision,
+which changes whenever any score-affecting row changes.
+
+`current_engine()` returns the process-wide engine, synced to the current
+tender/posts/payment snapshots: when a file changes, its rows are diffed
+against what the engine holds and only the differences are applied. Posts
+appended by `append_json` skip the diff: only the new rows are applied.
+"""
+
+import threading
+
+from config import EXPLAIN_CACHE_SIZE, REPUTATION_VERIFY
+from services.data_loader import load_snapshot
+from services.expand_data import all_counties
+from services.lru import LRUCache
+from services.snapshot import FrozenDict, FrozenList
+from services.reputation import (
+    county_score_entry,
+    is_chronic_pending,
+    is_price_anomaly,
+    rank_counties,
+    score_all_contractors,
+    score_all_counties,
+)
+
+# Rule ids and their penalties: (contractor penalty, county penalty)
+RULES = {
+    "stalled": (25, 10),
+    "price_anomaly": (20, 15),
+    "citizen_delay": (15, 10),
+}
+
+
+def keyed_rows(rows, field: str = "id") -> dict:
+    """
+    Map rows to stable keys: (id, n) where n counts earlier rows with the same
+    id, so duplicate ids in a data file still get one key per row.
+    """
+    seen: dict = {}
+    keyed = {}
+    for row in rows:
+        record_id = row.get(field)
+        n = seen.get(record_id, 0)
+        seen[record_id] = n + 1
+        keyed[(record_id, n)] = row
+    return keyed
+
+
+class _TenderContribution:
+    __slots__ = ("tender_id", "contractor_id", "county", "rules", "contractor_penalty", "county_penalty")
+
+    def __init__(self, tender_id, contractor_id, county, rules):
+        self.tender_id = tender_id
+        self.contractor_id = contractor_id
+        self.county = county
+        self.rules = rules
+        self.contractor_penalty = sum(RULES[r][0] for r in rules)
+        self.county_penalty = sum(RULES[r][1] for r in rules)
+
+
+class ReputationEngine:
+    """Penalty accumulators for contractors and counties with O(1) updates."""
+
+    def __init__(self, counties=all_counties):
+        self._lock = threading.RLock()
+        self._counties: list[str] = []
+        self._county_set: set[str] = set()
+
+        self._tenders: dict = {}            # key -> tender row
+        self._contrib: dict = {}            # key -> _TenderContribution
+        self._keys_by_tender_id: dict = {}  # tender id -> set of keys
+        self._keys_by_contractor: dict = {} # contractor_id -> set of keys
+        self._posts: dict = {}              # key -> post row
+        self._delay_reports: dict = {}      # referenceId -> number of delay_reported posts
+        self._payments: dict = {}           # key -> payment row
+        self._payment_effect: dict = {}     # key -> (counties, on_time, chronic)
+        self._entity_counties: dict = {}    # entity_name -> matched counties
+
+        self._contractors: dict = {}        # contractor_id -> [penalty, tender_count]
+        self._county_tenders: dict = {}     # county -> [penalty, tender_count]
+        self._county_payments: dict = {}    # county -> [invoices, on_time, chronic]
+
+        self.versions = None
+        # posts snapshot lineage/length last synced, for the append fast path
+        self.posts_lineage = None
+        self.posts_synced = 0
+        self.revision = 0
+        self._explain_cache = LRUCache(EXPLAIN_CACHE_SIZE)
+        for county in counties:
+            self._register_county(county)
+
+    # --- Tenders ---
+
+    def _rules_for(self, tender) -> tuple:
+        rules = []
+        if tender.get("status") == "Stalled":
+            rules.append("stalled")
+        if is_price_anomaly(tender):
+            rules.append("price_anomaly")
+        if self._delay_reports.get(tender.get("id"), 0) > 0:
+            rules.append("citizen_delay")
+        return tuple(rules)
+
+    def _apply_contribution(self, contrib: _TenderContribution, sign: int) -> None:
+        self.revision += 1
+        c = self._contractors.setdefault(contrib.contractor_id, [0, 0])
+        c[0] += sign * contrib.contractor_penalty
+        c[1] += sign
+        if c[1] == 0:
+            del self._contractors[contrib.contractor_id]
+
+        k = self._county_tenders.setdefault(contrib.county, [0, 0])
+        k[0] += sign * contrib.county_penalty
+        k[1] += sign
+        if k[1] == 0:
+            del self._county_tenders[contrib.county]
+
+    def upsert_tender(self, tender, key=None) -> None:
+        key = key if key is not None else (tender.get("id"), 0)
+        with self._lock:
+            self.remove_tender(key)
+            if tender.get("county") and tender.get("county") not in self._county_set:
+                self._register_county(tender.get("county"))
+            contrib = _TenderContribution(
+                tender.get("id"), tender.get("contractor_id"), tender.get("county"), self._rules_for(tender)
+            )
+            self._tenders[key] = tender
+            self._contrib[key] = contrib
+            self._keys_by_tender_id.setdefault(contrib.tender_id, set()).add(key)
+            self._keys_by_contractor.setdefault(contrib.contractor_id, set()).add(key)
+            self._apply_contribution(contrib, +1)
+
+    def remove_tender(self, key) -> None:
+        if not isinstance(key, tuple):
+            key = (key, 0)
+        with self._lock:
+            contrib = self._contrib.pop(key, None)
+            if contrib is None:
+                return
+            del self._tenders[key]
+            keys = self._keys_by_tender_id[contrib.tender_id]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_tender_id[contrib.tender_id]
+            keys = self._keys_by_contractor[contrib.contractor_id]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_contractor[contrib.contractor_id]
+            self._apply_contribution(contrib, -1)
+
+    def _rescore_tender_id(self, tender_id) -> None:
+        """Re-evaluate tenders whose citizen-delay status may have flipped."""
+        for key in list(self._keys_by_tender_id.get(tender_id, ())):
+            self.upsert_tender(self._tenders[key], key)
+
+    # --- Posts ---
+
+    def upsert_post(self, post, key=None) -> None:
+        key = key if key is not None else (post.get("id"), 0)
+        with self._lock:
+            self.remove_post(key)
+            self._posts[key] = post
+            if post.get("status") == "delay_reported":
+                ref = post.get("referenceId")
+                self._delay_reports[ref] = self._delay_reports.get(ref, 0) + 1
+                if self._delay_reports[ref] == 1:
+                    self._rescore_tender_id(ref)
+
+    def remove_post(self, key) -> None:
+        if not isinstance(key, tuple):
+            key = (key, 0)
+        with self._lock:
+            post = self._posts.pop(key, None)
+            if post is None or post.get("status") != "delay_reported":
+                return
+            ref = post.get("referenceId")
+            self._delay_reports[ref] -= 1
+            if self._delay_reports[ref] == 0:
+                del self._delay_reports[ref]
+                self._rescore_tender_id(ref)
+
+    def append_posts(self, posts) -> None:
+        """Apply posts appended after the rows already synced (keys as keyed_rows would give)."""
+        with self._lock:
+            for post in posts:
+                post_id, n = post.get("id"), 0
+                while (post_id, n) in self._posts:
+                    n += 1
+                self.upsert_post(post, (post_id, n))
+
+    # --- Payments ---
+
+    def _register_county(self, county: str) -> None:
+        """Track a new county and match it against payment entities seen so far."""
+        self._counties.append(county)
+        self._county_set.add(county)
+        folded = county.lower()
+        for name, matched in self._entity_counties.items():
+            if folded in name.lower():
+                self._entity_counties[name] = matched + (county,)
+        for key, payment in list(self._payments.items()):
+            if folded in (payment.get("entity_name") or "").lower():
+                self.upsert_payment(payment, key)
+
+    def _counties_for(self, entity_name: str) -> tuple:
+        matched = self._entity_counties.get(entity_name)
+        if matched is None:
+            folded = entity_name.lower()
+            matched = tuple(c for c in self._counties if c.lower() in folded)
+            self._entity_counties[entity_name] = matched
+        return matched
+
+    def _apply_payment(self, effect, sign: int) -> None:
+        self.revision += 1
+        counties, on_time, chronic = effect
+        for county in counties:
+            p = self._county_payments.setdefault(county, [0, 0, 0])
+            p[0] += sign
+            p[1] += sign * on_time
+            p[2] += sign * chronic
+            if p[0] == 0:
+                del self._county_payments[county]
+
+    def upsert_payment(self, payment, key=None) -> None:
+        key = key if key is not None else (payment.get("invoice_id"), 0)
+        with self._lock:
+            self.remove_payment(key)
+            effect = (
+                self._counties_for(payment.get("entity_name") or ""),
+                int(payment.get("status") == "Paid" and payment.get("days_outstanding", 0) <= 60),
+                int(is_chronic_pending(payment)),
+            )
+            self._payments[key] = payment
+            self._payment_effect[key] = effect
+            self._apply_payment(effect, +1)
+
+    def remove_payment(self, key) -> None:
+        if not isinstance(key, tuple):
+            key = (key, 0)
+        with self._lock:
+            effect = self._payment_effect.pop(key, None)
+            if effect is None:
+                return
+            del self._payments[key]
+            self._apply_payment(effect, -1)
+
+    # --- Bulk sync ---
+
+    def sync(self, tenders, posts, payments) -> int:
+        """
+        Bring the engine in line with full datasets by applying only the rows
+        that were added, changed or removed. Returns the number of changes.
+        Posts go first so tender citizen-delay flags are final when tenders
+        are (re)scored.
+        """
+        changes = 0
+        with self._lock:
+            for rows, field, current, upsert, remove in (
+                (posts, "id", self._posts, self.upsert_post, self.remove_post),
+                (tenders, "id", self._tenders, self.upsert_tender, self.remove_tender),
+                (payments, "invoice_id", self._payments, self.upsert_payment, self.remove_payment),
+            ):
+                incoming = keyed_rows(rows, field)
+                for key in [k for k in current if k not in incoming]:
+                    remove(key)
+                    changes += 1
+                for key, row in incoming.items():
+                    old = current.get(key)
+                    if old is not row and old != row:
+                        upsert(row, key)
+                        changes += 1
+        return changes
+
+    # --- Scores ---
+
+    def contractor_score(self, contractor_id) -> int:
+        acc = self._contractors.get(contractor_id)
+        if acc is None:
+            return 50 # Neutral trust for new/unknown contractors
+        return max(0, min(100, 100 - acc[0]))
+
+    def contractor_scores(self) -> dict:
+        """{contractor_id: score} for every contractor with tenders."""
+        with self._lock:
+            return {c_id: max(0, min(100, 100 - acc[0])) for c_id, acc in self._contractors.items()}
+
+    def _build_explanation(self, contractor_id) -> FrozenDict:
+        breakdown = []
+        for key in sorted(self._keys_by_contractor.get(contractor_id, ()), key=repr):
+            contrib = self._contrib[key]
+            for rule in contrib.rules:
+                breakdown.append(FrozenDict(rule=rule, tenderId=contrib.tender_id, penalty=RULES[rule][0]))
+        return FrozenDict(
+            contractorId=contractor_id,
+            trust_score=self.contractor_score(contractor_id),
+            base=100 if contractor_id in self._contractors else 50,
+            explain=FrozenList(breakdown),
+        )
+
+    def explain(self, contractor_id) -> FrozenDict:
+        """
+        Score breakdown for one contractor: which rule fired on which tender
+        and for how many points. Cached per engine revision.
+        """
+        with self._lock:
+            return self._explain_cache.get_or_build(
+                (self.revision, contractor_id), lambda: self._build_explanation(contractor_id)
+            )
+
+    def explain_all(self) -> FrozenDict:
+        """{contractor_id: explain()} for every scored contractor, cached per revision."""
+        with self._lock:
+            return self._explain_cache.get_or_build(
+                (self.revision, "*"),
+                lambda: FrozenDict((c_id, self.explain(c_id)) for c_id in self._contractors),
+            )
+
+    def has_contractor(self, contractor_id) -> bool:
+        return contractor_id in self._contractors
+
+    def county_scores(self, counties=None) -> dict:
+        """Same shape as reputation.score_all_counties."""
+        with self._lock:
+            results = {}
+            for county in counties if counties is not None else self._counties:
+                penalty, tender_count = self._county_tenders.get(county, (0, 0))
+                invoices, on_time, chronic = self._county_payments.get(county, (0, 0, 0))
+                results[county] = county_score_entry(penalty, tender_count, invoices, on_time, chronic)
+            return results
+
+    def county_leaderboard(self, counties=None) -> list:
+        return rank_counties(self.county_scores(counties))
+
+    def counties(self) -> list:
+        return list(self._counties)
+
+    # --- Verification ---
+
+    def verify(self) -> list:
+        """
+        Full rebuild check: rescore the engine's current data from scratch with
+        the batch scorers and return a list of (kind, id, engine, expected)
+        mismatches. An empty list means the accumulators are consistent.
+        """
+        with self._lock:
+            tenders = list(self._tenders.values())
+            posts = list(self._posts.values())
+            payments = list(self._payments.values())
+            mismatches = []
+
+            expected = score_all_contractors(tenders, posts)
+            actual = self.contractor_scores()
+            for c_id in expected.keys() | actual.keys():
+                if expected.get(c_id) != actual.get(c_id):
+                    mismatches.append(("contractor", c_id, actual.get(c_id), expected.get(c_id)))
+
+            expected = score_all_counties(tenders, payments, posts, self._counties)
+            actual = self.county_scores()
+            for county, entry in expected.items():
+                if entry != actual[county]:
+                    mismatches.append(("county", county, actual[county], entry))
+            return mismatches
+
+
+reputation_engine = ReputationEngine()
+
+
+def current_engine() -> ReputationEngine:
+    """The shared engine, synced to the current tender/posts/payment snapshots."""
+    tenders = load_snapshot("tender.json")
+    posts = load_snapshot("posts.json")
+    payments = load_snapshot("payment.json")
+    versions = (tenders.version, posts.version, payments.version)
+
+    engine = reputation_engine
+    if engine.versions != versions:
+        with engine._lock:
+            if engine.versions != versions:
+                old = engine.versions
+                if (
+                    old is not None
+                    and (old[0], old[2]) == (tenders.version, payments.version)
+                    and engine.posts_lineage == posts.lineage
+                    and len(posts.rows) >= engine.posts_synced
+                ):
+                    # Only new citizen posts: no need to diff the whole history
+                    engine.append_posts(posts.rows[engine.posts_synced:])
+                else:
+                    engine.sync(tenders.rows, posts.rows, payments.rows)
+                engine.posts_lineage, engine.posts_synced = posts.lineage, len(posts.rows)
+                if REPUTATION_VERIFY:
+                    mismatches = engine.verify()
+                    if mismatches:
+                        raise RuntimeError(f"Reputation engine out of sync: {mismatches[:5]}")
+                engine.versions = versions
+    return engine
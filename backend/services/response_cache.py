@@ -0,0 +1,104 @@
+"""
+Serialized-response cache with ETags for rarely changing endpoints.
+
+    @router.get("/stats")
+    async def get_stats(request: Request):
+        return await cached_response(
+            request, ("mock_data.json",),
+            lambda mock: success_response(data=mock.section("dashboardStats"), ...),
+        )
+
+The envelope is built and encoded once per (route, query string, dataset
+versions) and kept as bytes. Later requests get the same bytes (including
+the original `timestamp`) without touching the handler logic, and a client
+that sends the ETag back in `If-None-Match` gets an empty 304. A new
+dataset version changes the key, so stale bodies are never served; old
+entries age out of the LRU.
+
+Dataset versions are per-process counters, so the ETag is not derived from
+them or from the body bytes: it hashes the envelope without its
+`timestamp`. Identical data then has the same ETag in every worker and
+across restarts. It is a weak ETag, since two such bodies can still differ
+in that timestamp.
+
+Responses that do not come from a data file (the health probe) pass a
+`ttl` instead: the body is then reused for that many seconds (ttl <= 0:
+rebuilt for every request, the ETag still answers 304 while unchanged).
+"""
+
+import asyncio
+import hashlib
+import time
+
+from fastapi import Request, Response
+
+from config import RESPONSE_CACHE_MAX_AGE, RESPONSE_CACHE_SIZE
+from services.async_loader import load_snapshot_async
+from services.data_loader import encode_json
+from services.lru import LRUCache
+
+_cache = LRUCache(RESPONSE_CACHE_SIZE)
+
+
+class CachedBody:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, envelope: dict):
+        self.body = encode_json(envelope, compact=True)
+        content = {k: v for k, v in envelope.items() if k != "timestamp"}
+        digest = hashlib.blake2b(encode_json(content, compact=True), digest_size=16).hexdigest()
+        self.etag = f'W/"{digest}"'
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _cache_control(max_age: int) -> str:
+    if max_age <= 0:
+        return "no-cache"  # may be stored, but revalidated (cheaply, via 304) every time
+    return f"public, max-age={max_age}, must-revalidate"
+
+
+async def cached_response(
+    request: Request,
+    filenames: tuple[str, ...],
+    build,
+    max_age: int = RESPONSE_CACHE_MAX_AGE,
+    ttl: float | None = None,
+    status_code: int = 200,
+) -> Response:
+    """
+    Serve build(*snapshots) for the current versions of filenames from
+    the cache, or 304 when the client already holds that version.
+    `build` runs on a miss only and returns the JSON-able envelope.
+    """
+    snapshots = await asyncio.gather(*(load_snapshot_async(name) for name in filenames))
+    if ttl is not None and ttl <= 0:
+        cached = CachedBody(build(*snapshots))
+    else:
+        version = tuple(s.version for s in snapshots)
+        if ttl is not None:
+            version += (int(time.monotonic() // ttl),)
+        query = tuple(sorted(request.query_params.multi_items()))
+        key = (request.url.path, query, version)
+        cached = _cache.get_or_build(key, lambda: CachedBody(build(*snapshots)))
+
+    headers = {"ETag": cached.etag, "Cache-Control": _cache_control(max_age)}
+    if _etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def response_cache_stats() -> dict:
+    return _cache.stats()
+
+
+def clear_response_cache() -> None:
+    _cache.clear()
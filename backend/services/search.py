@@ -0,0 +1,268 @@
+"""
+Inverted-index full-text search behind /utils/search.
+
+Each searchable collection gets a SearchIndex mapping tokens to the rows
+that contain them, with a per-row weight (title and name hits count more
+than description hits). Indexes are built once per snapshot version;
+append-only files (posts.json) extend their index in place instead of
+rebuilding it, like the post indexes in services/indexes.py.
+
+A query is tokenized the same way as the documents. Every query term must
+match (AND); a term matches a token exactly or as a prefix, so "saf"
+finds "Safari" and "a0023" finds a KRA PIN (a prefix expands to at most
+MAX_EXPANSIONS tokens, the ones in the most rows). Results are ranked by
+weight x idf summed over the terms, exact hits scoring above prefix hits.
+"""
+
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from services.data_loader import load_snapshot
+
+_TOKEN = re.compile(r"[0-9a-z]+")
+
+PREFIX_WEIGHT = 0.5      # a prefix hit scores half an exact hit
+MAX_EXPANSIONS = 64      # vocabulary tokens tried per prefix term (the most frequent ones)
+
+
+def tokenize(text) -> list[str]:
+    if text is None:
+        return []
+    if isinstance(text, (list, tuple)):
+        return [t for item in text for t in tokenize(item)]
+    return _TOKEN.findall(str(text).lower())
+
+
+class SearchIndex:
+    """
+    Token -> {row id: weight}, plus a sorted vocabulary for prefix lookups.
+
+    Each token's rows are also bucketed by weight, so a query can walk its
+    rarest term from the highest-scoring rows down and stop as soon as no
+    remaining row can beat the current top results.
+    """
+
+    __slots__ = ("fields", "lineage", "size", "postings", "buckets", "vocabulary", "_lock")
+
+    def __init__(self, fields, lineage=None):
+        self.fields = fields  # ((field, weight), ...)
+        self.lineage = lineage
+        self.size = 0
+        self.postings: dict[str, dict[int, int]] = {}
+        self.buckets: dict[str, dict[int, list[int]]] = {}  # token -> weight -> row ids
+        self.vocabulary: list[str] = []
+        self._lock = threading.Lock()
+
+    def extend(self, rows) -> "SearchIndex":
+        """Index rows added since the previous call."""
+        with self._lock:
+            new_tokens = []
+            for i in range(self.size, len(rows)):
+                row = rows[i]
+                weights: dict[str, int] = {}
+                for field, weight in self.fields:
+                    for token in tokenize(row.get(field)):
+                        weights[token] = weights.get(token, 0) + weight
+                for token, weight in weights.items():
+                    docs = self.postings.get(token)
+                    if docs is None:
+                        docs = self.postings[token] = {}
+                        self.buckets[token] = {}
+                        new_tokens.append(token)
+                    docs[i] = weight
+                    self.buckets[token].setdefault(weight, []).append(i)
+            if len(new_tokens) < 32:
+                for token in new_tokens:
+                    insort(self.vocabulary, token)
+            else:
+                self.vocabulary.extend(new_tokens)
+                self.vocabulary.sort()
+            self.size = max(self.size, len(rows))
+        return self
+
+    def _expand(self, term: str, size: int) -> list[tuple[str, float]]:
+        """(token, score per unit of weight) for term itself (exact) and tokens it prefixes."""
+        # Tokens are [0-9a-z], so "{" sorts after every token that term prefixes
+        tokens = self.vocabulary[bisect_left(self.vocabulary, term) : bisect_right(self.vocabulary, term + "{")]
+        if len(tokens) > MAX_EXPANSIONS:
+            # Keep the exact token and the tokens in the most rows, so a short
+            # prefix still finds most of its matches, not the alphabetically first
+            exact = [term] if term in self.postings else []
+            tokens = exact + heapq.nlargest(
+                MAX_EXPANSIONS - len(exact),
+                (token for token in tokens if token != term),
+                key=lambda token: len(self.postings[token]),
+            )
+        matches = []
+        for token in tokens:
+            idf = math.log(1 + size / len(self.postings[token]))
+            matches.append((token, idf * (1.0 if token == term else PREFIX_WEIGHT)))
+        return matches
+
+    def _term_score(self, expansions, row: int) -> float:
+        return max((self.postings[token].get(row, 0) * factor for token, factor in expansions), default=0)
+
+    def search(self, terms: list[str], size: int, limit: int) -> list[tuple[float, int]]:
+        """Top `limit` (score, row id) among rows below `size` matching every term."""
+        with self._lock:
+            expanded = [self._expand(term, size) for term in terms]
+            if not all(expanded):
+                return []
+            # Drive the walk with the term matching the fewest rows; probe the others
+            expanded.sort(key=lambda ex: sum(len(self.postings[token]) for token, _ in ex))
+            driver, others = expanded[0], expanded[1:]
+            others_bound = sum(
+                max(max(self.buckets[token]) * factor for token, factor in ex) for ex in others
+            )
+            tiers = sorted(
+                ((weight * factor, rows) for token, factor in driver for weight, rows in self.buckets[token].items()),
+                key=lambda tier: tier[0],
+                reverse=True,
+            )
+            top: list[tuple[float, int]] = []  # min-heap of (score, -row id)
+            seen = set()
+            for tier_score, rows in tiers:
+                if len(top) == limit and tier_score + others_bound < top[0][0]:
+                    break  # nothing left can enter the top results
+                for i in rows:
+                    if i >= size or i in seen:
+                        continue
+                    seen.add(i)
+                    score = tier_score
+                    for ex in others:
+                        term_score = self._term_score(ex, i)
+                        if not term_score:
+                            break
+                        score += term_score
+                    else:
+                        entry = (score, -i)
+                        if len(top) < limit:
+                            heapq.heappush(top, entry)
+                        elif entry > top[0]:
+                            heapq.heapreplace(top, entry)
+            return [(score, -neg_i) for score, neg_i in sorted(top, reverse=True)]
+
+
+class SearchSource:
+    """One searchable collection: where its rows live and how a hit is displayed."""
+
+    __slots__ = ("type", "result_type", "filename", "section", "fields", "to_result")
+
+    def __init__(self, type, result_type, filename, section, fields, to_result):
+        self.type = type
+        self.result_type = result_type
+        self.filename = filename
+        self.section = section
+        self.fields = fields
+        self.to_result = to_result
+
+    def rows(self, snapshot):
+        if self.section is not None:
+            return snapshot.section(self.section)
+        return snapshot.rows if isinstance(snapshot.rows, list) else ()
+
+
+def _summary(row, field="description") -> str:
+    return (row.get(field) or "")[:100]
+
+
+SOURCES = (
+    SearchSource(
+        "contractor", "contractor", "mock_data.json", "contractors",
+        (("name", 3), ("kraPin", 3), ("id", 2), ("category", 1), ("region", 1), ("contactPerson", 1)),
+        lambda c: {
+            "title": c.get("name"),
+            "description": f"{c.get('category')} — {c.get('region')}",
+            "url": f"/registry/contractors/{c.get('id')}",
+        },
+    ),
+    SearchSource(
+        "fraud", "fraud_alert", "mock_data.json", "fraudAlerts",
+        (("title", 3), ("id", 2), ("description", 1), ("affectedContractors", 1), ("affectedTenders", 1)),
+        lambda a: {"title": a.get("title"), "description": _summary(a), "url": f"/fraud/alerts/{a.get('id')}"},
+    ),
+    SearchSource(
+        "audit", "audit", "mock_data.json", "audits",
+        (("title", 3), ("id", 2), ("description", 1), ("findings", 1)),
+        lambda a: {"title": a.get("title"), "description": _summary(a), "url": f"/audit/audits/{a.get('id')}"},
+    ),
+    SearchSource(
+        "report", "report", "mock_data.json", "reports",
+        (("title", 3), ("id", 2), ("description", 1), ("category", 1), ("period", 1)),
+        lambda r: {"title": r.get("title"), "description": _summary(r), "url": f"/reports/{r.get('id')}"},
+    ),
+    SearchSource(
+        "tender", "tender", "tender.json", None,
+        (("title", 3), ("id", 3), ("description", 1), ("county", 1), ("category", 1), ("contractor_id", 1)),
+        lambda t: {
+            "title": t.get("title") or "Untitled Project",
+            "description": _summary(t) or f"{t.get('category')} — {t.get('county')}",
+            "url": f"/tender/{t.get('id')}",
+        },
+    ),
+    SearchSource(
+        "post", "post", "posts.json", None,
+        (("title", 3), ("content", 1), ("wardId", 1), ("county", 1), ("category", 1), ("referenceId", 1)),
+        lambda p: {
+            "title": p.get("title"),
+            "description": _summary(p, "content"),
+            "url": f"/feed/ward/{p.get('wardId') or p.get('ward')}",
+        },
+    ),
+    SearchSource(
+        "post", "post", "mock_data.json", "feedPosts",
+        (("title", 3), ("content", 1), ("ward", 1), ("category", 1)),
+        lambda p: {
+            "title": p.get("title"),
+            "description": _summary(p, "content"),
+            "url": f"/feed/ward/{p.get('ward')}",
+        },
+    ),
+)
+
+SEARCH_FILES = tuple(dict.fromkeys(s.filename for s in SOURCES))
+
+_shared: dict[tuple, SearchIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def _index(source: SearchSource, snapshot) -> tuple[SearchIndex, int]:
+    """The source's index for snapshot, and the row count it covers."""
+    rows = source.rows(snapshot)
+    if source.section is not None:
+        # Sections of a dict-shaped file are rebuilt with the snapshot
+        index = snapshot.derive(f"search:{source.section}", lambda snap: SearchIndex(source.fields).extend(rows))
+        return index, len(rows)
+
+    def shared(snap):
+        key = (source.filename, source.fields)
+        with _shared_lock:
+            index = _shared.get(key)
+            if index is None or index.lineage != snap.lineage:
+                index = _shared[key] = SearchIndex(source.fields, snap.lineage)
+        return index.extend(rows)
+
+    return snapshot.derive(f"search:{source.type}", shared), len(rows)
+
+
+def search(query: str, types=None, limit: int = 10) -> list[dict]:
+    """Top `limit` hits for query across the given types (all when None), best first."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+    hits = []
+    for order, source in enumerate(SOURCES):
+        if types and source.type not in types:
+            continue
+        snapshot = load_snapshot(source.filename)
+        index, size = _index(source, snapshot)
+        rows = source.rows(snapshot)
+        hits.extend((score, -order, -i, source, rows) for score, i in index.search(terms, size, limit))
+    best = heapq.nlargest(limit, hits, key=lambda h: h[:3])
+    return [
+        {"id": rows[-neg_i].get("id"), "type": source.result_type, **source.to_result(rows[-neg_i])}
+        for _, _, neg_i, source, rows in best
+    ]
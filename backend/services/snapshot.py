@@ -0,0 +1,114 @@
+"""
+Read-only dataset snapshots.
+
+The dataset cache hands the same parsed objects to every request, so they
+must never be edited in place. `freeze` turns parsed JSON into read-only
+dict/list subclasses: they still encode, index and `.get()` exactly like the
+originals, but any attempt to mutate them raises TypeError. Handlers that
+need to add fields build a new dict (`{**row, "field": value}`).
+
+A `Snapshot` wraps one frozen file together with its dataset version and a
+memo of derived columns. Derived data (risk flags, indexes, scores, ...) is
+computed at most once per snapshot via `Snapshot.derive`, and is dropped
+automatically when the file changes and a new snapshot replaces this one.
+"""
+
+import threading
+from typing import Any, Callable
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is read-only; copy it before editing")
+
+
+class FrozenDict(dict):
+    """A dict that rejects mutation. `dict(d)` / `{**d}` give editable copies."""
+
+    __slots__ = ()
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    __ior__ = _read_only
+    clear = _read_only
+    pop = _read_only
+    popitem = _read_only
+    setdefault = _read_only
+    update = _read_only
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """A list that rejects mutation. `list(l)` / slicing give editable copies."""
+
+    __slots__ = ()
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    __iadd__ = _read_only
+    __imul__ = _read_only
+    append = _read_only
+    clear = _read_only
+    extend = _read_only
+    insert = _read_only
+    pop = _read_only
+    remove = _read_only
+    reverse = _read_only
+    sort = _read_only
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(value):
+    """
+    Recursively convert parsed JSON into FrozenDict/FrozenList. Values that
+    are already frozen are reused as-is, so re-freezing an edited copy of a
+    snapshot only costs the parts that changed.
+    """
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+class Snapshot:
+    """One immutable version of a data file plus its memoized derived columns."""
+
+    __slots__ = ("filename", "version", "rows", "lineage", "_derived", "_lock")
+
+    def __init__(self, filename: str, version: int, rows, lineage: int | None = None):
+        self.filename = filename
+        self.version = version
+        self.rows = rows
+        # Snapshots with the same lineage only ever grew by appends: an older
+        # one's rows are a prefix of a newer one's, so incremental consumers
+        # (post indexes, the reputation engine) only process the new tail.
+        self.lineage = version if lineage is None else lineage
+        self._derived: dict[str, Any] = {}
+        # Re-entrant so a builder may derive other columns of the same snapshot.
+        self._lock = threading.RLock()
+
+    def derive(self, name: str, builder: Callable[["Snapshot"], Any]):
+        """
+        Return the derived column `name`, building it with `builder(self)`
+        the first time it is requested for this snapshot.
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+            return self._derived[name]
+
+    def section(self, key: str):
+        """Top-level section of a dict-shaped file (e.g. mock_data.json)."""
+        if isinstance(self.rows, dict):
+            return self.rows.get(key, FrozenList())
+        return FrozenList()
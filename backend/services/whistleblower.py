@@ -1,42 +1,360 @@
+"""
+Anonymous whistle-blower intake log.
+
+Reports are appended as JSON lines to segment files under
+data/whistleblower/, so saving a report costs one small write no matter
+how many reports came before it.
+
+- Writers take an exclusive file lock (flock) around each append, so
+  concurrent workers and threads never interleave or lose lines.
+- fsyncs are batched: writers that append while another fsync is running
+  share the next one (group commit), and `save_report` only returns once its
+  line is on disk.
+- A crash mid-write leaves at most one torn last line; readers skip it, and
+  every append checks the tail under the lock and cuts it off first, so
+  the next report never gets glued onto it.
+- The active segment rotates at WHISTLEBLOWER_SEGMENT_BYTES. Sealed
+  segments are merged in the background in size tiers: each run of
+  WHISTLEBLOWER_COMPACT_SEGMENTS sealed segments becomes one segment named
+  after the range it covers ("00000001-00000008.jsonl"), and a run of those
+  merges again one tier up. A report is rewritten once per tier, about
+  log(segments) times, not on every compaction.
+- `iter_reports` streams reports line by line in submission order.
+
+Reports from the old single-array data/whistle_blower_logs.json are
+imported into the first segment.
+"""
+
 import json
+import logging
 import os
+import threading
 import uuid
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from config import WHISTLEBLOWER_COMPACT_SEGMENTS, WHISTLEBLOWER_FSYNC, WHISTLEBLOWER_SEGMENT_BYTES
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: in-process locking only
+    fcntl = None
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-LOG_FILE = os.path.join(BASE_DIR, "data", "whistle_blower_logs.json")
+LOG_DIR = os.path.join(BASE_DIR, "data", "whistleblower")
+LEGACY_LOG_FILE = os.path.join(BASE_DIR, "data", "whistle_blower_logs.json")
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _flock(path: str):
+    """Exclusive advisory lock on path, held across processes."""
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _fsync_dir(path: str) -> None:
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _repair_tail(fd: int) -> None:
+    """Cut a torn last line (a writer crashed mid-append) so the next append starts clean."""
+    size = os.fstat(fd).st_size
+    if not size or os.pread(fd, 1, size - 1) == b"\n":
+        return
+    end = size
+    while end > 0:
+        start = max(0, end - 65536)
+        cut = os.pread(fd, end - start, start).rfind(b"\n")
+        if cut >= 0:
+            os.ftruncate(fd, start + cut + 1)
+            return
+        end = start
+    os.ftruncate(fd, 0)
+
+
+class Segment:
+    __slots__ = ("first", "last", "path")
+
+    def __init__(self, first: int, last: int, path: str):
+        self.first = first
+        self.last = last
+        self.path = path
+
+    def tier(self, fan_in: int) -> int:
+        """0 for a rotated segment, n for one merged from fan_in ** n of them."""
+        span, tier = self.last - self.first + 1, 0
+        while span >= fan_in:
+            span //= fan_in
+            tier += 1
+        return tier
+
+    @staticmethod
+    def name(first: int, last: int) -> str:
+        return f"{first:08d}-{last:08d}.jsonl"
+
+
+class ReportLog:
+    """Segmented, append-only JSON-lines log (see module docstring)."""
+
+    def __init__(
+        self,
+        log_dir: str = LOG_DIR,
+        segment_bytes: int = WHISTLEBLOWER_SEGMENT_BYTES,
+        compact_segments: int = WHISTLEBLOWER_COMPACT_SEGMENTS,
+        fsync: bool = WHISTLEBLOWER_FSYNC,
+        legacy_file: str | None = LEGACY_LOG_FILE,
+    ):
+        self.log_dir = log_dir
+        self.segment_bytes = segment_bytes
+        self.compact_segments = compact_segments
+        self.fsync = fsync
+        self.legacy_file = legacy_file
+        self._lock = threading.Lock()        # in-process writers
+        self._sync_lock = threading.Lock()   # group commit
+        self._compact_lock = threading.Lock()
+        self._fd: int | None = None
+        self._active = 0
+        self._appended = 0
+        self._synced = 0
+
+    @property
+    def _lock_path(self) -> str:
+        return os.path.join(self.log_dir, ".lock")
+
+    def segments(self) -> list[Segment]:
+        """Live segments in order; ranges already covered by a compacted segment are skipped."""
+        try:
+            names = os.listdir(self.log_dir)
+        except FileNotFoundError:
+            return []
+        found = []
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            first, _, last = stem.partition("-")
+            if ext == ".jsonl" and first.isdigit() and last.isdigit():
+                found.append(Segment(int(first), int(last), os.path.join(self.log_dir, name)))
+        # Widest range first, so leftovers of an interrupted compaction are dropped
+        found.sort(key=lambda s: (s.first, -s.last))
+        live, covered = [], 0
+        for seg in found:
+            if seg.last > covered:
+                live.append(seg)
+                covered = seg.last
+        return live
+
+    # --- writing ---
+
+    def _open(self, number: int) -> int:
+        path = os.path.join(self.log_dir, Segment.name(number, number))
+        fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        _repair_tail(fd)
+        return fd
+
+    def _import_legacy(self) -> None:
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+        try:
+            with open(self.legacy_file) as f:
+                entries = json.load(f)
+        except json.JSONDecodeError:
+            return
+        if entries:
+            fd = self._open(1)
+            try:
+                os.write(fd, b"".join(json.dumps(e).encode() + b"\n" for e in entries))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _switch_to(self, number: int) -> None:
+        """Make segment `number` the active one; the previous one is synced and sealed."""
+        with self._sync_lock:
+            if self._fd is not None:
+                if self.fsync:
+                    os.fsync(self._fd)
+                os.close(self._fd)
+                self._synced = self._appended
+            self._fd = self._open(number)
+            self._active = number
+
+    def _active_fd(self) -> int:
+        """Called with the file lock held: follow rotations by other processes, rotate if full."""
+        segments = self.segments()
+        if not segments:
+            self._import_legacy()
+            segments = self.segments()
+        newest = segments[-1].last if segments else 1
+        if self._fd is None or newest != self._active:
+            self._switch_to(newest)
+        if os.fstat(self._fd).st_size >= self.segment_bytes:
+            self._switch_to(self._active + 1)
+            _fsync_dir(self.log_dir)
+            if self._merge_run(self.segments()[:-1]):
+                threading.Thread(target=self.compact, name="whistleblower-compact", daemon=True).start()
+        return self._fd
+
+    def append(self, entry: dict) -> None:
+        """Append one report; returns once it is durable (when fsync is enabled)."""
+        line = json.dumps(entry).encode() + b"\n"
+        os.makedirs(self.log_dir, exist_ok=True)
+        with self._lock, _flock(self._lock_path):
+            fd = self._active_fd()
+            _repair_tail(fd)  # another process may have crashed mid-append
+            os.write(fd, line)
+            self._appended += 1
+            seq = self._appended
+        if self.fsync:
+            self._sync(seq)
+
+    def _sync(self, seq: int) -> None:
+        with self._sync_lock:
+            if self._synced >= seq:
+                return  # covered by an fsync another writer just did
+            target = self._appended
+            os.fsync(self._fd)
+            self._synced = target
+
+    # --- compaction ---
+
+    def _merge_run(self, sealed: list[Segment]) -> list[Segment]:
+        """
+        The oldest mergeable group of sealed segments, or []. Tier blocks are
+        aligned on segment numbers (with fan-in 8: 1-8, 9-16, ..., then 1-64),
+        so a group is due once the block above its first segment is all sealed.
+        """
+        if not sealed:
+            return []
+        fan_in = max(2, self.compact_segments)
+        for seg in sealed:
+            size = fan_in ** (seg.tier(fan_in) + 1)
+            block_first = (seg.first - 1) // size * size + 1
+            block_last = block_first + size - 1
+            if block_last > sealed[-1].last:
+                continue
+            run = [s for s in sealed if s.first >= block_first and s.last <= block_last]
+            if len(run) > 1:
+                return run
+        return []
+
+    def _merge(self, run: list[Segment]) -> None:
+        path = os.path.join(self.log_dir, Segment.name(run[0].first, run[-1].last))
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as out:
+            for seg in run:
+                for line in self._lines(seg.path):
+                    out.write(line)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, path)
+        _fsync_dir(self.log_dir)
+        for seg in run:
+            if seg.path != path:
+                try:
+                    os.remove(seg.path)
+                except OSError:
+                    pass  # still open elsewhere (Windows); segments() skips it
+
+    def compact(self) -> int:
+        """Run the tier merges that are due; returns how many segments were merged."""
+        if not self._compact_lock.acquire(blocking=False):
+            return 0
+        merged = 0
+        try:
+            with _flock(os.path.join(self.log_dir, ".compact.lock")):
+                # never touch the active segment; a merge can complete a run one tier up
+                while run := self._merge_run(self.segments()[:-1]):
+                    self._merge(run)
+                    merged += len(run)
+            return merged
+        finally:
+            self._compact_lock.release()
+
+    # --- reading ---
+
+    @staticmethod
+    def _lines(path: str):
+        """Complete, well-formed lines of a segment file."""
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return  # torn tail
+                try:
+                    json.loads(line)
+                except ValueError:
+                    continue
+                yield line
+
+    def __iter__(self):
+        # Open every segment up front: a compaction that starts mid-iteration
+        # unlinks files, but on POSIX open handles keep reading them.
+        files = []
+        for seg in self.segments():
+            try:
+                files.append(open(seg.path, "rb"))
+            except FileNotFoundError:
+                continue
+        try:
+            for f in files:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        finally:
+            for f in files:
+                f.close()
+
+
+report_log = ReportLog()
+
 
 def save_report(report_data: dict):
     """
     Saves a whistle-blower report anonymously.
     Required fields: project_ref, description, evidence_url (optional)
     """
-    # Generate a unique reference number for the citizen to track 
+    # Generate a unique reference number for the citizen to track
     ref_number = f"TP-{uuid.uuid4().hex[:8].upper()}"
-    
+
     # Structure the entry - NO PII allowed [cite: 48, 57]
     new_entry = {
         "ref_number": ref_number,
-        "timestamp": datetime.now(datetime.timezone.utc).isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
         "project_ref": report_data.get("project_ref"),
         "description": report_data.get("description"),
         "evidence_url": report_data.get("evidence_url"),
         "is_demo_data": True
     }
 
-    # Load existing data, append, and save 
     try:
-        if os.path.exists(LOG_FILE):
-            with open(LOG_FILE, "r+") as f:
-                data = json.load(f)
-                data.append(new_entry)
-                f.seek(0)
-                json.dump(data, f, indent=4)
-        else:
-            with open(LOG_FILE, "w") as f:
-                json.dump([new_entry], f, indent=4)
-                
+        report_log.append(new_entry)
         return {"ref_number": ref_number}
-    except Exception as e:
-        print(f"Error saving report: {e}")
-        return None
\ No newline at end of file
+    except Exception:
+        logger.exception("Error saving report")
+        return None
+
+
+def iter_reports():
+    """Stream saved reports in submission order without loading them all."""
+    return iter(report_log)
+
+
+def compact_reports() -> int:
+    """Run due segment merges now (normally triggered by rotation)."""
+    return report_log.compact()
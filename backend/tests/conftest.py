@@ -0,0 +1,125 @@
+"""
+Shared fixtures: a throwaway data directory with both repositories over it.
+
+Run from backend/:
+    python -m pytest -q
+"""
+
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services import data_loader, repository  # noqa: E402
+
+TENDERS = [
+    {"id": "NRB-001", "title": "Ngong Road dualling", "county": "Nairobi", "category": "Roads", "value": 90_000_000,
+     "benchmark_value": 40_000_000, "contractor_id": "CONT-A", "status": "Stalled", "description": "Phase 1",
+     "days_overdue": 120, "is_demo_data": True},
+    {"id": "NRB-002", "title": "Kibra water kiosk", "county": "Nairobi", "category": "Water", "value": 2_000_000,
+     "benchmark_value": 2_500_000, "contractor_id": "CONT-B", "status": "Ongoing", "description": "Kiosk",
+     "is_demo_data": True},
+    {"id": "KSM-001", "title": "", "name": "Otonglo market shade", "county": "Kisumu", "category": "Buildings",
+     "value": 5_500_000, "benchmark_value": 5_000_000, "contractor_id": "CONT-A", "status": "Awarded",
+     "description": "Shade", "is_demo_data": True},
+    {"id": "UNK-001", "title": "Unassigned borehole", "county": None, "category": "Water", "value": 3_000_000,
+     "benchmark_value": 3_000_000, "contractor_id": "CONT-C", "status": "Completed", "description": "Borehole",
+     "is_demo_data": True},
+    {"id": "UNK-002", "title": "Untagged clinic", "category": "Medical", "value": 7_000_000,
+     "benchmark_value": 6_000_000, "contractor_id": "CONT-C", "status": "Ongoing", "description": "Clinic",
+     "is_demo_data": True},
+]
+
+PAYMENTS = [
+    {"invoice_id": "INV-1", "entity_id": "CG-NRB", "entity_name": "Nairobi County", "amount": 1_500_000,
+     "status": "Pending", "days_outstanding": 240, "is_chronic": True, "is_demo_data": True},
+    {"invoice_id": "INV-2", "entity_id": "CG-KSM", "entity_name": "Kisumu County", "amount": 250_000.5,
+     "status": "Paid", "days_outstanding": 30, "is_chronic": False, "is_demo_data": True},
+]
+
+POSTS = [
+    {"id": "post_1", "title": "Site abandoned", "content": "No workers for weeks", "status": "delay_reported",
+     "wardId": "Kibra", "county": "Nairobi", "category": "Roads", "likes": 4, "comments": 1,
+     "referenceId": "NRB-001", "author": {"name": "Citizen", "avatar": None, "verified": False},
+     "timestamp": "2026-09-01T08:00:00Z", "images": [], "is_demo_data": True},
+    # Created through POST /feed/posts: no tender reference
+    {"id": "post_2", "title": "Road still closed", "content": "Detour flooded", "status": "delay_reported",
+     "ward": "Kibra", "wardId": "Kibra", "county": "Nairobi", "category": "Roads", "likes": 0, "comments": 0,
+     "referenceId": None, "author": {"name": "Citizen", "avatar": None, "verified": False},
+     "timestamp": "2026-09-02T08:00:00Z", "images": [], "is_demo_data": True},
+]
+
+CONTRACTORS = [
+    {"id": "CONT-A", "name": "Apex Builders Ltd", "kra_pin": "P051234567A", "phone": "0712345678",
+     "address": "P.O. Box 100 Nairobi", "directors": ["Jane Wanjiku"], "is_demo_data": True},
+]
+
+
+def write_data(path, tenders=TENDERS, payments=PAYMENTS, posts=POSTS, contractors=CONTRACTORS) -> None:
+    os.makedirs(path, exist_ok=True)
+    shutil.copy(os.path.join(data_loader.DATA_PATH, "mock_data.json"), path)
+    for filename, rows in (("tender.json", tenders), ("payment.json", payments), ("posts.json", posts),
+                           ("contractors.json", contractors)):
+        with open(os.path.join(path, filename), "w") as f:
+            json.dump(rows, f)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Fixture data files; the JSON backend and data_loader read from here."""
+    path = str(tmp_path / "data")
+    write_data(path)
+    monkeypatch.setattr(data_loader, "DATA_PATH", path)
+    data_loader.dataset_cache.invalidate()
+    yield path
+    data_loader.dataset_cache.invalidate()
+
+
+@pytest.fixture
+def json_repo(data_dir):
+    return repository.JsonRepository()
+
+
+@pytest.fixture
+def sqlite_repo(data_dir, tmp_path, capsys):
+    import migrate_to_db
+
+    db_path = str(tmp_path / "fixture.db")
+    migrate_to_db.migrate(data_dir, db_path)
+    capsys.readouterr()  # migration progress output
+    return repository.SqliteRepository(db_path)
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def repo(request, monkeypatch):
+    """Each backend in turn, installed as the app's repository."""
+    selected = request.getfixturevalue(f"{request.param}_repo")
+    monkeypatch.setattr(repository, "_repository", selected)
+    return selected
+
+
+@pytest.fixture
+def report_jobs_dir(tmp_path, monkeypatch):
+    """A fresh report queue (created by app startup) over a throwaway jobs database."""
+    from services import report_jobs
+
+    path = tmp_path / "report_jobs"
+    monkeypatch.setattr(report_jobs, "JOBS_DB_PATH", str(path / "report_jobs.db"))
+    monkeypatch.setattr(report_jobs, "ARTIFACT_DIR", str(path / "reports"))
+    monkeypatch.setattr(report_jobs, "_queue", None)
+    return path
+
+
+@pytest.fixture
+def client(repo, report_jobs_dir):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
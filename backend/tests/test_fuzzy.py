@@ -0,0 +1,21 @@
+import pytest
+
+from services.fuzzy import FuzzyIndex
+
+ROWS = [
+    {"name": "Safari Construction Co.", "kraPin": "A002394857X"},
+    {"name": "Nairobi Logistics Ltd", "kraPin": "P051029384Z"},
+    {"name": "Kenya Universal Traders", "kra_pin": "P098765432W"},
+    {"name": "Ox", "kraPin": "B1"},
+    {"directors": ["Jane Safari"]},
+]
+
+
+@pytest.mark.parametrize("query", ["saf", "SAFARI CON", "ltd", "o", "ox", "b1", "a0023", "p0", "co.", "zzz", "ion co"])
+def test_contains_matches_plain_substring_scan(query):
+    q = query.lower()
+    expected = [
+        i for i, row in enumerate(ROWS)
+        if q in row.get("name", "").lower() or q in (row.get("kraPin") or row.get("kra_pin") or "").lower()
+    ]
+    assert FuzzyIndex(ROWS).contains(query) == expected
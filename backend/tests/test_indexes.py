@@ -0,0 +1,21 @@
+import pytest
+
+from conftest import TENDERS
+from services import columnar
+from services.indexes import TenderIndex
+
+
+@pytest.mark.skipif(not columnar.available(), reason="NumPy is not installed")
+def test_county_stats_columnar_matches_python():
+    rows = [*TENDERS, {"id": "X-1", "county": "Kisumu", "value": 1.5}]
+    python = TenderIndex(rows).county_stats
+    vectorized = TenderIndex(rows, columnar.TenderColumns(rows)).county_stats
+    assert [dict(s) for s in vectorized] == [dict(s) for s in python]
+
+
+def test_county_stats_reports_missing_and_none_county_as_unknown():
+    stats = {s["name"]: dict(s) for s in TenderIndex(TENDERS).county_stats}
+    assert None not in stats
+    # UNK-001 (county None) and UNK-002 (no county key)
+    assert stats["Unknown"]["tender_count"] == 2
+    assert stats["Unknown"]["total_value"] == 10_000_000
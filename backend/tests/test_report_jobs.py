@@ -0,0 +1,39 @@
+import os
+import sqlite3
+import time
+
+from services import report_jobs, repository
+
+
+def test_startup_resumes_interrupted_job_without_a_request(json_repo, report_jobs_dir, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    monkeypatch.setattr(repository, "_repository", json_repo)
+    os.makedirs(report_jobs_dir)
+    db_path = report_jobs.JOBS_DB_PATH
+    with sqlite3.connect(db_path) as conn:
+        for statement in report_jobs.JOBS_DDL:
+            conn.execute(statement)
+        # Left 'generating' by a previous process that happened to have our PID
+        conn.execute(
+            """
+            INSERT INTO report_jobs (id, dedupe_key, template_id, title, type, category, period, filters,
+                                     recipients, status, progress, worker_pid, worker_instance, created_at)
+            VALUES ('report_stuck', 'stuck', 'tpl_001', 'Stuck', 'summary', 'blacklist', '2026-Q3', '{}',
+                    '[]', 'generating', 0.5, ?, 'previous-process', '2026-10-01T00:00:00+00:00')
+            """,
+            (os.getpid(),),
+        )
+
+    with TestClient(main.app):
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            with sqlite3.connect(db_path) as conn:
+                status = conn.execute("SELECT status FROM report_jobs WHERE id = 'report_stuck'").fetchone()[0]
+            if status in ("published", "failed"):
+                break
+            time.sleep(0.05)
+
+    assert status == "published"
@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from conftest import TENDERS
+
+
+def as_json(rows) -> str:
+    """Type-exact comparison: 1500000 and 1500000.0 serialize differently."""
+    return json.dumps(rows, sort_keys=True)
+
+
+def without_nulls(rows) -> list:
+    # SQLite reads a NULL column back as a missing key, like the optional fields in tender.json
+    return [{k: v for k, v in row.items() if v is not None} for row in rows]
+
+
+def test_tenders_match_across_backends(json_repo, sqlite_repo):
+    json_total, json_tenders = json_repo.list_tenders(limit=len(TENDERS))
+    sqlite_total, sqlite_tenders = sqlite_repo.list_tenders(limit=len(TENDERS))
+    assert sqlite_total == json_total
+    assert as_json(sqlite_tenders) == as_json(without_nulls(json_tenders))
+    assert "days_overdue" not in sqlite_repo.get_tender("NRB-002")
+
+
+@pytest.mark.parametrize("county", [None, "nairobi"])
+def test_payments_match_across_backends(json_repo, sqlite_repo, county):
+    assert as_json(sqlite_repo.list_payments(county)) == as_json(json_repo.list_payments(county))
+    assert as_json(list(sqlite_repo.export_payments(county))) == as_json(list(json_repo.export_payments(county)))
@@ -0,0 +1,20 @@
+import pytest
+
+
+@pytest.mark.parametrize("path", ["/api/contractors", "/api/contractors/CONT-A/explain", "/api/counties/reputation"])
+def test_scores_survive_delay_post_without_reference(client, path):
+    # The fixture holds a delay_reported post with referenceId None next to real tenders
+    assert client.get(path).status_code == 200
+
+
+def test_contractor_scores_match_across_backends(json_repo, sqlite_repo):
+    scores = sqlite_repo.contractor_scores()
+    assert None not in scores.values()
+    assert scores == json_repo.contractor_scores()
+
+
+def test_delay_penalty_only_hits_referenced_tender(json_repo, sqlite_repo):
+    for repo in (json_repo, sqlite_repo):
+        rules = [(e["rule"], e["tenderId"]) for e in repo.explain("CONT-A")["explain"]]
+        assert ("citizen_delay", "NRB-001") in rules
+        assert not any(rule == "citizen_delay" and tender != "NRB-001" for rule, tender in rules)
@@ -0,0 +1,13 @@
+from services.search import MAX_EXPANSIONS, SearchIndex
+
+
+def test_prefix_expansion_keeps_most_frequent_tokens():
+    # More distinct "road..." tokens than MAX_EXPANSIONS; the alphabetically
+    # last one is also the most common
+    rows = [{"title": f"road{i:03d}"} for i in range(MAX_EXPANSIONS + 6)]
+    rows += [{"title": "roadzzz"} for _ in range(5)] + [{"title": "road"}]
+    index = SearchIndex((("title", 1),)).extend(rows)
+
+    hits = {rows[i]["title"] for _, i in index.search(["road"], len(rows), len(rows))}
+    assert len(hits) == MAX_EXPANSIONS
+    assert {"road", "roadzzz"} <= hits
@@ -2,25 +2,123 @@
 Standard API response wrappers.
 All endpoints use these to return consistent response shapes
 matching the frontend's API_CONTRACTS.md specification.
+
+Large lists can skip FastAPI's jsonable_encoder pass: `fast=True` makes a
+helper return a FastJSONResponse (orjson when installed) instead of a
+dict, and items given as `Encoded` JSON text (e.g. cached per dataset
+snapshot) are spliced into the envelope without being encoded again.
 """
 
+import json
+import secrets
+import threading
 from datetime import datetime, timezone
 from typing import Any
 
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def dumps(content) -> bytes:
+    """Compact UTF-8 JSON: orjson when installed, else the stdlib encoder."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, default=str)
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits or non-str keys
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+
+class Encoded:
+    """Already-serialized JSON, spliced verbatim into a FastJSONResponse."""
+
+    __slots__ = ("json",)
+
+    def __init__(self, json_bytes: bytes):
+        self.json = json_bytes
+
+    @classmethod
+    def of(cls, value) -> "Encoded":
+        return cls(dumps(value))
+
+    @classmethod
+    def join(cls, parts) -> "Encoded":
+        """A JSON array of already-encoded items (bytes)."""
+        return cls(b"[" + b",".join(parts) + b"]")
+
+
+_SPLICE_TAG = f"encoded-{secrets.token_hex(8)}-"
+
+_row_json: dict[str, tuple[int, list[bytes]]] = {}
+_row_json_lock = threading.Lock()
+
+
+def encoded_rows(snapshot) -> list[bytes]:
+    """
+    The JSON text of every row of a list-shaped snapshot, encoded once.
+    Shared across an append-only lineage: a grown file only encodes its
+    new tail.
+    """
+    def build(snap):
+        with _row_json_lock:
+            lineage, encoded = _row_json.get(snap.filename, (None, None))
+            if lineage != snap.lineage or len(encoded) > len(snap.rows):
+                encoded = []
+            encoded = encoded + [dumps(row) for row in snap.rows[len(encoded):]]
+            _row_json[snap.filename] = (snap.lineage, encoded)
+            return encoded
+
+    return snapshot.derive("row_json", build)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson. Encoded values inside dicts (the
+    envelope levels, not list items) are spliced in as raw JSON.
+    """
+
+    def render(self, content) -> bytes:
+        if isinstance(content, Encoded):
+            return content.json
+        fragments: list[bytes] = []
+        body = dumps(_mark(content, fragments))
+        for i, fragment in enumerate(fragments):
+            body = body.replace(f'"{_SPLICE_TAG}{i}"'.encode(), fragment, 1)
+        return body
+
+
+def _mark(value, fragments: list):
+    """Copy of the dict levels of value with Encoded leaves replaced by placeholders."""
+    if isinstance(value, Encoded):
+        fragments.append(value.json)
+        return f"{_SPLICE_TAG}{len(fragments) - 1}"
+    if isinstance(value, dict):
+        return {k: _mark(v, fragments) for k, v in value.items()}
+    return value
+
+
+def _respond(envelope: dict, fast: bool):
+    return FastJSONResponse(envelope, status_code=envelope["statusCode"]) if fast else envelope
+
 
 def success_response(
     data: Any = None,
     message: str = "Success",
     status_code: int = 200,
-) -> dict:
+    fast: bool = False,
+) -> dict | FastJSONResponse:
     """Wrap data in the standard success envelope."""
-    return {
+    return _respond({
         "success": True,
         "statusCode": status_code,
         "message": message,
         "data": data,
         "timestamp": datetime.now(timezone.utc).isoformat(),
-    }
+    }, fast)
 
 
 def error_response(
@@ -47,7 +145,8 @@ def paginated_response(
     limit: int = 10,
     items_key: str = "items",
     message: str = "Success",
-) -> dict:
+    fast: bool = False,
+) -> dict | FastJSONResponse:
     """Wrap a paginated list in the standard envelope with pagination metadata."""
     total_pages = max(1, -(-total // limit))  # ceil division
     return success_response(
@@ -64,4 +163,28 @@ def paginated_response(
             },
         },
         message=message,
+        fast=fast,
+    )
+
+
+def cursor_response(
+    items: list,
+    next_cursor: str | None,
+    limit: int = 10,
+    items_key: str = "items",
+    message: str = "Success",
+    fast: bool = False,
+) -> dict | FastJSONResponse:
+    """Wrap one cursor (keyset) page; pass `nextCursor` back as `cursor` for the next one."""
+    return success_response(
+        data={
+            items_key: items,
+            "pagination": {
+                "limit": limit,
+                "hasNextPage": next_cursor is not None,
+                "nextCursor": next_cursor,
+            },
+        },
+        message=message,
+        fast=fast,
     )